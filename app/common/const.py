@@ -98,9 +98,113 @@ class Settings(BaseSettings):
     KV_HINT_CER_THRESHOLD: float = 0.2
     CLS_HINT_SCORE_THRESHOLD: float = 0.2
 
+    # HTTP CLIENT CONFIG
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_UPSTREAM_LIMITS: Dict = {}  # {"pp": {"max_connections": 50, "max_keepalive_connections": 20}}
+    USE_HTTP2: bool = False  # h2c 미지원, https upstream 에서만 HTTP/2 사용
+    USE_BINARY_PAYLOAD: bool = False  # msgpack package가 있을 때 upstream과 msgpack으로 통신
+    BINARY_PAYLOAD_UPSTREAMS: List = []  # msgpack 요청을 보낼 upstream, 비어 있으면 전체
+    UPSTREAM_REPLICAS: Dict = {}  # {"serving": ["http://10.0.0.2:5000"]}, key는 metric의 upstream 이름
+
+    # CIRCUIT BREAKER CONFIG
+    USE_CIRCUIT_BREAKER: bool = False
+    CIRCUIT_BREAKER_WINDOW_SECOND: float = 30.0
+    CIRCUIT_BREAKER_MIN_REQUESTS: int = 20
+    CIRCUIT_BREAKER_ERROR_RATE: float = 0.5
+    CIRCUIT_BREAKER_P95_LATENCY_MS: float = 0.0  # 0이면 latency로는 open 하지 않음
+    CIRCUIT_BREAKER_OPEN_SECOND: float = 10.0
+
+    # HEDGING CONFIG
+    USE_HEDGING: bool = False  # detection, recognition, classification 요청만 hedge
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_MIN_DELAY_MS: float = 50.0
+    HEDGE_DEFAULT_DELAY_MS: float = 500.0  # latency 표본이 부족할 때 사용
+
+    # MICRO BATCHING CONFIG
+    USE_MICRO_BATCHING: bool = False
+    MICRO_BATCH_MAX_SIZE: int = 8
+    MICRO_BATCH_MAX_WAIT_MS: float = 10.0
+    MICRO_BATCH_ROUTE: str = "batch"
+
+    # IMAGE CACHE CONFIG
+    IMAGE_CACHE_MAX_BYTES: int = 268435456  # decode한 이미지 cache의 최대 크기(256MB), worker 별
+    TIFF_INDEX_CACHE_SIZE: int = 16  # page offset을 유지할 tiff 파일 수
+    PDF_DOCUMENT_CACHE_SIZE: int = 16  # page 정보를 유지할 pdf 파일 수
+    PDF_RENDER_DPI: int = 200
+    PDF_RENDER_MAX_SIDE: int = 0  # pdf page를 그릴 때 긴 변의 최대 pixel, 0이면 제한 없음
+    PDF_RASTERIZER_WORKERS: int = 4  # 동시에 실행할 pdftoppm 수
+    PDF_RASTERIZER_TIMEOUT_SECOND: float = 60.0
+    POPPLER_PATH: Optional[str] = None  # pdftoppm이 PATH에 없을 때 poppler bin directory
+
+    # STAGE CACHE CONFIG
+    USE_STAGE_CACHE: bool = False
+    STAGE_CACHE_VERSION: str = "1"  # model 배포 시 변경해서 이전 결과 무효화
+    STAGE_CACHE_MAX_SIZE: int = 1024
+    STAGE_CACHE_DISK_PATH: Optional[str] = None
+    STAGE_CACHE_DISK_MAX_ENTRIES: int = 10000
+
+    # RECOGNITION CHARSET CONFIG
+    RECOGNITION_CHARSET_PATH: Optional[str] = None  # pp server와 같은 version의 charset json
+
+    # DOCUMENT CONFIG
+    DOCUMENT_PAGE_CONCURRENCY: int = 4  # 문서 하나에서 동시에 inference 하는 page 수
+
+    # JOB QUEUE CONFIG
+    JOB_QUEUE_BACKEND: str = "local"  # local, redis
+    JOB_QUEUE_NAME: str = "textscope:jobs"
+    JOB_QUEUE_MAX_SIZE: int = 1000
+    JOB_WORKERS: int = 4  # local은 api process 안에서, redis는 python -m app.worker 로 실행
+    JOB_STATUS_TTL_SECOND: int = 86400
+    # local backend의 job 상태는 process 안에만 있으므로 api process가 하나일 때만 mode=async 허용
+    ALLOW_LOCAL_JOB_QUEUE: bool = False
+    JOB_LEASE_SECOND: int = 1800  # redis backend, 처리 중인 job을 이 시간 안에 끝내지 못하면 다시 queue에 등록
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RECOVERY_INTERVAL_SECOND: float = 60.0
+    JOB_QUEUE_RETRY_SECOND: float = 1.0  # job queue 조회 실패(redis 연결 끊김 등) 후 다시 조회하기까지 대기
+
+    # ADMISSION CONTROL CONFIG
+    USE_ADMISSION_CONTROL: bool = False
+    ADMISSION_MAX_IN_FLIGHT: int = 64  # 동시에 처리하는 ocr 요청 수
+    ADMISSION_MAX_WAITING: int = 128  # 처리 차례를 기다리는 ocr 요청 수, 초과 시 바로 503
+    ADMISSION_WAIT_TIMEOUT_SECOND: float = 10.0
+    ADMISSION_UPSTREAM_MAX_IN_FLIGHT: int = 32  # upstream 하나에 동시에 보내는 요청 수
+    ADMISSION_UPSTREAM_MAX_WAITING: int = 256
+    ADMISSION_UPSTREAM_LIMITS: Dict = {}  # {"recognition": 16}
+    ADMISSION_CUSTOMER_QUOTA: int = 0  # customer 별 동시 요청 수, 0이면 제한 없음
+    ADMISSION_USER_QUOTA: int = 0  # user(email) 별 동시 요청 수, 0이면 제한 없음
+    ADMISSION_QUOTA_OVERRIDES: Dict = {}  # {"customer:textscope": 32, "user:garam@example.com": 4}
+    ADMISSION_RETRY_AFTER_SECOND: int = 5
+
+    # SINGLE FLIGHT CONFIG
+    USE_SINGLE_FLIGHT: bool = False
+    SINGLE_FLIGHT_BACKEND: str = "local"  # local, redis(worker process 사이에서도 공유)
+    SINGLE_FLIGHT_NAME: str = "textscope:single-flight"
+    SINGLE_FLIGHT_RESULT_TTL_SECOND: float = 10.0  # redis backend에서 다른 worker에 결과를 전달하는 시간
+    SINGLE_FLIGHT_POLL_INTERVAL_MS: float = 100.0
+    SINGLE_FLIGHT_IGNORE_KEYS: List = ["task_id", "request_id", "image_pkey"]
+
+    # DEADLINE CONFIG
+    DISCONNECT_POLL_INTERVAL_SECOND: float = 0.5  # client 연결 끊김 확인 주기
+
+    # TRACING CONFIG
+    USE_TRACING: bool = True  # stage, upstream 호출 latency/payload histogram을 /metrics로 노출
+    TRACING_EXPORT_PATH: Optional[str] = None  # span을 OTLP/JSON(한 줄에 하나) 형식으로 기록할 파일
+    TRACING_SERVICE_NAME: str = "textscope-core"
+
+    # PIPELINE RECORDING CONFIG
+    USE_PIPELINE_RECORDING: bool = False  # ocr 요청의 upstream 요청/응답을 replay 용으로 기록
+    PIPELINE_RECORDING_PATH: str = "/workspace/recordings"
+    PIPELINE_RECORDING_SAMPLE_RATE: float = 1.0
+
+    # RECTIFIED IMAGE CONFIG
+    USE_RECTIFIED_IMAGE: bool = False  # rotate 결과로 회전한 page를 한 번만 만들어서 detection, recognition에 전달
+    RECTIFIED_IMAGE_FORMAT: str = "png"
+
     # OCR CONFIG
     OCR_PIPELINE: bool = False
-    USE_OCR_PIPELINE: str = "single"
+    USE_OCR_PIPELINE: str = "single"  # single, multiple, duriel, async_single, async_multiple, async_duriel
 
     # OTHERS
     PROFILING_TOOL: str = "cProfile"
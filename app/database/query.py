@@ -10,6 +10,7 @@ from starlette.responses import JSONResponse
 from app import models
 from app.database import schema
 from app.utils.logging import logger
+from app.utils.tracing import traced
 from app.database.connection import Base
 from app.schemas import error_models as ErrorResponse
 
@@ -84,6 +85,7 @@ def select_image(db: Session, **kwargs: Dict) -> Union[schema.Image, JSONRespons
     return result
 
 
+@traced("db_write")
 def insert_image(
     session: Session,
     image_path: str,
@@ -123,6 +125,7 @@ def select_category(db: Session, **kwargs: Dict) -> Optional[schema.Category]:
     return res
 
 
+@traced("db_write")
 def update_task(
     db: Session, pkey: int, data: models.UpdateTask
 ) -> Optional[schema.Task]:
@@ -137,6 +140,7 @@ def update_task(
 
 
 ### inference
+@traced("db_write")
 def insert_inference(
     db: Session, data: models.CreateInference
 ) -> Optional[schema.Inference]:
@@ -180,6 +184,7 @@ def select_dataset(db: Session, dataset_id: str) -> List[schema.Dataset]:
     return query.first()
 
 
+@traced("db_write")
 def insert_inference_result(
     session: Session,
     task_pkey: int,
@@ -204,6 +209,7 @@ def insert_inference_result(
         logger.exception(f"Insert inference result")
 
 
+@traced("db_write")
 def insert_training_dataset(
     session: Session,
     dataset_id: str,
@@ -219,6 +225,7 @@ def insert_training_dataset(
     return res
 
 
+@traced("db_write")
 def insert_category(
     session: Session,
     category_name: str,
@@ -234,6 +241,7 @@ def insert_category(
     return res.category_pkey
 
 
+@traced("db_write")
 def insert_inference_image(db: Session, **kwargs: Dict[str, Any]) -> int:
     res = schema.Image.create(db, **kwargs)
     return res.image_pkey
@@ -479,6 +487,7 @@ def select_task(db: Session, **kwargs: Dict) -> Union[schema.Task, JSONResponse]
     return result
 
 
+@traced("db_write")
 def insert_task(
     session: Session,
     task_id: str,
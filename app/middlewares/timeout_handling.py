@@ -6,6 +6,7 @@ from fastapi import Request, Response
 
 from app.common.const import get_settings
 from app.errors import exceptions as ex
+from app.utils.deadline import deadline_scope, get_request_timeout
 
 
 settings = get_settings()
@@ -48,7 +49,10 @@ class TimeoutMiddleware(BaseHTTPMiddleware):
             #             for k in range(100):
             #                 ...
             #     return call_next(request)
-            return await asyncio.wait_for(call_next(request), timeout)
+            # 요청의 deadline은 pipeline의 모든 upstream 요청 timeout으로 이어진다
+            request_timeout = get_request_timeout(request)
+            with deadline_scope(request_timeout):
+                return await asyncio.wait_for(call_next(request), request_timeout)
             # return await asyncio.wait_for(call_next(request), timeout=0.120)
         except asyncio.TimeoutError:
             raise ex.TimeoutException()
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List, Any
 from pydantic.main import BaseModel
 from pydantic.networks import EmailStr
-from pydantic import Json
+from pydantic import Json, Field
 from fastapi.param_functions import Form
 
 
@@ -452,6 +452,7 @@ class ParamPostImageCrop(BaseModel):
     page: int = 1
     format: str = "jpeg"
     crop: List[ImageCropBbox] =  [ImageCropBbox()]
+    scale: Optional[float] = Field(None, gt=0, le=1)  # 원본 대비 crop 이미지 축소 비율, crop 좌표는 원본 기준
 
 
 class ParamPostInferenceClsKv(BaseModel):
@@ -1,8 +1,8 @@
 import requests  # type: ignore
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
-from fastapi import APIRouter, Depends, Body, HTTPException
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Body, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
 from starlette.responses import JSONResponse
 from sqlalchemy.orm import Session
@@ -79,8 +79,14 @@ def check_status() -> Any:
 def get_image(
     image_id: str,
     page: int = 1,
+    max_side: Optional[int] = Query(None, gt=0),
+    scale: Optional[float] = Query(None, gt=0, le=1),
     session: Session = Depends(db.session)
 ) -> JSONResponse:
+    """
+    ### 이미지 조회
+    max_side(긴 변의 최대 pixel) 또는 scale(0~1)을 주면 원본보다 작게 decode 한 이미지를 반환
+    """
     response = dict()
     response_log = dict()
     request_datetime = datetime.now()
@@ -105,7 +111,9 @@ def get_image(
     image_base64, image_width, image_height, image_format = get_image_info_from_bytes(
             image_bytes,
             image_path.name,
-            page
+            page,
+            max_side=max_side,
+            scale=scale,
     )
     
     if image_base64 is None:
@@ -226,6 +234,7 @@ def image_crop(
         image_bytes=None,
         angle=params.rectification.rotated,
         page=params.page,
+        scale=params.scale,
     )
     
     image = load_image(data)
@@ -233,7 +242,7 @@ def image_crop(
         status_code, error = ErrorResponse.ErrorCode.get(2103)
         return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
     
-    crop_images = get_crop_image(image, params.format, params.crop)
+    crop_images = get_crop_image(image, params.format, params.crop, params.scale)
     if len(crop_images) == 0:
         status_code, error = ErrorResponse.ErrorCode.get(2104)
         return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
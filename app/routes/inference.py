@@ -1,6 +1,11 @@
-from httpx import Client
+import copy
+import json
+import asyncio
 
-from typing import Dict
+from contextlib import AsyncExitStack
+from httpx import Client, AsyncClient, TimeoutException
+
+from typing import Any, AsyncIterator, Dict, List, Tuple, Union
 from fastapi import APIRouter, Body, Depends
 from pathlib import Path
 from datetime import datetime
@@ -14,17 +19,26 @@ from app.utils.utils import get_pp_api_name, set_json_response
 from app.utils.logging import logger
 from app.database.connection import db
 from app.utils.pdf2txt import get_pdf_text_info
+from app.utils.image import get_image_bytes, get_page_count
 from typing import Dict
-from fastapi import APIRouter, BackgroundTasks, Body, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 
 from sqlalchemy.orm import Session
 
 from app.schemas.json_schema import inference_responses
 from app.utils.utils import set_json_response, get_pp_api_name, pretty_dict
 from app.utils.logging import logger
-from app.wrapper import pp, pipeline, settings
+from app.wrapper import pp, pipeline, settings, aio
+from app.wrapper.client import clients
+from app.utils.job_queue import JobQueueFull, job_queue, make_job_status
+from app.utils.admission import AdmissionRejected, admission, get_quota_keys
+from app.utils.deadline import DeadlineExceeded, cancel_on_disconnect
+from app.utils.single_flight import get_request_fingerprint, single_flight
+from app.utils.tracing import span, trace_scope
+from app.utils.recording import recording_scope, save_recording
 from app.database import query, schema
 from app.database.connection import db
 from app.schemas import error_models as ErrorResponse
@@ -36,27 +50,195 @@ else:
 
 
 router = APIRouter()
+ASYNC_PIPELINES = ["async_single", "async_multiple", "async_duriel"]
 
 
 # TODO: 토큰을 이용한 유저 체크 부분 활성화
 @router.post("/ocr", status_code=200, responses=inference_responses)
 async def ocr(
     *,
+    request: Request,
     inputs: Dict = Body(...),
     current_user: dict = Depends(get_current_active_user),
     session: Session = Depends(db.session),
     background_tasks: BackgroundTasks,
+    mode: str = "sync",
 ) -> Dict:
     """
     ### 토큰과 파일을 전달받아 모델 서버에 ocr 처리 요청
     입력 데이터: 토큰, ocr에 사용할 파일 <br/>
-    응답 데이터: 상태 코드, 최소 퀄리티 보장 여부, 신뢰도, 문서 타입, ocr결과(문서에 따라 다른 결과 반환)
+    응답 데이터: 상태 코드, 최소 퀄리티 보장 여부, 신뢰도, 문서 타입, ocr결과(문서에 따라 다른 결과 반환) <br/>
+    mode=async: task를 queue에 등록하고 task_id를 바로 반환, 진행 상태와 결과는 /prediction/gocr, /prediction/cls-kv 에서 조회
+    """
+    start_time = datetime.now()
+    
+    task_id = inputs.get("task_id", "")
+    if mode == "async":
+        if not job_queue.accepts_jobs:
+            status_code, error = ErrorResponse.ErrorCode.get(2205)
+            return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
+        insert_task_result = create_inference_task(session, task_id, inputs)
+        if isinstance(insert_task_result, JSONResponse):
+            return insert_task_result
+        return await submit_ocr_job(task_id, insert_task_result.task_pkey, inputs)
+    
+    # 한도를 넘은 요청은 task 생성 전에 Retry-After와 함께 거절
+    try:
+        async with admission.request(get_quota_keys(current_user, inputs)):
+            insert_task_result = create_inference_task(session, task_id, inputs)
+            if isinstance(insert_task_result, JSONResponse):
+                return insert_task_result
+            task_pkey = insert_task_result.task_pkey
+            response = await cancel_on_disconnect(request, run_ocr(inputs))
+    except AdmissionRejected as exc:
+        logger.warning(f"{task_id}-ocr request rejected: {exc.reason}")
+        return exc.to_response()
+    except DeadlineExceeded as exc:
+        logger.warning(f"{task_id}-ocr request cancelled: {exc}")
+        return deadline_exceeded_response()
+    if isinstance(response, JSONResponse):
+        return response
+    logger.info(f"OCR api total time: \t{datetime.now() - start_time}")
+    
+    # TODO: 각 모델마다 결과 저장하도록 구성
+    if settings.DEVELOP:
+        background_tasks.add_task(
+            func=query.insert_inference_result,
+            session=session,
+            task_pkey=task_pkey,
+            image_pkey=inputs.get("image_pkey"),
+            inference_type=inputs.get("inference_type"),
+            response_log=response["response_log"],
+            inference_results=response["inference_results"],
+        )
+    return JSONResponse(content=jsonable_encoder(response))
+
+
+@router.post("/ocr/document", status_code=200, responses=inference_responses)
+async def ocr_document(
+    *,
+    request: Request,
+    inputs: Dict = Body(...),
+    current_user: dict = Depends(get_current_active_user),
+    session: Session = Depends(db.session),
+    background_tasks: BackgroundTasks,
+    stream: bool = False,
+) -> Response:
+    """
+    ### 여러 page로 구성된 문서(tiff, pdf)의 page별 ocr을 동시에 처리
+    입력 데이터: ocr 입력, first_page, last_page(생략 시 전체 page) <br/>
+    응답 데이터: page 순서대로 정렬된 page별 ocr 결과 <br/>
+    stream=true: page가 끝나는 순서대로 page별 결과를 json line으로 전송
     """
     start_time = datetime.now()
-    response_log: Dict = dict()
-    response: Dict = dict()
     
     task_id = inputs.get("task_id", "")
+    # 문서 요청 하나가 admission slot 하나를 사용, stream 응답은 전송이 끝날 때 반환
+    admission_stack = AsyncExitStack()
+    try:
+        await admission_stack.enter_async_context(
+            admission.request(get_quota_keys(current_user, inputs))
+        )
+    except AdmissionRejected as exc:
+        logger.warning(f"{task_id}-ocr document request rejected: {exc.reason}")
+        return exc.to_response()
+    async with admission_stack:
+        return await run_document(
+            request, admission_stack, inputs, session, background_tasks, stream, start_time
+        )
+
+
+async def run_document(
+    request: Request,
+    admission_stack: AsyncExitStack,
+    inputs: Dict,
+    session: Session,
+    background_tasks: BackgroundTasks,
+    stream: bool,
+    start_time: datetime,
+) -> Response:
+    """문서의 page별 ocr을 DOCUMENT_PAGE_CONCURRENCY 만큼 동시에 처리"""
+    task_id = inputs.get("task_id", "")
+    insert_task_result = create_inference_task(session, task_id, inputs)
+    if isinstance(insert_task_result, JSONResponse):
+        return insert_task_result
+    task_pkey = insert_task_result.task_pkey
+    
+    image_bytes = await run_in_threadpool(
+        get_image_bytes, inputs.get("image_id", ""), Path(inputs.get("image_path", ""))
+    )
+    if image_bytes is None:
+        status_code, error = ErrorResponse.ErrorCode.get(2101)
+        return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
+    page_count = await run_in_threadpool(
+        get_page_count, image_bytes, inputs.get("image_path", "")
+    )
+    first_page = max(inputs.get("first_page") or 1, 1)
+    last_page = min(inputs.get("last_page") or page_count, page_count)
+    pages = list(range(first_page, last_page + 1))
+    logger.info(f"{task_id}-document pages: {first_page}~{last_page} of {page_count}")
+    
+    semaphore = asyncio.Semaphore(settings.DOCUMENT_PAGE_CONCURRENCY)
+    
+    async def run_page(page: int) -> Dict:
+        async with semaphore:
+            page_inputs = copy.deepcopy(inputs)
+            page_inputs.update(page=page, task_id=f"{task_id}-{page}")
+            try:
+                response = await run_ocr(page_inputs)
+            except Exception:
+                # page 하나의 실패로 문서 전체가 실패하지 않도록 page 결과에 error로 반환
+                logger.exception(f"{task_id}-ocr document page {page} failed")
+                response = error_response(9500)
+        if isinstance(response, JSONResponse):
+            return dict(page=page, status_code=response.status_code, **json.loads(response.body))
+        if settings.DEVELOP:
+            background_tasks.add_task(
+                func=query.insert_inference_result,
+                session=session,
+                task_pkey=task_pkey,
+                image_pkey=inputs.get("image_pkey"),
+                inference_type=inputs.get("inference_type"),
+                response_log=response["response_log"],
+                inference_results=copy.copy(response["inference_results"]),
+            )
+        return dict(page=page, status_code=200, **response)
+    
+    page_tasks = [asyncio.ensure_future(run_page(page)) for page in pages]
+    
+    if stream:
+        stream_admission_stack = admission_stack.pop_all()
+        
+        async def stream_pages() -> AsyncIterator[str]:
+            try:
+                for page_task in asyncio.as_completed(page_tasks):
+                    page_response = await page_task
+                    yield json.dumps(jsonable_encoder(page_response), ensure_ascii=False) + "\n"
+            finally:
+                for page_task in page_tasks:
+                    page_task.cancel()
+                await stream_admission_stack.aclose()
+        
+        return StreamingResponse(stream_pages(), media_type="application/x-ndjson")
+    
+    try:
+        page_responses = await cancel_on_disconnect(request, asyncio.gather(*page_tasks))
+    except DeadlineExceeded as exc:
+        logger.warning(f"{task_id}-ocr document request cancelled: {exc}")
+        return deadline_exceeded_response()
+    finally:
+        for page_task in page_tasks:
+            page_task.cancel()
+    logger.info(f"OCR document api total time: \t{datetime.now() - start_time}")
+    return JSONResponse(
+        content=jsonable_encoder(dict(task_id=task_id, page_count=page_count, pages=page_responses))
+    )
+
+
+def create_inference_task(
+    session: Session, task_id: str, inputs: Dict
+) -> Union[JSONResponse, schema.Task]:
+    """task_id 중복 확인 후 inference task 생성"""
     select_task_result = query.select_task(session, task_id=task_id)
     
     if isinstance(select_task_result, schema.Task):
@@ -69,18 +251,57 @@ async def ocr(
     
     logger.debug(f"{task_id}-api request start:\n{pretty_dict(inputs)}")
     
-    insert_task_result = query.insert_task(
+    return query.insert_task(
         session,
         task_id,
         inputs.get("image_pkey"), 
         "INFERENCE",
         auto_commit=True
     )
-    if isinstance(insert_task_result, JSONResponse):
-        return insert_task_result
-    
-    task_pkey = insert_task_result.task_pkey
-    
+
+
+async def submit_ocr_job(task_id: str, task_pkey: int, inputs: Dict) -> JSONResponse:
+    """ocr job을 queue에 등록하고 task 상태 반환"""
+    job_status = make_job_status("queued", task_id=task_id)
+    await job_queue.set_status(task_id, job_status)
+    try:
+        await job_queue.put(dict(task_id=task_id, task_pkey=task_pkey, inputs=inputs))
+    except JobQueueFull:
+        status_code, error = ErrorResponse.ErrorCode.get(2203)
+        await job_queue.set_status(
+            task_id, make_job_status("failed", task_id=task_id, error=error)
+        )
+        return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
+    logger.info(f"{task_id}-ocr job queued")
+    return JSONResponse(
+        status_code=202, content=jsonable_encoder(dict(task_id=task_id, task=job_status))
+    )
+
+
+async def run_ocr(inputs: Dict) -> Union[JSONResponse, Dict]:
+    """ocr response 생성, 같은 입력으로 동시에 들어온 요청은 한 번만 실행"""
+    with trace_scope(
+        customer=inputs.get("customer") or settings.CUSTOMER,
+        doc_type=inputs.get("doc_type"),
+        task_id=inputs.get("task_id"),
+    ), span("ocr", pipeline=settings.USE_OCR_PIPELINE), recording_scope(
+        inputs
+    ) as recording:
+        if not settings.USE_SINGLE_FLIGHT:
+            response = await execute_ocr(inputs)
+        else:
+            response = await single_flight.run(
+                get_request_fingerprint(inputs), lambda: execute_ocr(inputs)
+            )
+        # single flight follower처럼 upstream 요청이 없었던 결과는 replay 할 수 없으므로 저장하지 않는다
+        if recording is not None and recording.calls:
+            await run_in_threadpool(save_recording, recording, response)
+        return response
+
+
+async def execute_ocr(inputs: Dict) -> Union[JSONResponse, Dict]:
+    """pdf text 추출 또는 inference pipeline으로 ocr response 생성"""
+    response_log: Dict = dict()
     if (
         inputs.get("use_general_ocr")
         and Path(inputs.get("image_path", "")).suffix in [".pdf", ".PDF"]
@@ -97,111 +318,183 @@ async def ocr(
                 )
             )
     
-    with Client() as client:
-        # Inference
-        if settings.USE_OCR_PIPELINE == 'multiple':
-            # TODO: sequence_type을 wrapper에서 받도록 수정
-            # TODO: python 3.6 버전에서 async profiling 사용에 제한이 있어 sync로 변경했는데 추후 async 사용해 micro bacing 사용하기 위해서는 다시 변경 필요
-            status_code, inference_results, response_log = pipeline.multiple(
-                client=client,
-                inputs=inputs,
-                sequence_type="kv",
-                response_log=response_log,
-            )
-            response_log = dict()
-        elif settings.USE_OCR_PIPELINE == 'duriel':
-            status_code, inference_results, response_log = pipeline.heungkuk_life(
-                client=client,
-                inputs=inputs,
-                response_log=response_log,
-                route_name=inputs.get("route_name", "ocr"),
-            )
-        elif settings.USE_OCR_PIPELINE == 'single':
-            status_code, inference_results, response_log = pipeline.single(
-                client=client,
-                inputs=inputs,
-                response_log=response_log,
-                route_name=inputs.get("route_name", "ocr"),
-            )
-        if isinstance(status_code, int) and (status_code < 200 or status_code >= 400):
-            status_code, error = ErrorResponse.ErrorCode.get(3501)
-            return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
-        
-        # inference_result: response 생성에 필요한 값, inference_results: response 생성하기 위한 과정에서 생성된 inference 결과 포함한 값
-        inference_result = inference_results
-        if "kv_result" in inference_results:
-            inference_result = inference_results.get("kv_result", {})
-        logger.debug(f"{task_id}-inference results:\n{inference_results}")
-        
-        
-        # convert preds to texts
-        if (
-            inputs.get("convert_preds_to_texts") is not None
-            and "texts" not in inference_results
-        ):
-            status_code, texts = pp.convert_preds_to_texts(
-                client=client,
-                rec_preds=inference_results.get("rec_preds", []),
-            )
-            if status_code < 200 or status_code >= 400:
-                status_code, error = ErrorResponse.ErrorCode.get(3503)
-                return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
-            inference_results["texts"] = texts
-        
-        
-        # Post processing
-        post_processing_type = get_pp_api_name(inference_results.get("doc_type", ""))
-        logger.info(f"{task_id}-pp type:{post_processing_type}")
-        if (
-            post_processing_type is not None
-        ):
-            pp_inputs = dict(
-                boxes=inference_result.get("boxes"),
-                scores=inference_result.get("scores"),
-                classes=inference_result.get("classes"),
-                rec_preds=inference_result.get("rec_preds"),
-                texts=inference_results.get("texts"),
-                id_type=inference_results.get("id_type"),
-                doc_type=inference_results.get("doc_type"),
-                image_height=inference_results.get("image_height"),
-                image_width=inference_results.get("image_width"),
-                task_id=task_id,
-            )
-            status_code, post_processing_results, response_log = pp.post_processing(
-                client=client,
-                task_id=task_id,
-                response_log=response_log,
-                inputs=pp_inputs,
-                post_processing_type=post_processing_type,
-            )
-            if status_code < 200 or status_code >= 400:
-                status_code, error = ErrorResponse.ErrorCode.get(3502)
-                return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
-            inference_results["kv"] = post_processing_results["result"]
-            logger.info(
-                f'{task_id}-post-processed kv result:\n{pretty_dict(inference_results.get("kv", {}))}'
-            )
-            if "texts" not in inference_results:
-                inference_results["texts"] = post_processing_results["texts"]
-                logger.info(
-                    f'{task_id}-post-processed text result:\n{pretty_dict(inference_results.get("texts", {}))}'
-                )
-        
+    try:
+        inference_response = await inference(inputs, response_log)
+    except AdmissionRejected as exc:
+        logger.warning(f"{inputs.get('task_id', '')}-upstream request rejected: {exc.reason}")
+        return exc.to_response()
+    except (DeadlineExceeded, TimeoutException) as exc:
+        logger.warning(f"{inputs.get('task_id', '')}-upstream request timed out: {exc!r}")
+        return deadline_exceeded_response()
+    if isinstance(inference_response, JSONResponse):
+        return inference_response
+    inference_results, response_log = inference_response
     
     response_log.update(inference_results.get("response_log", {}))
-    response.update(response_log=response_log)
-    response.update(inference_results=inference_results)
-    logger.info(f"OCR api total time: \t{datetime.now() - start_time}")
+    return dict(response_log=response_log, inference_results=inference_results)
+
+
+def deadline_exceeded_response() -> JSONResponse:
+    return error_response(3505)
+
+
+def is_success(status_code: Any) -> bool:
+    return not (isinstance(status_code, int) and (status_code < 200 or status_code >= 400))
+
+
+def error_response(error_code: int) -> JSONResponse:
+    status_code, error = ErrorResponse.ErrorCode.get(error_code)
+    return JSONResponse(status_code=status_code, content=jsonable_encoder({"error":error}))
+
+
+async def inference(
+    inputs: Dict, response_log: Dict
+) -> Union[JSONResponse, Tuple[Dict, Dict]]:
+    """USE_OCR_PIPELINE의 pipeline으로 inference 후 texts 변환, 후처리까지 수행"""
+    task_id = inputs.get("task_id", "")
+    # Inference
+    status_code, inference_results, response_log = await run_pipeline(inputs, response_log)
+    if not is_success(status_code):
+        return error_response(3501)
     
-    # TODO: 각 모델마다 결과 저장하도록 구성
-    if settings.DEVELOP:
-        background_tasks.add_task(
-            func=query.insert_inference_result,
-            session=session,
-            task_pkey=task_pkey,
-            image_pkey=inputs.get("image_pkey"),
-            inference_type=inputs.get("inference_type"),
+    # inference_result: response 생성에 필요한 값, inference_results: response 생성하기 위한 과정에서 생성된 inference 결과 포함한 값
+    inference_result = inference_results
+    if "kv_result" in inference_results:
+        inference_result = inference_results.get("kv_result", {})
+    logger.debug(f"{task_id}-inference results:\n{inference_results}")
+    
+    
+    # convert preds to texts
+    if (
+        inputs.get("convert_preds_to_texts") is not None
+        and "texts" not in inference_results
+    ):
+        status_code, texts = await convert_preds_to_texts(
+            rec_preds=inference_results.get("rec_preds", []),
+        )
+        if not is_success(status_code):
+            return error_response(3503)
+        inference_results["texts"] = texts
+    
+    
+    # Post processing
+    post_processing_type = get_pp_api_name(inference_results.get("doc_type", ""))
+    logger.info(f"{task_id}-pp type:{post_processing_type}")
+    if (
+        post_processing_type is not None
+    ):
+        pp_inputs = dict(
+            boxes=inference_result.get("boxes"),
+            scores=inference_result.get("scores"),
+            classes=inference_result.get("classes"),
+            rec_preds=inference_result.get("rec_preds"),
+            texts=inference_results.get("texts"),
+            id_type=inference_results.get("id_type"),
+            doc_type=inference_results.get("doc_type"),
+            image_height=inference_results.get("image_height"),
+            image_width=inference_results.get("image_width"),
+            task_id=task_id,
+        )
+        status_code, post_processing_results, response_log = await post_processing(
+            task_id=task_id,
             response_log=response_log,
-            inference_results=inference_results,
+            inputs=pp_inputs,
+            post_processing_type=post_processing_type,
         )
-    return JSONResponse(content=jsonable_encoder(response))
+        if not is_success(status_code):
+            return error_response(3502)
+        inference_results["kv"] = post_processing_results["result"]
+        logger.info(
+            f'{task_id}-post-processed kv result:\n{pretty_dict(inference_results.get("kv", {}))}'
+        )
+        if "texts" not in inference_results:
+            inference_results["texts"] = post_processing_results["texts"]
+            logger.info(
+                f'{task_id}-post-processed text result:\n{pretty_dict(inference_results.get("texts", {}))}'
+            )
+
+    return (inference_results, response_log)
+
+
+async def run_pipeline(inputs: Dict, response_log: Dict) -> Tuple[Any, Dict, Dict]:
+    """async pipeline은 event loop에서, sync pipeline은 threadpool에서 실행"""
+    if settings.USE_OCR_PIPELINE in ASYNC_PIPELINES:
+        return await run_async_pipeline(clients.async_client, inputs, response_log)
+    return await run_in_threadpool(run_sync_pipeline, clients.client, inputs, response_log)
+
+
+def run_sync_pipeline(
+    client: Client, inputs: Dict, response_log: Dict
+) -> Tuple[Any, Dict, Dict]:
+    if settings.USE_OCR_PIPELINE == 'multiple':
+        # TODO: sequence_type을 wrapper에서 받도록 수정
+        # micro batching은 async pipeline(async_*)에서 USE_MICRO_BATCHING으로 사용
+        status_code, inference_results, response_log = pipeline.multiple(
+            client=client,
+            inputs=inputs,
+            sequence_type="kv",
+            response_log=response_log,
+        )
+        response_log = dict()
+    elif settings.USE_OCR_PIPELINE == 'duriel':
+        status_code, inference_results, response_log = pipeline.heungkuk_life(
+            client=client,
+            inputs=inputs,
+            response_log=response_log,
+            route_name=inputs.get("route_name", "ocr"),
+        )
+    elif settings.USE_OCR_PIPELINE == 'single':
+        status_code, inference_results, response_log = pipeline.single(
+            client=client,
+            inputs=inputs,
+            response_log=response_log,
+            route_name=inputs.get("route_name", "ocr"),
+        )
+    return (status_code, inference_results, response_log)
+
+
+async def run_async_pipeline(
+    client: AsyncClient, inputs: Dict, response_log: Dict
+) -> Tuple[Any, Dict, Dict]:
+    if settings.USE_OCR_PIPELINE == 'async_multiple':
+        # TODO: sequence_type을 wrapper에서 받도록 수정
+        status_code, inference_results, response_log = await aio.pipeline.multiple(
+            client=client,
+            inputs=inputs,
+            sequence_type="kv",
+            response_log=response_log,
+        )
+        response_log = dict()
+    elif settings.USE_OCR_PIPELINE == 'async_duriel':
+        status_code, inference_results, response_log = await aio.pipeline.heungkuk_life(
+            client=client,
+            inputs=inputs,
+            response_log=response_log,
+            route_name=inputs.get("route_name", "ocr"),
+        )
+    elif settings.USE_OCR_PIPELINE == 'async_single':
+        status_code, inference_results, response_log = await aio.pipeline.single(
+            client=client,
+            inputs=inputs,
+            response_log=response_log,
+            route_name=inputs.get("route_name", "ocr"),
+        )
+    return (status_code, inference_results, response_log)
+
+
+async def convert_preds_to_texts(rec_preds: List) -> Tuple[int, List]:
+    """pipeline과 같은 방식(sync, async)의 pp client로 rec_preds를 texts로 변환"""
+    if settings.USE_OCR_PIPELINE in ASYNC_PIPELINES:
+        return await aio.pp.convert_preds_to_texts(
+            client=clients.async_client, rec_preds=rec_preds
+        )
+    return await run_in_threadpool(
+        pp.convert_preds_to_texts, client=clients.client, rec_preds=rec_preds
+    )
+
+
+async def post_processing(**kwargs: Any) -> Tuple[int, Dict, Dict]:
+    """pipeline과 같은 방식(sync, async)의 pp client로 후처리 요청"""
+    if settings.USE_OCR_PIPELINE in ASYNC_PIPELINES:
+        return await aio.pp.post_processing(client=clients.async_client, **kwargs)
+    return await run_in_threadpool(pp.post_processing, client=clients.client, **kwargs)
@@ -2,7 +2,7 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
 from starlette.responses import JSONResponse
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from app.database.connection import db
 from app.common.const import get_settings
@@ -11,12 +11,39 @@ from sqlalchemy.orm import Session
 from app.utils.utils import cal_time_elapsed_seconds
 from app.database import query
 from app.utils.utils import load_image2base64, basic_time_formatter
+from app.utils.job_queue import job_queue
+from app.utils.columnar import KV_COLUMNS, ColumnarResult, xyxy_to_xywh
 
 
 settings = get_settings()
 router = APIRouter()
 
 
+async def get_job_status(task_id: str) -> Optional[Dict]:
+    """ocr(mode=async)로 등록한 task의 상태, job queue에 없으면 None"""
+    return await job_queue.get_status(task_id)
+
+
+def get_job_prediction(task_id: str, job_status: Dict) -> JSONResponse:
+    """job queue에 저장된 task의 진행 상태와 결과로 prediction 응답 생성"""
+    task = models.Task(
+        task_id=task_id,
+        status_code=job_status.get("status_code"),
+        status_message=job_status.get("status_message"),
+        progress=job_status.get("progress"),
+        started_datetime=job_status.get("started_datetime") or job_status.get("updated_datetime"),
+        finished_datetime=job_status.get("finished_datetime") or job_status.get("updated_datetime"),
+    )
+    response = dict(
+        task=task,
+        status=job_status.get("status"),
+        prediction=job_status.get("result"),
+        error=job_status.get("error"),
+        image=None,
+    )
+    return JSONResponse(status_code=200, content=jsonable_encoder(response))
+
+
 @router.get("/")
 def get_all_prediction(session: Session = Depends(db.session)) -> JSONResponse:
     response = dict()
@@ -34,24 +61,9 @@ def get_all_prediction(session: Session = Depends(db.session)) -> JSONResponse:
         image = query.select_image_by_pkey(session, image_pkey=image_pkey)
         image_path = image.image_path
 
-        texts = list()
-        for text_, box_, score_, class_ in zip(
-            inference_result["texts"],
-            inference_result["boxes"],
-            inference_result["scores"],
-            inference_result["classes"],
-        ):
-            bbox = models.Bbox(
-                x=box_[0],
-                y=box_[1],
-                w=box_[2] - box_[0],
-                h=box_[3] - box_[1],
-            )
-            # TODO: kv_ids 매핑 필요
-            text = models.Text(
-                id=class_, text=text_, bbox=bbox, confidence=score_, kv_ids=[class_]
-            )
-            texts.append(text)
+        # 길이가 다른 column은 zip처럼 가장 짧은 column에 맞춘다
+        result = ColumnarResult.from_zipped_dict(inference_result, columns=KV_COLUMNS)
+        texts = list(result.iter_texts())
 
         prediction = dict(
             image_path=image_path,
@@ -77,12 +89,8 @@ def get_all_prediction(session: Session = Depends(db.session)) -> JSONResponse:
         for key, value in kv.items():
             if not key.endswith("_pred") or not value:
                 continue
-            bbox = models.Bbox(
-                x=value["box"][0],
-                y=value["box"][1],
-                w=value["box"][2] - value["box"][0],
-                h=value["box"][3] - value["box"][1],
-            )
+            x, y, w, h = xyxy_to_xywh(value["box"])[0].tolist()
+            bbox = models.Bbox(x=x, y=y, w=w, h=h)
             # TODO: key, kv_ids 매핑 필요
             key_value = models.KeyValue(
                 id=value["class"],
@@ -95,24 +103,9 @@ def get_all_prediction(session: Session = Depends(db.session)) -> JSONResponse:
             )
             key_values.append(key_value)
 
-        texts = list()
-        for text_, box_, score_, class_ in zip(
-            inference_result["texts"],
-            inference_result["boxes"],
-            inference_result["scores"],
-            inference_result["classes"],
-        ):
-            bbox = models.Bbox(
-                x=box_[0],
-                y=box_[1],
-                w=box_[2] - box_[0],
-                h=box_[3] - box_[1],
-            )
-            # TODO: kv_ids 매핑 필요
-            text = models.Text(
-                id=class_, text=text_, bbox=bbox, confidence=score_, kv_ids=[class_]
-            )
-            texts.append(text)
+        # 길이가 다른 column은 zip처럼 가장 짧은 column에 맞춘다
+        result = ColumnarResult.from_zipped_dict(inference_result, columns=KV_COLUMNS)
+        texts = list(result.iter_texts())
 
         prediction = dict(
             image_path=image_path,
@@ -142,8 +135,13 @@ def get_all_prediction(session: Session = Depends(db.session)) -> JSONResponse:
 
 @router.get("/cls-kv")
 def get_cls_kv_prediction(
-    task_id: str, visualize: bool, session: Session = Depends(db.session)
+    task_id: str,
+    visualize: bool,
+    session: Session = Depends(db.session),
+    job_status: Optional[Dict] = Depends(get_job_status),
 ) -> JSONResponse:
+    if job_status is not None:
+        return get_job_prediction(task_id, job_status)
     request_datetime = datetime.now()
     response = dict()
     response_log = dict()
@@ -178,12 +176,8 @@ def get_cls_kv_prediction(
             continue
         if "key_pred" in key:
             continue
-        bbox = models.Bbox(
-            x=value["box"][0],
-            y=value["box"][1],
-            w=value["box"][2] - value["box"][0],
-            h=value["box"][3] - value["box"][1],
-        )
+        x, y, w, h = xyxy_to_xywh(value["box"])[0].tolist()
+        bbox = models.Bbox(x=x, y=y, w=w, h=h)
         # TODO: key, kv_ids 매핑 필요
         key_value = models.KeyValue(
             id=value["class"],
@@ -246,8 +240,13 @@ def get_cls_kv_prediction(
 
 @router.get("/gocr")
 def get_gocr_prediction(
-    task_id: str, visualize: bool, session: Session = Depends(db.session)
+    task_id: str,
+    visualize: bool,
+    session: Session = Depends(db.session),
+    job_status: Optional[Dict] = Depends(get_job_status),
 ) -> JSONResponse:
+    if job_status is not None:
+        return get_job_prediction(task_id, job_status)
     request_datetime = datetime.now()
     response = dict()
     response_log = dict()
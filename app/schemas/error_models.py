@@ -22,6 +22,9 @@ ErrorCode = {
     2104: (404, Error(2104, "해당 좌표는 이미지에서 벗어났거나, 잘못된 좌표 형식입니다")),
     2201: (404, Error(2201, "task_id에 해당하는 task가 존재하지 않습니다")),
     2202: (409, Error(2202, "task_id에 해당하는 task가 이미 존재합니다")),
+    2203: (503, Error(2203, "task 대기열이 가득 차 요청을 처리할 수 없습니다")),
+    2204: (429, Error(2204, "동시에 요청할 수 있는 ocr 요청 수를 초과했습니다")),
+    2205: (503, Error(2205, "mode=async 요청을 처리할 수 있는 공유 task 대기열이 설정되지 않았습니다")),
     2401: (403, Error(2401, "email 또는 password가 정확하지 않습니다")),
     2402: (403, Error(2402, "OAuth 2.0 인증 상태가 아니거나 만료된 엑세스 토큰입니다")),
     2403: (403, Error(2403, "OAuth 2.0 인증 상태가 아니거나 잘못된 엑세스 토큰입니다")),
@@ -30,6 +33,8 @@ ErrorCode = {
     3501: (500, Error(3501, "모델 서버 에러가 발생했습니다")),
     3502: (500, Error(3502, "pp 과정에서 에러가 발생했습니다")),
     3503: (500, Error(3503, "텍스트 변환 과정에서 에러가 발생했습니다")),
+    3504: (503, Error(3504, "처리 중인 요청이 많아 요청을 처리할 수 없습니다")),
+    3505: (504, Error(3505, "요청 처리 제한 시간을 초과했습니다")),
     
     #database
     4101: (500, Error(4101, "이미지 정보를 가져오는 중 에러가 발생했습니다")),
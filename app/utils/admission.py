@@ -0,0 +1,322 @@
+import asyncio
+import threading
+
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter, Gauge
+
+from app.common.const import get_settings
+from app.schemas import error_models as ErrorResponse
+
+
+settings = get_settings()
+
+admission_in_flight = Gauge(
+    "textscope_admission_in_flight",
+    "Requests holding an admission slot",
+    ["scope", "name"],
+)
+admission_queue_depth = Gauge(
+    "textscope_admission_queue_depth",
+    "Requests waiting for an admission slot",
+    ["scope", "name"],
+)
+admission_rejections_total = Counter(
+    "textscope_admission_rejections_total",
+    "Requests rejected by admission control",
+    ["scope", "name", "reason"],
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, error_code: int, retry_after: int, reason: str) -> None:
+        self.error_code = error_code
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(reason)
+
+    def to_response(self) -> JSONResponse:
+        status_code, error = ErrorResponse.ErrorCode[self.error_code]
+        return JSONResponse(
+            status_code=status_code,
+            content=jsonable_encoder({"error":error}),
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class LimiterBase:
+    """ConcurrencyLimiter, ThreadConcurrencyLimiter 공통 설정과 metric"""
+
+    def __init__(
+        self,
+        scope: str,
+        name: str,
+        limit: int,
+        max_waiting: int = 0,
+        wait_timeout: Optional[float] = None,
+        error_code: int = 3504,
+        retry_after: int = settings.ADMISSION_RETRY_AFTER_SECOND,
+        export_gauges: bool = True,
+    ) -> None:
+        self.scope = scope
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.error_code = error_code
+        self.retry_after = retry_after
+        self.export_gauges = export_gauges
+        self.in_flight = 0
+        self._waiters: Deque[Any] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def is_idle(self) -> bool:
+        return self.in_flight == 0 and not self._waiters
+
+    def _update_metrics(self) -> None:
+        if not self.export_gauges:
+            return
+        admission_in_flight.labels(scope=self.scope, name=self.name).set(self.in_flight)
+        admission_queue_depth.labels(scope=self.scope, name=self.name).set(self.waiting)
+
+    def _reject(self, reason: str) -> None:
+        admission_rejections_total.labels(
+            scope=self.scope, name=self.name, reason=reason
+        ).inc()
+        raise AdmissionRejected(self.error_code, self.retry_after, reason)
+
+
+class ConcurrencyLimiter(LimiterBase):
+    """
+    동시 실행 수를 limit으로 제한하는 limiter
+
+    limit을 넘는 요청은 max_waiting 개까지 도착 순서대로 대기시키고, 대기열이 가득
+    찼거나 wait_timeout 안에 차례가 오지 않으면 AdmissionRejected를 발생시킨다.
+    limit이 0 이하이면 제한하지 않는다.
+    """
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self._update_metrics()
+            return
+        if self.waiting >= self.max_waiting:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_metrics()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.wait_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # 차례를 넘겨받은 직후 취소된 경우 받은 slot을 돌려준다
+                self.release()
+            self._update_metrics()
+            if isinstance(exc, asyncio.TimeoutError):
+                self._reject("wait_timeout")
+            raise
+
+    def release(self) -> None:
+        # 대기 중인 요청이 있으면 in_flight를 줄이지 않고 slot을 그대로 넘긴다
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_metrics()
+                return
+        self.in_flight -= 1
+        self._update_metrics()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self.limit <= 0:
+            yield
+            return
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class ThreadConcurrencyLimiter(LimiterBase):
+    """threadpool에서 실행하는 sync pipeline용 ConcurrencyLimiter, 규칙은 같다"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                self._update_metrics()
+                return
+            if self.waiting >= self.max_waiting:
+                self._reject("queue_full")
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            self._update_metrics()
+        if waiter.wait(self.wait_timeout):
+            return
+        with self._lock:
+            # timeout과 동시에 slot을 넘겨받았으면 그대로 사용
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._update_metrics()
+                self._reject("wait_timeout")
+
+    def release(self) -> None:
+        with self._lock:
+            # 대기 중인 요청이 있으면 in_flight를 줄이지 않고 slot을 그대로 넘긴다
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self.in_flight -= 1
+            self._update_metrics()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        if self.limit <= 0:
+            yield
+            return
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def get_quota_keys(current_user: Any, inputs: Dict) -> Dict[str, str]:
+    """요청의 quota 종류(customer, user)와 key"""
+    quota_keys = dict()
+    customer = inputs.get("customer")
+    if customer:
+        quota_keys["customer"] = str(customer)
+    email = getattr(current_user, "email", None)
+    if email:
+        quota_keys["user"] = str(email)
+    return quota_keys
+
+
+class AdmissionController:
+    """
+    wrapper 계층의 동시 요청 governor
+
+    - ocr 요청 전체의 동시 실행 수와 대기열(대기 시간 포함)
+    - customer, user 별 동시 요청 quota (초과 시 대기 없이 429)
+    - upstream(serving, pp 서버) 별 동시 요청 수
+    를 제한하고, 한도를 넘은 요청은 Retry-After와 함께 바로 거절한다.
+    """
+
+    def __init__(self) -> None:
+        self.requests = ConcurrencyLimiter(
+            "request",
+            "ocr",
+            settings.ADMISSION_MAX_IN_FLIGHT,
+            max_waiting=settings.ADMISSION_MAX_WAITING,
+            wait_timeout=settings.ADMISSION_WAIT_TIMEOUT_SECOND,
+        )
+        self._upstreams: Dict[str, ConcurrencyLimiter] = dict()
+        self._thread_upstreams: Dict[str, ThreadConcurrencyLimiter] = dict()
+        self._thread_upstreams_lock = threading.Lock()
+        self._quotas: Dict[str, ConcurrencyLimiter] = dict()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.USE_ADMISSION_CONTROL
+
+    def get_upstream_limit(self, upstream: str) -> Dict[str, Any]:
+        return dict(
+            limit=settings.ADMISSION_UPSTREAM_LIMITS.get(
+                upstream, settings.ADMISSION_UPSTREAM_MAX_IN_FLIGHT
+            ),
+            max_waiting=settings.ADMISSION_UPSTREAM_MAX_WAITING,
+            wait_timeout=settings.ADMISSION_WAIT_TIMEOUT_SECOND,
+        )
+
+    def get_upstream_limiter(self, upstream: str) -> ConcurrencyLimiter:
+        if upstream not in self._upstreams:
+            self._upstreams[upstream] = ConcurrencyLimiter(
+                "upstream", upstream, **self.get_upstream_limit(upstream)
+            )
+        return self._upstreams[upstream]
+
+    def get_thread_upstream_limiter(self, upstream: str) -> ThreadConcurrencyLimiter:
+        with self._thread_upstreams_lock:
+            if upstream not in self._thread_upstreams:
+                self._thread_upstreams[upstream] = ThreadConcurrencyLimiter(
+                    "upstream", upstream, **self.get_upstream_limit(upstream)
+                )
+            return self._thread_upstreams[upstream]
+
+    def get_quota_limit(self, kind: str, key: str) -> int:
+        default_quota = dict(
+            customer=settings.ADMISSION_CUSTOMER_QUOTA,
+            user=settings.ADMISSION_USER_QUOTA,
+        ).get(kind, 0)
+        return settings.ADMISSION_QUOTA_OVERRIDES.get(f"{kind}:{key}", default_quota)
+
+    @asynccontextmanager
+    async def quota(self, kind: str, key: str) -> AsyncIterator[None]:
+        quota_key = f"{kind}:{key}"
+        limiter = self._quotas.get(quota_key)
+        if limiter is None:
+            limiter = ConcurrencyLimiter(
+                "quota",
+                kind,
+                self.get_quota_limit(kind, key),
+                error_code=2204,
+                export_gauges=False,  # key 별 gauge는 label이 계속 늘어나므로 거절 수만 기록
+            )
+            self._quotas[quota_key] = limiter
+        try:
+            async with limiter.slot():
+                yield
+        finally:
+            # 요청이 없는 key의 limiter는 바로 정리
+            if limiter.is_idle and self._quotas.get(quota_key) is limiter:
+                del self._quotas[quota_key]
+
+    @asynccontextmanager
+    async def request(self, quota_keys: Dict[str, str]) -> AsyncIterator[None]:
+        """quota, 전체 동시 요청 수 한도 안에서 ocr 요청 실행"""
+        if not self.enabled:
+            yield
+            return
+        async with AsyncExitStack() as stack:
+            for kind, key in quota_keys.items():
+                await stack.enter_async_context(self.quota(kind, key))
+            await stack.enter_async_context(self.requests.slot())
+            yield
+
+    @asynccontextmanager
+    async def upstream(self, upstream: str) -> AsyncIterator[None]:
+        """upstream 별 동시 요청 수 한도 안에서 upstream 요청 실행"""
+        if not self.enabled:
+            yield
+            return
+        async with self.get_upstream_limiter(upstream).slot():
+            yield
+
+    @contextmanager
+    def sync_upstream(self, upstream: str) -> Iterator[None]:
+        """sync pipeline(threadpool)의 upstream 별 동시 요청 수 한도 안에서 upstream 요청 실행"""
+        if not self.enabled:
+            yield
+            return
+        with self.get_thread_upstream_limiter(upstream).slot():
+            yield
+
+
+admission = AdmissionController()
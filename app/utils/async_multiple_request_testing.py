@@ -1,34 +1,395 @@
-# import cv2
+"""
+OCR API 부하 생성, latency report 도구
 
-# API_ADDR = "v1/inference/pipeline"
-# URL = f"http://{settings.WEB_IP_ADDR}:{settings.WEB_IP_PORT}/{API_ADDR}"
+tests/resources/supported_image의 이미지를 /v1/image로 올린 뒤
+/v1/inference/ocr(ocr), GET /v1/image(image), POST /v1/image(upload)에 요청을 보낸다.
 
-# image_dir = "./others/assets/000000000000000IMG_4825.jpg"
-# img = cv2.imread(image_dir)
-# _, img_encoded = cv2.imencode(".jpg", img)
-# img_bytes = img_encoded.tobytes()
+- closed loop: --concurrency 개의 worker가 응답을 받으면 바로 다음 요청을 보낸다
+- open loop: --rate 개/초의 고정 도착률로 응답과 관계없이 요청을 보낸다.
+  latency는 예정된 전송 시각부터 측정해서 서버가 밀려도 대기 시간이 빠지지 않는다
 
-# files = {"image": ("test.jpg", img_bytes)}
+    python -m app.utils.async_multiple_request_testing --base-url http://localhost:8000 \\
+        --email user@example.com --password secret --mode open --rate 20 --duration 60
 
+처리량, p50/p95/p99 latency, ErrorCode 별 오류 수, response_log의 stage 별 시간을
+--output 경로에 json, html로 저장한다.
+"""
+import html
+import json
+import time
+import uuid
+import base64
+import random
+import asyncio
+import argparse
+import numpy as np
 
-# async def request(client):
-#     response = await client.post(URL, files=files, timeout=30.0)
-#     return response.text
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
 
+import httpx
 
-# async def task():
-#     async with httpx.AsyncClient() as client:
-#         tasks = [request(client) for _ in range(10)]
-#         result = await asyncio.gather(*tasks)
-#         print("\033[95m" + f"{result}" + "\033[m")
 
+IMAGE_SUFFIXES = [".jpg", ".jpeg", ".jp2", ".png", ".bmp", ".tif", ".tiff", ".pdf"]
+TARGETS = ["ocr", "image", "upload"]
+PERCENTILES = [50, 95, 99]
 
-# @router.get("/async_test")
-# async def async_test():
-#     await task()
 
+@dataclass
+class CorpusImage:
+    name: str
+    data: str  # base64
+    image_id: str = ""
+    image_path: str = ""
 
-# @router.get("/get_asyncio_sleep")
-# async def achyncio_sleep():
-#     await asyncio.sleep(3)
-#     return "Complete"
+
+@dataclass
+class Sample:
+    target: str
+    status_code: Optional[int]
+    latency: float
+    error: Optional[str] = None
+    stage_times: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def is_success(self) -> bool:
+        return self.error is None
+
+
+def load_corpus(
+    image_dir: Path, exclude: Sequence[str] = ("broken_image",)
+) -> List[CorpusImage]:
+    corpus = list()
+    for image_path in sorted(Path(image_dir).rglob("*")):
+        if image_path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        if any(part in exclude for part in image_path.parts):
+            continue
+        corpus.append(
+            CorpusImage(
+                name=image_path.name,
+                data=base64.b64encode(image_path.read_bytes()).decode("ascii"),
+            )
+        )
+    return corpus
+
+
+def get_error(status_code: int, content: Any) -> Optional[str]:
+    """응답의 ErrorCode(없으면 HTTP status), 성공이면 None"""
+    error = content.get("error") if isinstance(content, dict) else None
+    if isinstance(error, dict) and error.get("error_code") is not None:
+        return str(error.get("error_code"))
+    if status_code >= 400:
+        return f"HTTP {status_code}"
+    return None
+
+
+def get_stage_times(content: Any) -> Dict[str, float]:
+    """response_log의 *_time(초) 값"""
+    response_log = content.get("response_log") if isinstance(content, dict) else None
+    if not isinstance(response_log, dict):
+        return dict()
+    return {
+        key: float(value)
+        for key, value in response_log.items()
+        if key.endswith("_time") and isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def get_percentiles(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return dict()
+    array = np.asarray(values, dtype=np.float64) * 1000
+    result = {f"p{percentile}_ms": float(np.percentile(array, percentile)) for percentile in PERCENTILES}
+    result.update(mean_ms=float(array.mean()), max_ms=float(array.max()))
+    return result
+
+
+def summarize(samples: Sequence[Sample], elapsed: float) -> Dict[str, Any]:
+    """target 별 처리량, latency 분위수, 오류 분포, stage 별 시간"""
+    report: Dict[str, Any] = dict(elapsed_second=elapsed, targets=dict())
+    for target in sorted({sample.target for sample in samples}):
+        target_samples = [sample for sample in samples if sample.target == target]
+        successes = [sample for sample in target_samples if sample.is_success]
+        errors: Dict[str, int] = dict()
+        for sample in target_samples:
+            if sample.error is not None:
+                errors[sample.error] = errors.get(sample.error, 0) + 1
+        stage_values: Dict[str, List[float]] = dict()
+        for sample in successes:
+            for stage, value in sample.stage_times.items():
+                stage_values.setdefault(stage, list()).append(value)
+        report["targets"][target] = dict(
+            requests=len(target_samples),
+            successes=len(successes),
+            throughput=len(successes) / elapsed if elapsed > 0 else 0.0,
+            latency=get_percentiles([sample.latency for sample in successes]),
+            errors=dict(sorted(errors.items())),
+            stages={stage: get_percentiles(values) for stage, values in sorted(stage_values.items())},
+        )
+    return report
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        corpus: List[CorpusImage],
+        targets: Sequence[str],
+        image_root: str,
+        inputs: Optional[Dict] = None,
+    ) -> None:
+        self.client = client
+        self.corpus = corpus
+        self.targets = list(targets)
+        self.image_root = image_root
+        self.inputs = inputs or dict()
+        self.samples: List[Sample] = list()
+        self.run_id = uuid.uuid4().hex[:8]
+
+    def _new_image_id(self) -> str:
+        return f"load-{self.run_id}-{uuid.uuid4().hex[:12]}"
+
+    def _image_path(self, image: CorpusImage) -> str:
+        if self.image_root == "minio":
+            return f"minio/{image.name}"
+        return f"{self.image_root.rstrip('/')}/{image.image_id}/{image.name}"
+
+    async def _upload(self, image: CorpusImage, image_id: str) -> httpx.Response:
+        return await self.client.post(
+            "/v1/image",
+            json=dict(image_id=image_id, file_name=image.name, file=image.data),
+        )
+
+    async def prepare(self) -> None:
+        """ocr, image target에서 사용할 corpus 이미지 업로드"""
+        for image in self.corpus:
+            image.image_id = self._new_image_id()
+            response = await self._upload(image, image.image_id)
+            if response.status_code >= 400:
+                raise RuntimeError(f"Cannot upload {image.name}: {response.text}")
+            image.image_path = self._image_path(image)
+
+    async def request(self, target: str, started_at: Optional[float] = None) -> Sample:
+        image = random.choice(self.corpus)
+        started_at = time.perf_counter() if started_at is None else started_at
+        try:
+            if target == "ocr":
+                task_id = str(uuid.uuid4())
+                response = await self.client.post(
+                    "/v1/inference/ocr",
+                    json=dict(
+                        self.inputs,
+                        image_id=image.image_id,
+                        image_path=image.image_path,
+                        task_id=task_id,
+                        request_id=task_id,
+                    ),
+                )
+            elif target == "image":
+                response = await self.client.get("/v1/image", params=dict(image_id=image.image_id))
+            else:
+                response = await self._upload(image, self._new_image_id())
+            latency = time.perf_counter() - started_at
+            try:
+                content = response.json()
+            except ValueError:
+                content = None
+            sample = Sample(
+                target=target,
+                status_code=response.status_code,
+                latency=latency,
+                error=get_error(response.status_code, content),
+                stage_times=get_stage_times(content),
+            )
+        except httpx.HTTPError as exc:
+            sample = Sample(
+                target=target,
+                status_code=None,
+                latency=time.perf_counter() - started_at,
+                error=type(exc).__name__,
+            )
+        self.samples.append(sample)
+        return sample
+
+    def _next_target(self, index: int) -> str:
+        return self.targets[index % len(self.targets)]
+
+    async def run_closed_loop(self, concurrency: int, duration: float, total: Optional[int]) -> None:
+        deadline = time.perf_counter() + duration
+        counter = iter(range(total if total is not None else 2 ** 62))
+
+        async def worker() -> None:
+            for index in counter:
+                if time.perf_counter() >= deadline:
+                    return
+                await self.request(self._next_target(index))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def run_open_loop(
+        self,
+        rate: float,
+        duration: float,
+        total: Optional[int],
+        max_in_flight: int,
+        poisson: bool = False,
+    ) -> None:
+        start_time = time.perf_counter()
+        in_flight: set = set()
+        scheduled_at = start_time
+        index = 0
+        while scheduled_at - start_time < duration and (total is None or index < total):
+            await asyncio.sleep(max(scheduled_at - time.perf_counter(), 0))
+            target = self._next_target(index)
+            if len(in_flight) >= max_in_flight:
+                # client 쪽 한도에 걸린 요청도 결과에 남겨서 도착률을 유지하지 못한 것을 드러낸다
+                self.samples.append(
+                    Sample(target=target, status_code=None, latency=0.0, error="client_overflow")
+                )
+            else:
+                task = asyncio.ensure_future(self.request(target, started_at=scheduled_at))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            index += 1
+            scheduled_at += random.expovariate(rate) if poisson else 1 / rate
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    def table(headers: Sequence[str], rows: List[Sequence[Any]]) -> str:
+        head = "".join(f"<th>{html.escape(str(header))}</th>" for header in headers)
+        body = "".join(
+            "<tr>" + "".join(f"<td>{html.escape(format_value(value))}</td>" for value in row) + "</tr>"
+            for row in rows
+        )
+        return f"<table><tr>{head}</tr>{body}</table>"
+
+    latency_headers = [f"p{percentile}_ms" for percentile in PERCENTILES] + ["mean_ms", "max_ms"]
+    sections = [
+        "<h1>textscope load test</h1>",
+        f"<p>{html.escape(json.dumps(report.get('config', {}), ensure_ascii=False))}</p>",
+        f"<p>elapsed: {report['elapsed_second']:.1f}s</p>",
+    ]
+    for target, result in report["targets"].items():
+        sections.append(f"<h2>{html.escape(target)}</h2>")
+        sections.append(
+            table(
+                ["requests", "successes", "throughput(req/s)"] + latency_headers,
+                [
+                    [result["requests"], result["successes"], result["throughput"]]
+                    + [result["latency"].get(header) for header in latency_headers]
+                ],
+            )
+        )
+        if result["errors"]:
+            sections.append("<h3>errors</h3>")
+            sections.append(table(["error", "count"], list(result["errors"].items())))
+        if result["stages"]:
+            sections.append("<h3>stages</h3>")
+            sections.append(
+                table(
+                    ["stage"] + latency_headers,
+                    [
+                        [stage] + [values.get(header) for header in latency_headers]
+                        for stage, values in result["stages"].items()
+                    ],
+                )
+            )
+    style = "table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}"
+    return f"<html><head><meta charset='utf-8'><style>{style}</style></head><body>{''.join(sections)}</body></html>"
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "-" if value is None else str(value)
+
+
+def write_report(report: Dict[str, Any], output: Path) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.with_suffix(".json").write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    output.with_suffix(".html").write_text(render_html(report), encoding="utf-8")
+
+
+async def get_token(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/v1/auth/token", data=dict(email=email, password=password))
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    corpus = load_corpus(Path(args.image_dir), exclude=args.exclude)
+    if not corpus:
+        raise ValueError(f"No images in {args.image_dir}")
+    limits = httpx.Limits(
+        max_connections=max(args.concurrency, args.max_in_flight),
+        max_keepalive_connections=max(args.concurrency, args.max_in_flight),
+    )
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        token = args.token or await get_token(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+        generator = LoadGenerator(
+            client, corpus, args.targets, args.image_root, json.loads(args.inputs)
+        )
+        await generator.prepare()
+        start_time = time.perf_counter()
+        if args.mode == "open":
+            await generator.run_open_loop(
+                args.rate, args.duration, args.total, args.max_in_flight, args.poisson
+            )
+        else:
+            await generator.run_closed_loop(args.concurrency, args.duration, args.total)
+        elapsed = time.perf_counter() - start_time
+    report = summarize(generator.samples, elapsed)
+    report["config"] = {
+        key: value for key, value in vars(args).items() if key not in ("password", "token")
+    }
+    return report
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="textscope OCR API load generator")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="access token, 없으면 --email/--password로 발급")
+    parser.add_argument("--image-dir", default="tests/resources/supported_image")
+    parser.add_argument("--exclude", nargs="*", default=["broken_image"])
+    parser.add_argument(
+        "--image-root",
+        default="/workspace/assets/images",
+        help="서버의 IMG_PATH, MinIO를 사용하면 minio",
+    )
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=["ocr"])
+    parser.add_argument("--inputs", default="{}", help="ocr 요청에 추가할 json (doc_type, customer 등)")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed loop worker 수")
+    parser.add_argument("--rate", type=float, default=10.0, help="open loop 초당 요청 수")
+    parser.add_argument("--poisson", action="store_true", help="open loop 도착 간격을 지수 분포로")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="open loop 최대 동시 요청 수")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--total", type=int, help="최대 요청 수")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default="load_test_report")
+    args = parser.parse_args(argv)
+    if args.token is None and (args.email is None or args.password is None):
+        parser.error("--token or --email/--password is required")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    write_report(report, Path(args.output))
+    for target, result in report["targets"].items():
+        print(
+            f"{target}: {result['throughput']:.2f} req/s, "
+            f"latency {json.dumps(result['latency'])}, errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import json
+import numpy as np
+
+from pathlib import Path
+from typing import List, Optional
+from fastapi import FastAPI
+
+from app.common.const import get_settings
+from app.utils.logging import logger
+
+
+settings = get_settings()
+
+
+class CharsetCodec:
+    """
+    recognition 결과(rec_preds)와 texts를 pp server 없이 변환하는 codec
+
+    charset 파일은 pp server와 같은 문자표를 사용하며 다음 형식의 json이다.
+    {"version": "...", "characters": ["가", ...], "unknown_index": 1,
+     "ignore_indexes": [0], "eos_index": 2}
+    pp server의 charset version과 다르면 사용하지 않고 pp server로 변환한다.
+    """
+
+    def __init__(self, charset_path: Optional[str] = None) -> None:
+        self.version: Optional[str] = None
+        self.is_verified = False
+        if charset_path is not None:
+            self.load(charset_path)
+
+    def init_app(self, app: FastAPI, charset_path: Optional[str] = None) -> None:
+        @app.on_event("startup")
+        async def startup() -> None:
+            from app.wrapper import pp_server_url
+            from app.wrapper.client import clients
+
+            if charset_path is None:
+                return
+            try:
+                self.load(charset_path)
+            except Exception:
+                logger.exception("charset load")
+                return
+            try:
+                response = await clients.async_client.get(
+                    f"{pp_server_url}/convert/charset_version",
+                    timeout=settings.TIMEOUT_SECOND,
+                )
+                self.verify(response.json().get("version"))
+            except Exception:
+                logger.exception("charset version")
+                self.verify(None)
+
+    @property
+    def is_available(self) -> bool:
+        return self.version is not None and self.is_verified
+
+    def load(self, charset_path: str) -> None:
+        charset = json.loads(Path(charset_path).read_text(encoding="utf-8"))
+        characters: List[str] = charset["characters"]
+        ignore_indexes = set(charset.get("ignore_indexes", []))
+        for index, character in enumerate(characters):
+            if index not in ignore_indexes and len(character) != 1:
+                raise ValueError(f"charset character '{character}' must be ignored or single")
+        self.unknown_index: Optional[int] = charset.get("unknown_index")
+        self.eos_index: Optional[int] = charset.get("eos_index")
+
+        # decode table: index -> 문자, ignore 대상 및 범위 밖 index는 "\0"
+        self.null_index = len(characters)
+        self.decode_table = np.array(
+            [
+                "\0" if index in ignore_indexes else character
+                for index, character in enumerate(characters)
+            ]
+            + ["\0"],
+            dtype="U1",
+        )
+
+        # encode table: unicode code point -> index
+        indexes = np.array(
+            [index for index in range(len(characters)) if index not in ignore_indexes],
+            dtype=np.int64,
+        )
+        codepoints = np.array(
+            [ord(characters[index]) for index in indexes.tolist()], dtype=np.int64
+        )
+        self.encode_table = np.full(
+            int(codepoints.max(initial=0)) + 2, -1, dtype=np.int64
+        )
+        # 같은 문자가 여러 번 있으면 앞의 index 사용
+        self.encode_table[codepoints[::-1]] = indexes[::-1]
+
+        self.version = str(charset["version"])
+        self.is_verified = False
+        logger.info(f"Recognition charset {self.version} loaded from {charset_path}")
+
+    def verify(self, pp_version: Optional[str]) -> bool:
+        self.is_verified = self.version is not None and self.version == pp_version
+        if not self.is_verified:
+            logger.warning(
+                f"Recognition charset version mismatch (core: {self.version}, pp: {pp_version}),"
+                " use pp server to convert texts"
+            )
+        return self.is_verified
+
+    def decode(self, rec_preds: List[List[int]]) -> List[str]:
+        """rec_preds(문자 index 목록)를 texts로 변환"""
+        if len(rec_preds) == 0:
+            return []
+        lengths = np.fromiter(
+            (len(pred) for pred in rec_preds), dtype=np.int64, count=len(rec_preds)
+        )
+        max_length = int(lengths.max())
+        if max_length == 0:
+            return [""] * len(rec_preds)
+
+        preds = np.full((len(rec_preds), max_length), self.null_index, dtype=np.int64)
+        mask = np.arange(max_length) < lengths[:, None]
+        preds[mask] = np.concatenate(
+            [np.asarray(pred, dtype=np.int64) for pred in rec_preds]
+        )
+        preds[(preds < 0) | (preds > self.null_index)] = self.null_index
+        if self.eos_index is not None:
+            preds[np.cumsum(preds == self.eos_index, axis=1) > 0] = self.null_index
+
+        # ignore 대상 문자("\0")를 행 끝으로 모으면 U{L} 변환 시 trailing null로 제거됨
+        chars = self.decode_table[preds]
+        order = np.argsort(chars == "\0", axis=1, kind="stable")
+        chars = np.ascontiguousarray(np.take_along_axis(chars, order, axis=1))
+        # (N, L) U1 배열을 행 단위 U{L} 문자열로 view
+        return chars.view(f"U{max_length}").reshape(-1).tolist()
+
+    def encode(self, texts: List[str]) -> List[List[int]]:
+        """texts를 rec_preds(문자 index 목록)로 변환"""
+        if len(texts) == 0:
+            return []
+        lengths = np.fromiter(
+            (len(text) for text in texts), dtype=np.int64, count=len(texts)
+        )
+        codepoints = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+        codepoints = np.minimum(codepoints, len(self.encode_table) - 1).astype(np.int64)
+        indexes = self.encode_table[codepoints]
+        if (indexes < 0).any():
+            if self.unknown_index is None:
+                raise ValueError("Text contains characters which are not in charset")
+            indexes[indexes < 0] = self.unknown_index
+        return [pred.tolist() for pred in np.split(indexes, np.cumsum(lengths)[:-1])]
+
+
+charset_codec = CharsetCodec()
@@ -0,0 +1,214 @@
+import numpy as np
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+
+REC_PRED_PAD = -1
+# kv detection 결과에서 box 단위로 맞춰야 하는 column
+KV_COLUMNS = ("boxes", "scores", "classes", "texts")
+
+
+def as_numeric(values: Any, dtype: type = np.float32) -> np.ndarray:
+    """숫자 array는 dtype을 유지하고(json의 int box, float64 score 보존) 그 외에는 dtype으로 변환"""
+    array = np.asarray(values)
+    if array.size == 0 or array.dtype.kind not in "iuf":
+        array = array.astype(dtype)
+    return array
+
+
+def xyxy_to_xywh(boxes: np.ndarray) -> np.ndarray:
+    """(N, 4) x1, y1, x2, y2 box를 x, y, w, h로 변환"""
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    return np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """(N, 4) x, y, w, h box를 x1, y1, x2, y2로 변환"""
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    return np.concatenate([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]], axis=1)
+
+
+def pad_rec_preds(rec_preds: Sequence[Sequence[int]]) -> np.ndarray:
+    """길이가 다른 rec_preds를 REC_PRED_PAD로 채운 (N, L) int32 array로 변환"""
+    if isinstance(rec_preds, np.ndarray):
+        return rec_preds.astype(np.int32, copy=False).reshape(len(rec_preds), -1)
+    max_length = max((len(rec_pred) for rec_pred in rec_preds), default=0)
+    padded = np.full((len(rec_preds), max_length), REC_PRED_PAD, dtype=np.int32)
+    for index, rec_pred in enumerate(rec_preds):
+        padded[index, : len(rec_pred)] = rec_pred
+    return padded
+
+
+class ColumnarResult:
+    """
+    text box 단위 inference 결과의 struct-of-arrays 표현
+
+    box 마다 dict/list를 만드는 대신 boxes (N, 4) xyxy, scores (N,), classes (N,) object,
+    rec_preds (N, L) int32(REC_PRED_PAD로 padding) array와 texts list를 column 단위로
+    보관한다. take, filter, concat은 array indexing만 하므로 box 수가 많아도
+    python 객체를 box 마다 복사하지 않고, response model은 iter_* 에서 필요할 때 만든다.
+    """
+
+    columns = ("boxes", "scores", "classes", "rec_preds", "texts")
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        scores: Optional[np.ndarray] = None,
+        classes: Optional[np.ndarray] = None,
+        rec_preds: Optional[np.ndarray] = None,
+        texts: Optional[List[str]] = None,
+    ) -> None:
+        self.boxes = as_numeric(boxes).reshape(-1, 4)
+        self.scores = None if scores is None else as_numeric(scores)
+        # class id가 str이 아닌 결과도 원래 값으로 돌려주도록 object array로 보관
+        self.classes = None if classes is None else np.asarray(classes, dtype=object)
+        self.rec_preds = None if rec_preds is None else pad_rec_preds(rec_preds)
+        self.texts = None if texts is None else list(texts)
+        for name in self.columns[1:]:
+            column = getattr(self, name)
+            if column is not None and len(column) != len(self.boxes):
+                raise ValueError(
+                    f"{name} has {len(column)} rows but boxes has {len(self.boxes)}"
+                )
+
+    @classmethod
+    def from_dict(
+        cls, result: Dict, columns: Optional[Sequence[str]] = None
+    ) -> "ColumnarResult":
+        return cls(**{name: result.get(name) for name in columns or cls.columns})
+
+    @classmethod
+    def from_zipped_dict(
+        cls, result: Dict, columns: Optional[Sequence[str]] = None
+    ) -> "ColumnarResult":
+        """
+        zip처럼 가장 짧은 column 길이에 맞춰 자른 결과
+
+        column 길이가 서로 다르게 저장된 기존 결과를 읽을 때 사용한다.
+        """
+        values = {name: result.get(name) for name in columns or cls.columns}
+        if values.get("boxes") is None:
+            values["boxes"] = []
+        length = min(len(value) for value in values.values() if value is not None)
+        return cls(
+            **{name: None if value is None else value[:length] for name, value in values.items()}
+        )
+
+    @classmethod
+    def from_xywh(cls, boxes: np.ndarray, **columns: Any) -> "ColumnarResult":
+        return cls(boxes=xywh_to_xyxy(boxes), **columns)
+
+    @classmethod
+    def concat(cls, results: Sequence["ColumnarResult"]) -> "ColumnarResult":
+        """
+        결과를 순서대로 이어 붙인 결과
+
+        모든 결과에 있는 column만 남긴다.
+        """
+        if not results:
+            return cls(boxes=np.zeros((0, 4), dtype=np.float32))
+        columns: Dict[str, Any] = dict(
+            boxes=np.concatenate([result.boxes for result in results])
+        )
+        for name in ("scores", "classes"):
+            values = [getattr(result, name) for result in results]
+            if all(value is not None for value in values):
+                columns[name] = np.concatenate(values)
+        if all(result.rec_preds is not None for result in results):
+            columns["rec_preds"] = pad_rec_preds(
+                [rec_pred for result in results for rec_pred in result.rec_pred_list()]
+            )
+        if all(result.texts is not None for result in results):
+            columns["texts"] = [text for result in results for text in result.texts or []]
+        return cls(**columns)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def take(self, indices: Union[Sequence[int], np.ndarray]) -> "ColumnarResult":
+        indices = np.asarray(indices, dtype=np.int64)
+        return ColumnarResult(
+            boxes=self.boxes[indices],
+            scores=None if self.scores is None else self.scores[indices],
+            classes=None if self.classes is None else self.classes[indices],
+            rec_preds=None if self.rec_preds is None else self.rec_preds[indices],
+            texts=None if self.texts is None else [self.texts[index] for index in indices],
+        )
+
+    def filter(self, mask: np.ndarray) -> "ColumnarResult":
+        return self.take(np.flatnonzero(mask))
+
+    def class_mask(self, classes: Iterable[str]) -> np.ndarray:
+        if self.classes is None:
+            return np.zeros(len(self), dtype=bool)
+        return np.isin(self.classes, list(classes))
+
+    def select_classes(self, classes: Iterable[str]) -> "ColumnarResult":
+        return self.filter(self.class_mask(classes))
+
+    def drop_classes(self, classes: Iterable[str]) -> "ColumnarResult":
+        return self.filter(~self.class_mask(classes))
+
+    def splice(self, classes: Iterable[str], other: "ColumnarResult") -> "ColumnarResult":
+        """classes에 해당하는 box를 빼고 other를 뒤에 붙인 결과"""
+        return ColumnarResult.concat([self.drop_classes(classes), other])
+
+    def with_texts(self, texts: List[str]) -> "ColumnarResult":
+        """array는 공유하고 texts만 바꾼 결과"""
+        return ColumnarResult(
+            boxes=self.boxes,
+            scores=self.scores,
+            classes=self.classes,
+            rec_preds=self.rec_preds,
+            texts=texts,
+        )
+
+    def rec_pred_list(self) -> List[List[int]]:
+        """padding을 제거한 rec_preds"""
+        if self.rec_preds is None:
+            return []
+        return [row[row != REC_PRED_PAD].tolist() for row in self.rec_preds]
+
+    def to_xywh(self) -> np.ndarray:
+        return xyxy_to_xywh(self.boxes)
+
+    def iter_predictions(self) -> Iterator[Dict[str, Any]]:
+        """box 단위 {"class", "score", "box", "text"} dict"""
+        boxes = self.boxes.tolist()
+        scores = self.scores.tolist() if self.scores is not None else [None] * len(self)
+        classes = self.classes.tolist() if self.classes is not None else [None] * len(self)
+        texts: Sequence[Any] = [None] * len(self) if self.texts is None else self.texts
+        for class_, score, box, text in zip(classes, scores, boxes, texts):
+            yield {"class": class_, "score": score, "box": box, "text": text}
+
+    def iter_texts(self) -> Iterator[Any]:
+        """box 단위 models.Text response model"""
+        from app import models
+
+        for prediction, (x, y, w, h) in zip(self.iter_predictions(), self.to_xywh().tolist()):
+            # TODO: kv_ids 매핑 필요
+            yield models.Text(
+                id=prediction["class"],
+                text=prediction["text"],
+                bbox=models.Bbox(x=x, y=y, w=w, h=h),
+                confidence=prediction["score"],
+                kv_ids=[prediction["class"]],
+            )
+
+    def to_arrays(self) -> Dict:
+        """binary payload(app.utils.payload.packb)로 보낼 column array"""
+        return {name: getattr(self, name) for name in self.columns if getattr(self, name) is not None}
+
+    def to_dict(self) -> Dict:
+        """기존 json 결과와 같은 list 형태"""
+        result: Dict = dict(boxes=self.boxes.tolist())
+        if self.scores is not None:
+            result["scores"] = self.scores.tolist()
+        if self.classes is not None:
+            result["classes"] = self.classes.tolist()
+        if self.rec_preds is not None:
+            result["rec_preds"] = self.rec_pred_list()
+        if self.texts is not None:
+            result["texts"] = list(self.texts)
+        return result
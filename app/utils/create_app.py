@@ -8,6 +8,9 @@ pretty.install()
 
 from app.routes import auth, index, users, inference, admin, dataset, prediction, dao, status, ldap, websocket
 from app.database.connection import db
+from app.wrapper.client import clients
+from app.utils.charset import charset_codec
+from app.worker import worker_pool
 from app.common.config import config
 from app.common.const import get_settings
 
@@ -27,6 +30,9 @@ settings = get_settings()
 
 def app_generator() -> FastAPI:
     app = FastAPI()
+    clients.init_app(app)
+    charset_codec.init_app(app, settings.RECOGNITION_CHARSET_PATH)
+    worker_pool.init_app(app)
 
     if settings.USE_TEXTSCOPE_DATABASE:
         db.init_app(app, **asdict(config()))
@@ -0,0 +1,131 @@
+import time
+import asyncio
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Iterator, Optional
+from fastapi import Request
+
+from app.common.const import get_settings
+
+
+settings = get_settings()
+
+# upstream에 남은 처리 시간(ms)을 전달하는 header, core로 들어온 요청의 budget으로도 사용
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    """요청 하나의 처리 제한 시각, client 연결이 끊기면 cancel 된다"""
+
+    def __init__(self, timeout: float) -> None:
+        self.expires_at = time.monotonic() + timeout
+        self.cancelled = False
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def check(self) -> float:
+        if self.cancelled:
+            raise DeadlineExceeded("request cancelled")
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+        return remaining
+
+
+# contextvar는 asyncio task, run_in_threadpool로 실행한 sync pipeline에도 복사된다
+_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def get_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    현재 context에 timeout 초 뒤의 deadline 설정
+
+    이미 더 이른 deadline이 있으면 그 deadline을 유지하고, timeout이 None이면
+    deadline 없이 실행한다.
+    """
+    deadline = None
+    if timeout is not None:
+        deadline = Deadline(timeout)
+        parent = _deadline.get()
+        if parent is not None and parent.expires_at <= deadline.expires_at:
+            deadline = parent
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_timeout(timeout: Optional[float] = None) -> float:
+    """timeout과 deadline까지 남은 시간 중 짧은 값, deadline이 지났으면 DeadlineExceeded"""
+    timeout = settings.TIMEOUT_SECOND if timeout is None else timeout
+    deadline = _deadline.get()
+    if deadline is None:
+        return timeout
+    return min(timeout, deadline.check())
+
+
+def with_deadline(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """upstream 요청 인자의 timeout을 남은 시간으로 줄이고 deadline header 추가"""
+    if _deadline.get() is None:
+        return kwargs
+    timeout = remaining_timeout(kwargs.get("timeout"))
+    headers = dict(kwargs.get("headers") or {})
+    headers[DEADLINE_HEADER] = str(int(timeout * 1000))
+    return dict(kwargs, timeout=timeout, headers=headers)
+
+
+def get_request_timeout(request: Request) -> float:
+    """요청 header로 전달된 budget과 TIMEOUT_SECOND 중 짧은 값"""
+    timeout = settings.TIMEOUT_SECOND
+    try:
+        timeout = min(timeout, int(request.headers[DEADLINE_HEADER]) / 1000)
+    except (KeyError, ValueError):
+        pass
+    return timeout
+
+
+async def wait_with_deadline(awaitable: Awaitable) -> Any:
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining_timeout())
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("deadline exceeded")
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable) -> Any:
+    """
+    client 연결이 끊기면 진행 중인 upstream 요청을 취소
+
+    asyncio task는 바로 취소하고, thread에서 실행 중인 sync pipeline은 deadline을
+    cancel 해서 다음 upstream 요청 전에 중단시킨다.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {task}, timeout=settings.DISCONNECT_POLL_INTERVAL_SECOND
+            )
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                deadline = _deadline.get()
+                if deadline is not None:
+                    deadline.cancel()
+                raise DeadlineExceeded("client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
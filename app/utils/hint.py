@@ -1,4 +1,4 @@
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 
 from app.utils.logging import logger
 from app.models import DocTypeHint
@@ -10,6 +10,25 @@ kv_hint_cer_threshold = settings.KV_HINT_CER_THRESHOLD
 cls_hint_score_threshold = settings.CLS_HINT_SCORE_THRESHOLD
 
 
+def get_planned_doc_type(inputs: Dict) -> Tuple[Optional[str], Dict]:
+    """static doc type, trust hint처럼 classification 없이 결정되는 doc type"""
+    cls_hint_result: Dict = dict()
+    hint = inputs.get("hint") or {}
+    if hint.get("doc_type") is not None:
+        doc_type_hint = DocTypeHint(**hint["doc_type"])
+        if doc_type_hint.use and doc_type_hint.trust:
+            cls_hint_result = apply_cls_hint(doc_type_hint=doc_type_hint)
+    static_doc_type = inputs.get("static_doc_type", None)
+    if static_doc_type is not None:
+        return static_doc_type, cls_hint_result
+    return cls_hint_result.get("doc_type"), cls_hint_result
+
+
+def get_planned_classification_result(doc_type: Optional[str]) -> Dict:
+    """classification을 생략했을 때 사용할 classification 결과"""
+    return dict(doc_type=doc_type, scores={doc_type: 1.0}, score=1.0)
+
+
 def apply_cls_hint(
     doc_type_hint: Optional[DocTypeHint],
     cls_result: Dict = {},
@@ -1,19 +1,22 @@
 import cv2
 import numpy as np
-import tifffile
-import pdf2image
+import math
 import base64
+import hashlib
 
 from io import BytesIO
 from PIL import Image
 from typing import Dict, Optional, Tuple, List
 from pathlib import Path
-from functools import lru_cache
 from app.models import ImageCropBbox
 
 from app.utils.logging import logger
+from app.utils.tracing import traced
 from app.common.const import get_settings
 from app.utils.minio import MinioService
+from app.utils.image_cache import get_bytes_digest, get_image_nbytes, get_source_key, image_cache
+from app.utils.tiff import get_tiff_index, get_tiff_page_count
+from app.utils.pdf import get_pdf_document, get_pdf_page_count
 
 
 settings = get_settings()
@@ -21,21 +24,14 @@ minio_client = MinioService()
 
 
 def read_tiff_one_page_from_bytes(image_bytes, page=1):
+    tiff_index = get_tiff_index(image_bytes)
     try:
-        tif_image = tifffile.imread(BytesIO(image_bytes), key=page - 1)
+        return tiff_index.read_page(page - 1)
     except IndexError:
-        tif_image = tifffile.imread(BytesIO(image_bytes), key=0)
-    
-    if tif_image.dtype == np.bool:
-        np_image = (tif_image * 255).astype(np.uint8)
-        
-    else: # tif_images.dtype == np.unit8:
-        np_image = tif_image.astype(np.uint8)
-    
-    return Image.fromarray(np_image)
+        return tiff_index.read_page(0)
 
 
-def read_tiff_page_from_bytes(image_bytes: str, page: int) -> Image:
+def read_tiff_page_from_bytes(image_bytes: bytes, page: int) -> Image:
     tiff_images = Image.open(BytesIO(image_bytes))
     tiff_images.seek(page - 1)
     np_image = np.array(tiff_images.convert("RGB"))
@@ -45,8 +41,8 @@ def read_tiff_page_from_bytes(image_bytes: str, page: int) -> Image:
     return Image.fromarray(np_image)
 
 
-@lru_cache(maxsize=15)
-def read_pillow_from_bytes(image_bytes, image_filename, page: int = 1) -> Image:
+@traced("image_decode")
+def decode_pillow_from_bytes(image_bytes, image_filename, page: int = 1) -> Image:
     file_extension = Path(image_filename).suffix.lower()
     if file_extension in [".jpg", ".jpeg", ".jp2", ".png", ".bmp"]:
         nparr = np.fromstring(image_bytes, np.uint8)
@@ -65,14 +61,10 @@ def read_pillow_from_bytes(image_bytes, image_filename, page: int = 1) -> Image:
                 return None
             
     elif file_extension == ".pdf":
-        pages = pdf2image.convert_from_bytes(
-            image_bytes, fmt="jpeg", first_page=page, last_page=page
-        )
-        if len(pages) == 0:
-            pages = pdf2image.convert_from_bytes(
-                image_bytes, fmt="jpeg", first_page=1, last_page=1
-            )
-        pil_image = pages[0]
+        pdf_document = get_pdf_document(image_bytes)
+        if not 1 <= page <= pdf_document.page_count:
+            page = 1
+        pil_image = pdf_document.render_page(page, fmt="jpeg")
         
     else:
         logger.error(f"{image_filename} is not supported!")
@@ -83,39 +75,204 @@ def read_pillow_from_bytes(image_bytes, image_filename, page: int = 1) -> Image:
     return pil_image
 
 
-@lru_cache(maxsize=15)
-def read_image_from_bytes(
-    image_bytes: str, image_filename: str, angle: Optional[float], page: int
+def get_page_key(image_digest: str, image_filename: str, page: int, kind: str) -> Tuple:
+    return (image_digest, Path(image_filename).suffix.lower(), page, kind)
+
+
+# libjpeg DCT scaling으로 1/factor 크기로 decode 하는 cv2 flag
+JPEG_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def get_decode_scale(
+    image_size: Tuple[int, int], max_side: Optional[int] = None, scale: Optional[float] = None
+) -> float:
+    """원본 대비 축소 비율, max_side와 scale 중 더 작게 줄이는 값이며 확대하지 않는다"""
+    decode_scale = 1.0
+    if scale:
+        decode_scale = min(decode_scale, scale)
+    if max_side:
+        decode_scale = min(decode_scale, max_side / max(image_size))
+    return decode_scale
+
+
+def scale_size(image_size: Tuple[int, int], ratio: float) -> Tuple[int, int]:
+    return (max(1, round(image_size[0] * ratio)), max(1, round(image_size[1] * ratio)))
+
+
+def resize_image(image: Image, image_size: Tuple[int, int]) -> Image:
+    if image.size == image_size:
+        return image
+    return image.resize(image_size, Image.BILINEAR)
+
+
+def get_size_kind(kind: str, max_side: Optional[int], scale: Optional[float]) -> str:
+    """요청한 크기별로 cache 하도록 kind에 max_side, scale 추가"""
+    if not max_side and not scale:
+        return kind
+    return f"{kind}_{max_side}_{scale}"
+
+
+@traced("image_decode", reduced=True)
+def decode_reduced_pillow_from_bytes(
+    image_bytes: bytes,
+    image_filename: str,
+    page: int,
+    max_side: Optional[int],
+    scale: Optional[float],
+) -> Optional[Image.Image]:
+    """
+    jpeg는 DCT scaling, pdf는 낮은 dpi로 원본보다 작게 decode
+
+    그 외 format은 None, 원본 크기로 decode 후 줄인다.
+    """
+    file_extension = Path(image_filename).suffix.lower()
+    if file_extension in [".jpg", ".jpeg"]:
+        # header만 읽어서 원본 크기 확인
+        with Image.open(BytesIO(image_bytes)) as header:
+            decode_scale = get_decode_scale(header.size, max_side, scale)
+        factor, flag = next(
+            ((factor, flag) for factor, flag in JPEG_REDUCED_FLAGS if 1 / factor >= decode_scale),
+            (1, cv2.IMREAD_COLOR),
+        )
+        cv2_img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flag)
+        pil_image = Image.fromarray(cv2_img[:, :, ::-1])
+        return resize_image(pil_image, scale_size(pil_image.size, decode_scale * factor))
+    
+    if file_extension == ".pdf":
+        pdf_document = get_pdf_document(image_bytes)
+        if not 1 <= page <= pdf_document.page_count:
+            page = 1
+        image_size = pdf_document.get_page_size(page)
+        decode_scale = get_decode_scale(image_size, max_side, scale)
+        dpi = math.ceil(pdf_document.get_render_dpi(page) * decode_scale)
+        pil_image = pdf_document.render_page(page, dpi=dpi, fmt="jpeg").convert("RGB")
+        return resize_image(pil_image, scale_size(image_size, decode_scale))
+    
+    return None
+
+
+def read_page_from_cache(
+    image_digest: str,
+    image_bytes: bytes,
+    image_filename: str,
+    page: int,
+    max_side: Optional[int] = None,
+    scale: Optional[float] = None,
+) -> Image:
+    if max_side or scale:
+        return read_reduced_page_from_cache(
+            image_digest, image_bytes, image_filename, page, max_side, scale
+        )
+    
+    key = get_page_key(image_digest, image_filename, page, "page")
+    pil_image = image_cache.get(key, "page")
+    if pil_image is None:
+        pil_image = decode_pillow_from_bytes(image_bytes, image_filename, page)
+        if pil_image is not None:
+            image_cache.set(key, pil_image, get_image_nbytes(pil_image))
+    return pil_image
+
+
+def read_reduced_page_from_cache(
+    image_digest: str,
+    image_bytes: bytes,
+    image_filename: str,
+    page: int,
+    max_side: Optional[int],
+    scale: Optional[float],
 ) -> Image:
+    key = get_page_key(image_digest, image_filename, page, get_size_kind("page", max_side, scale))
+    pil_image = image_cache.get(key, "reduced_page")
+    if pil_image is not None:
+        return pil_image
     
-    image = read_pillow_from_bytes(
-        image_bytes=image_bytes, image_filename=image_filename, page=page
+    try:
+        pil_image = decode_reduced_pillow_from_bytes(
+            image_bytes, image_filename, page, max_side, scale
+        )
+    except Exception:
+        logger.exception("read reduced pillow")
+        pil_image = None
+    if pil_image is None:
+        pil_image = read_page_from_cache(image_digest, image_bytes, image_filename, page)
+        if pil_image is None:
+            return None
+        pil_image = resize_image(
+            pil_image, scale_size(pil_image.size, get_decode_scale(pil_image.size, max_side, scale))
+        )
+    image_cache.set(key, pil_image, get_image_nbytes(pil_image))
+    return pil_image
+
+
+def read_pillow_from_bytes(image_bytes: bytes, image_filename: str, page: int = 1) -> Image:
+    return read_page_from_cache(
+        get_bytes_digest(image_bytes), image_bytes, image_filename, page
     )
+
+
+def read_image_from_bytes(
+    image_bytes: bytes,
+    image_filename: str,
+    angle: Optional[float],
+    page: int,
+    max_side: Optional[int] = None,
+    scale: Optional[float] = None,
+) -> Image:
+    
+    image_digest = get_bytes_digest(image_bytes)
+    if not angle:
+        return read_page_from_cache(
+            image_digest, image_bytes, image_filename, page, max_side, scale
+        )
     
+    kind = get_size_kind(f"rotate_{float(angle):g}", max_side, scale)
+    key = get_page_key(image_digest, image_filename, page, kind)
+    image = image_cache.get(key, "rotate")
+    if image is not None:
+        return image
+    
+    image = read_page_from_cache(
+        image_digest, image_bytes, image_filename, page, max_side, scale
+    )
     if image is None:
         return None
     
-    if angle:
-        image = image.rotate(angle, expand=True)
+    image = image.rotate(angle, expand=True)
+    image_cache.set(key, image, get_image_nbytes(image))
     
     return image
 
 
-@lru_cache(maxsize=15)
 def get_image_info_from_bytes(
-    image_bytes: str, image_filename: str, page: int
+    image_bytes: bytes,
+    image_filename: str,
+    page: int,
+    max_side: Optional[int] = None,
+    scale: Optional[float] = None,
 ) -> Tuple[str, int, int, str]:
     
-    image = read_pillow_from_bytes(
-        image_bytes=image_bytes, image_filename=image_filename, page=page
+    image_digest = get_bytes_digest(image_bytes)
+    key = get_page_key(image_digest, image_filename, page, get_size_kind("info", max_side, scale))
+    image_info = image_cache.get(key, "info")
+    if image_info is not None:
+        return image_info
+    
+    image = read_page_from_cache(
+        image_digest, image_bytes, image_filename, page, max_side, scale
     )
     
     if image is None:
         return (None, 0, 0, "")
     
     image_base64 = image_to_base64(image, "jpeg")
+    image_info = (image_base64.decode(), image.size[0], image.size[1], "jpeg")
+    image_cache.set(key, image_info, len(image_info[0]))
     
-    return (image_base64.decode(), image.size[0], image.size[1], "jpeg")
+    return image_info
 
 
 def image_to_base64(image: Image, file_format: str = "jpeg") -> str:
@@ -146,7 +303,12 @@ def load_image(data: dict) -> Image:
                 image_bytes = f.read()
     
     image = read_image_from_bytes(
-        image_bytes, image_filename, float(data.get("angle", 0.0)), int(data.get("page", 1))
+        image_bytes,
+        image_filename,
+        float(data.get("angle", 0.0)),
+        int(data.get("page", 1)),
+        max_side=data.get("max_side"),
+        scale=data.get("scale"),
     )
     
     if image is None:
@@ -187,7 +349,7 @@ def save_upload_image(
     return success, save_path
 
 
-def get_image_bytes(image_id: str, image_path: Path) -> str:
+def get_image_bytes(image_id: str, image_path: Path) -> Optional[bytes]:
     image_bytes = None
     
     if settings.USE_MINIO:
@@ -201,7 +363,41 @@ def get_image_bytes(image_id: str, image_path: Path) -> str:
     return image_bytes
 
 
-def get_crop_image(image: Image, format: str, crop: List[ImageCropBbox]) -> List[Dict[int, str]]:
+def get_page_count(image_bytes: bytes, image_filename: str) -> int:
+    """tiff, pdf 파일의 page 수, 그 외 이미지는 1"""
+    file_extension = Path(image_filename).suffix.lower()
+    if file_extension in [".tif", ".tiff"]:
+        return get_tiff_page_count(image_bytes)
+    elif file_extension == ".pdf":
+        return get_pdf_page_count(image_bytes)
+    return 1
+
+
+def get_image_digest(image_id: str, image_path: str) -> Optional[str]:
+    """
+    이미지 내용이 바뀌면 달라지는 digest, 이미지가 없으면 None
+
+    이미지를 다시 내려받지 않도록 minio는 object etag, 파일은 경로, 수정 시각, 크기로 만든다.
+    같은 경로에 다시 upload 해도 etag, 수정 시각이 바뀌므로 이전 값을 사용하지 않는다.
+    """
+    if settings.USE_MINIO:
+        etag = minio_client.get_etag(
+            "/".join([image_id, Path(image_path).name]), settings.MINIO_IMAGE_BUCKET
+        )
+        if etag is None:
+            return None
+        source_key = f"minio|{etag}"
+    else:
+        try:
+            source_key = str(get_source_key(image_path))
+        except FileNotFoundError:
+            return None
+    return hashlib.sha256(source_key.encode("utf-8")).hexdigest()
+
+
+def get_crop_image(
+    image: Image, format: str, crop: List[ImageCropBbox], scale: Optional[float] = None
+) -> List[Dict[int, str]]:
     crop_images = list()
     image_size = image.size
     
@@ -211,6 +407,14 @@ def get_crop_image(image: Image, format: str, crop: List[ImageCropBbox]) -> List
     for cropBbox in crop:
         bbox = cropBbox.bbox
         crop_area = (bbox.x, bbox.y, bbox.x + bbox.w, bbox.y + bbox.h)
+        if scale:
+            # 원본 좌표를 축소한 이미지 좌표로 변환, 반올림으로 넘친 끝 좌표는 이미지 크기로 제한
+            crop_area = (
+                round(crop_area[0] * scale),
+                round(crop_area[1] * scale),
+                min(round(crop_area[2] * scale), image_size[0]),
+                min(round(crop_area[3] * scale), image_size[1]),
+            )
         
         if is_cropBbox_in_range(image_size, crop_area) is False:
             break
@@ -0,0 +1,97 @@
+import os
+import hashlib
+import threading
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple, Union
+from prometheus_client import Counter, Gauge
+
+from app.common.const import get_settings
+
+
+settings = get_settings()
+
+image_cache_requests_total = Counter(
+    "textscope_image_cache_requests_total",
+    "Decoded image cache lookups",
+    ["kind", "result"],
+)
+image_cache_evictions_total = Counter(
+    "textscope_image_cache_evictions_total",
+    "Entries evicted from the decoded image cache to stay under the byte budget",
+)
+image_cache_bytes = Gauge(
+    "textscope_image_cache_bytes",
+    "Estimated size of entries in the decoded image cache",
+)
+
+
+def get_bytes_digest(image_bytes: bytes) -> str:
+    """cache key로 사용할 이미지 bytes digest, sha256보다 빠른 blake2b 사용"""
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+
+def get_source_key(source: Union[bytes, str, Path]) -> Hashable:
+    """bytes는 digest, 파일은 경로, 수정 시각, 크기로 구분해서 같은 경로의 파일이 바뀌면 다른 key"""
+    if isinstance(source, bytes):
+        return get_bytes_digest(source)
+    stat = os.stat(source)
+    return (str(Path(source).resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def get_image_nbytes(image: Any) -> int:
+    """PIL image가 memory에서 차지하는 대략적인 크기"""
+    width, height = image.size
+    return width * height * len(image.getbands())
+
+
+class DecodedImageCache:
+    """
+    decode한 page(PIL image)와 그 파생 결과를 저장하는 LRU cache
+
+    entry 수가 아닌 추정 byte 합계로 크기를 제한하며, max_bytes보다 큰 entry는 저장하지 않는다.
+    """
+
+    def __init__(self, max_bytes: int = settings.IMAGE_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, kind: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        image_cache_requests_total.labels(
+            kind=kind, result="miss" if entry is None else "hit"
+        ).inc()
+        return None if entry is None else entry[0]
+
+    def set(self, key: Hashable, value: Any, nbytes: int) -> None:
+        if value is None or nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_nbytes
+                image_cache_evictions_total.inc()
+            image_cache_bytes.set(self.nbytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            image_cache_bytes.set(0)
+
+
+image_cache = DecodedImageCache()
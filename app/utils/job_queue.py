@@ -0,0 +1,224 @@
+import json
+import time
+import asyncio
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+
+from app.common.const import get_settings
+from app.utils.redis_client import get_redis
+
+
+settings = get_settings()
+
+JOB_STATUS: Dict[str, Tuple[str, str, float]] = {
+    "queued": ("ST-INF-0001", "inference task 대기", 0.0),
+    "running": ("ST-INF-0002", "inference task 진행 중", 0.5),
+    "done": ("ST-INF-0003", "inference task 완료", 1.0),
+    "failed": ("ST-INF-0004", "inference task 실패", 1.0),
+}
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def make_job_status(status: str, **kwargs: Any) -> Dict:
+    status_code, status_message, progress = JOB_STATUS[status]
+    job_status = dict(
+        status=status,
+        status_code=status_code,
+        status_message=status_message,
+        progress=progress,
+        updated_datetime=datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+    )
+    job_status.update(kwargs)
+    return jsonable_encoder(job_status)
+
+
+class LocalJobQueue:
+    """
+    api process 안의 asyncio.Queue를 사용하는 job queue
+
+    job과 상태가 process 안에만 있으므로 api process가 여러 개면 다른 process로 간
+    조회 요청은 상태를 찾을 수 없다. ALLOW_LOCAL_JOB_QUEUE 설정으로만 사용한다.
+    """
+
+    is_shared = False
+
+    @property
+    def accepts_jobs(self) -> bool:
+        return settings.ALLOW_LOCAL_JOB_QUEUE
+
+    def __init__(
+        self,
+        max_size: int = settings.JOB_QUEUE_MAX_SIZE,
+        status_ttl: int = settings.JOB_STATUS_TTL_SECOND,
+    ) -> None:
+        self.max_size = max_size
+        self.status_ttl = status_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._status: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        # event loop이 생성된 뒤에 queue 생성
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        return self._queue
+
+    async def put(self, job: Dict) -> None:
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull()
+
+    async def get(self) -> Dict:
+        return await self.queue.get()
+
+    async def ack(self, job: Dict) -> None:
+        pass
+
+    async def requeue_expired(self) -> List[Dict]:
+        return list()
+
+    async def set_status(self, task_id: str, status: Dict) -> None:
+        now = time.monotonic()
+        self._status.pop(task_id, None)
+        self._status[task_id] = (now + self.status_ttl, status)
+        while self._status:
+            expire_time, _ = next(iter(self._status.values()))
+            if expire_time > now:
+                break
+            self._status.popitem(last=False)
+
+    async def get_status(self, task_id: str) -> Optional[Dict]:
+        expire_time, status = self._status.get(task_id, (0.0, None))
+        if expire_time < time.monotonic():
+            return None
+        return status
+
+
+# 대기열 길이 확인과 등록을 한 번에 실행
+PUT_SCRIPT = """
+if redis.call('llen', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+return redis.call('rpush', KEYS[1], ARGV[2])
+"""
+
+# 처리 중 목록에서 꺼낸 job을 다시 등록(ARGV[2]가 비어 있으면 버림), 다른 worker가 먼저 옮겼으면 0
+REQUEUE_SCRIPT = """
+if redis.call('lrem', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('hdel', KEYS[2], ARGV[1])
+if ARGV[2] ~= '' then
+    redis.call('rpush', KEYS[3], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisJobQueue:
+    """
+    redis list를 사용하는 job queue, 별도 worker process(python -m app.worker)와 공유
+
+    꺼낸 job은 처리가 끝나 ack 할 때까지 처리 중 목록에 lease와 함께 남겨 두고,
+    worker가 죽어 lease가 만료된 job은 requeue_expired에서 JOB_MAX_ATTEMPTS 까지 다시 등록한다.
+    """
+
+    is_shared = True
+    accepts_jobs = True
+
+    def __init__(
+        self,
+        name: str = settings.JOB_QUEUE_NAME,
+        max_size: int = settings.JOB_QUEUE_MAX_SIZE,
+        status_ttl: int = settings.JOB_STATUS_TTL_SECOND,
+        lease_second: int = settings.JOB_LEASE_SECOND,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+    ) -> None:
+        self.name = name
+        self.processing_name = f"{name}:processing"
+        self.lease_name = f"{name}:leases"
+        self.max_size = max_size
+        self.status_ttl = status_ttl
+        self.lease_second = lease_second
+        self.max_attempts = max_attempts
+        # ack에 사용할 원본 job, task_id 기준
+        self._claimed: Dict[str, bytes] = dict()
+
+    async def put(self, job: Dict) -> None:
+        added = await get_redis().eval(
+            PUT_SCRIPT, 1, self.name, self.max_size, json.dumps(jsonable_encoder(job))
+        )
+        if not added:
+            raise JobQueueFull()
+
+    async def get(self) -> Dict:
+        redis = get_redis()
+        raw_job = await redis.blmove(self.name, self.processing_name, 0, "LEFT", "RIGHT")
+        await redis.hset(self.lease_name, raw_job, time.time() + self.lease_second)
+        job = json.loads(raw_job)
+        self._claimed[job.get("task_id", "")] = raw_job
+        return job
+
+    async def ack(self, job: Dict) -> None:
+        raw_job = self._claimed.pop(job.get("task_id", ""), None)
+        if raw_job is None:
+            return
+        redis = get_redis()
+        await redis.lrem(self.processing_name, 1, raw_job)
+        await redis.hdel(self.lease_name, raw_job)
+
+    async def requeue_expired(self) -> List[Dict]:
+        """lease가 만료된 job을 다시 등록하고, 시도 횟수를 넘은 job은 버린 뒤 반환"""
+        redis = get_redis()
+        now = time.time()
+        abandoned: List[Dict] = list()
+        for raw_job in await redis.lrange(self.processing_name, 0, -1):
+            lease = await redis.hget(self.lease_name, raw_job)
+            if lease is None:
+                # blmove 직후 lease를 기록하기 전일 수 있으므로 이번에는 lease만 기록
+                await redis.hsetnx(self.lease_name, raw_job, now + self.lease_second)
+                continue
+            if float(lease) > now:
+                continue
+            job = json.loads(raw_job)
+            job["attempts"] = job.get("attempts", 1) + 1
+            requeued_job = "" if job["attempts"] > self.max_attempts else json.dumps(job)
+            moved = await redis.eval(
+                REQUEUE_SCRIPT,
+                3,
+                self.processing_name,
+                self.lease_name,
+                self.name,
+                raw_job,
+                requeued_job,
+            )
+            if moved and not requeued_job:
+                abandoned.append(job)
+        return abandoned
+
+    async def set_status(self, task_id: str, status: Dict) -> None:
+        await get_redis().set(
+            f"{self.name}:status:{task_id}", json.dumps(status), ex=self.status_ttl
+        )
+
+    async def get_status(self, task_id: str) -> Optional[Dict]:
+        status = await get_redis().get(f"{self.name}:status:{task_id}")
+        return json.loads(status) if status is not None else None
+
+
+def get_job_queue(backend: str = settings.JOB_QUEUE_BACKEND) -> Any:
+    if backend == "redis":
+        return RedisJobQueue()
+    if backend == "local":
+        return LocalJobQueue()
+    raise ValueError(f"Unsupported job queue backend '{backend}'")
+
+
+job_queue = get_job_queue()
@@ -30,6 +30,20 @@ class MinioService:
     def _bucket_exists(self, bucket_name: str) -> bool:
         return self.client.bucket_exists(bucket_name)
 
+    def exists(self, object_name: str, bucket_name: str) -> bool:
+        try:
+            self.client.stat_object(bucket_name, object_name)
+            return True
+        except S3Error:
+            return False
+
+    def get_etag(self, object_name: str, bucket_name: str) -> Optional[str]:
+        """object를 내려받지 않고 etag만 조회, object가 없으면 None"""
+        try:
+            return self.client.stat_object(bucket_name, object_name).etag
+        except S3Error:
+            return None
+
     def put(self, object_name: str, bucket_name: str, data: bytes) -> bool:
         if not self._bucket_exists(bucket_name):
             logger.error(f"Error occur for not exist bucket '{bucket_name}'")
@@ -0,0 +1,109 @@
+import importlib.util
+import numpy as np
+
+from typing import Any, Dict, Optional
+
+from app.common.const import get_settings
+from app.utils.columnar import ColumnarResult
+
+
+settings = get_settings()
+is_msgpack_available = importlib.util.find_spec("msgpack") is not None
+
+MSGPACK_CONTENT_TYPE = "application/x-msgpack"
+JSON_CONTENT_TYPE = "application/json"
+# numpy array를 (dtype, shape, buffer)로 담는 msgpack extension type
+NDARRAY_EXT_TYPE = 1
+
+
+def _default(obj: Any) -> Any:
+    import msgpack
+
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            # python 객체 array(ColumnarResult.classes 등)는 buffer로 담을 수 없으므로 list로 전달
+            return obj.tolist()
+        array = np.ascontiguousarray(obj)
+        return msgpack.ExtType(
+            NDARRAY_EXT_TYPE,
+            msgpack.packb([array.dtype.str, list(array.shape), array.tobytes()]),
+        )
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, ColumnarResult):
+        return obj.to_arrays()
+    raise TypeError(f"Cannot serialize {type(obj)}")
+
+
+def _ext_hook(code: int, data: bytes, as_list: bool) -> Any:
+    import msgpack
+
+    if code != NDARRAY_EXT_TYPE:
+        return msgpack.ExtType(code, data)
+    dtype, shape, buffer = msgpack.unpackb(data)
+    array = np.frombuffer(buffer, dtype=np.dtype(dtype)).reshape(shape)
+    return array.tolist() if as_list else array
+
+
+def packb(obj: Any) -> bytes:
+    """numpy array, ColumnarResult를 buffer 그대로 담는 msgpack encoding"""
+    import msgpack
+
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes, as_list: bool = True) -> Any:
+    """
+    packb로 만든 payload decoding
+
+    as_list=True이면 numpy array를 list로 돌려줘서 json 결과와 같은 형태로 사용할 수 있다.
+    """
+    import msgpack
+
+    return msgpack.unpackb(
+        data,
+        raw=False,
+        strict_map_key=False,
+        ext_hook=lambda code, ext_data: _ext_hook(code, ext_data, as_list),
+    )
+
+
+def use_binary_payload(upstream: str) -> bool:
+    if not (settings.USE_BINARY_PAYLOAD and is_msgpack_available):
+        return False
+    return not settings.BINARY_PAYLOAD_UPSTREAMS or upstream in settings.BINARY_PAYLOAD_UPSTREAMS
+
+
+def encode_request(kwargs: Dict[str, Any], upstream: str) -> Dict[str, Any]:
+    """
+    binary payload를 지원하는 upstream이면 json 인자를 msgpack body로 바꿔서 전달
+
+    Accept header로 msgpack 응답을 요청하고, 응답 형식은 read_json에서 Content-Type으로 판단한다.
+    """
+    if "json" not in kwargs or not use_binary_payload(upstream):
+        return kwargs
+    request_kwargs = dict(kwargs)
+    headers = dict(request_kwargs.get("headers") or {})
+    headers.update(
+        {
+            "Content-Type": MSGPACK_CONTENT_TYPE,
+            "Accept": f"{MSGPACK_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.9",
+        }
+    )
+    request_kwargs.update(content=packb(request_kwargs.pop("json")), headers=headers)
+    return request_kwargs
+
+
+def read_json(response: Any, as_list: bool = True) -> Any:
+    """
+    upstream 응답의 Content-Type에 따라 msgpack 또는 json body decoding
+
+    stage 결과는 hint 적용, stage cache, recording, response 생성에서 json list로 다루므로
+    기본값(as_list=True)으로 list를 돌려준다. binary payload는 전송 크기와 json parsing을
+    줄이는 용도이고, ColumnarResult는 stage 안에서 box 단위 처리(kv merge, response 생성)에만 사용한다.
+    """
+    headers: Optional[Dict] = getattr(response, "headers", None)
+    content_type = headers.get("content-type", "") if headers is not None else ""
+    if content_type.startswith(MSGPACK_CONTENT_TYPE):
+        return unpackb(response.content, as_list=as_list)
+    return response.json()
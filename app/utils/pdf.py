@@ -0,0 +1,168 @@
+import os
+import math
+import weakref
+import tempfile
+import threading
+
+from PIL import Image
+from pathlib import Path
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple, Union
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdfdocument import PDFDocument
+
+from app.common.const import get_settings
+from app.utils.image_cache import get_source_key
+from app.utils.rasterizer import rasterizer
+
+
+settings = get_settings()
+
+POINTS_PER_INCH = 72
+
+
+@dataclass
+class PdfPageInfo:
+    """media box 크기(point), 회전(Rotate)을 반영한 page 정보"""
+
+    width: float
+    height: float
+    rotate: int = 0
+
+    def get_pixel_size(self, dpi: int) -> Tuple[int, int]:
+        """pdftoppm이 dpi로 그렸을 때의 이미지 크기"""
+        return (
+            math.ceil(self.width * dpi / POINTS_PER_INCH),
+            math.ceil(self.height * dpi / POINTS_PER_INCH),
+        )
+
+    def get_render_dpi(self, dpi: int, max_side: int = 0) -> int:
+        """긴 변이 max_side(0이면 제한 없음) 이하가 되도록 낮춘 dpi"""
+        longest = max(self.width, self.height)
+        if max_side <= 0 or longest <= 0:
+            return dpi
+        return max(1, min(dpi, int(max_side * POINTS_PER_INCH / longest)))
+
+
+def read_page_info(page: PDFPage) -> PdfPageInfo:
+    x0, y0, x1, y1 = page.mediabox
+    width, height = abs(x1 - x0), abs(y1 - y0)
+    if page.rotate in (90, 270):
+        width, height = height, width
+    return PdfPageInfo(width=width, height=height, rotate=page.rotate)
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class PdfDocument:
+    """
+    pdf 파일 하나의 page service
+
+    열 때 page tree만 읽어서 page 수, media box 크기를 rasterize 없이 제공하고
+    요청한 page만 rasterizer(pdftoppm)로 그린다. bytes로 열면 임시 파일에 한 번만 쓰고 재사용한다.
+    """
+
+    def __init__(self, source: Union[bytes, str, Path]) -> None:
+        if isinstance(source, bytes):
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+                f.write(source)
+            self.path = f.name
+            # 진행 중인 render가 있을 수 있으므로 cache에서 밀려나도 참조가 모두 사라진 후 삭제
+            weakref.finalize(self, remove_file, self.path)
+        else:
+            self.path = str(source)
+        with open(self.path, "rb") as fp:
+            document = PDFDocument(PDFParser(fp))
+            self.pages: List[PdfPageInfo] = [
+                read_page_info(page) for page in PDFPage.create_pages(document)
+            ]
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def get_page_info(self, page: int) -> PdfPageInfo:
+        """1부터 시작하는 page의 정보, 범위를 벗어나면 IndexError"""
+        if not 1 <= page <= self.page_count:
+            raise IndexError(f"page {page} out of range ({self.page_count} pages)")
+        return self.pages[page - 1]
+
+    def get_render_dpi(
+        self, page: int, dpi: Optional[int] = None, max_side: Optional[int] = None
+    ) -> int:
+        return self.get_page_info(page).get_render_dpi(
+            settings.PDF_RENDER_DPI if dpi is None else dpi,
+            settings.PDF_RENDER_MAX_SIDE if max_side is None else max_side,
+        )
+
+    def get_page_size(
+        self, page: int, dpi: Optional[int] = None, max_side: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """render_page 결과 이미지의 (width, height), page를 그리지 않고 계산"""
+        return self.get_page_info(page).get_pixel_size(
+            self.get_render_dpi(page, dpi, max_side)
+        )
+
+    def render_page(
+        self,
+        page: int = 1,
+        dpi: Optional[int] = None,
+        max_side: Optional[int] = None,
+        fmt: str = "ppm",
+    ) -> Image.Image:
+        return rasterizer.render(
+            self.path, page, self.get_render_dpi(page, dpi, max_side), fmt
+        )
+
+
+class PdfDocumentCache:
+    """최근 사용한 PdfDocument를 파일 단위로 유지"""
+
+    def __init__(self, max_size: int = settings.PDF_DOCUMENT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._documents: "OrderedDict[Hashable, PdfDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source: Union[bytes, str, Path]) -> PdfDocument:
+        key = get_source_key(source)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                return document
+        document = PdfDocument(source)
+        with self._lock:
+            document = self._documents.setdefault(key, document)
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+        return document
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+
+
+pdf_document_cache = PdfDocumentCache()
+
+
+def get_pdf_document(source: Union[bytes, str, Path]) -> PdfDocument:
+    return pdf_document_cache.get(source)
+
+
+def get_pdf_page_count(source: Union[bytes, str, Path]) -> int:
+    return get_pdf_document(source).page_count
+
+
+def render_pdf_page(
+    source: Union[bytes, str, Path], page: int = 1, **kwargs: Any
+) -> Image.Image:
+    """1부터 시작하는 page 하나만 그린 이미지"""
+    return get_pdf_document(source).render_page(page, **kwargs)
@@ -3,7 +3,6 @@ import glob
 import copy
 import argparse
 import uuid
-import pdf2image
 import numpy as np
 import xml.etree.ElementTree as ET
 
@@ -22,6 +21,7 @@ from pdfminer.pdfdocument import PDFDocument
 
 from app.wrapper import settings
 from app.utils.minio import MinioService
+from app.utils.pdf import get_pdf_document
 
 
 minio_client = MinioService()
@@ -131,7 +131,7 @@ class Pdf2Image:
         resized[:, 3] = resized[:, 3] * h_ratio
         return resized.tolist()
 
-    def read_xml(self, xml_path: str, page_num: int, page_size: List) -> Dict:
+    def read_xml(self, xml_path: str, page_num: int, page_size: Tuple[int, int]) -> Dict:
         bboxes = list()
         texts = list()
 
@@ -177,12 +177,6 @@ def parse_pdf_text(text_info: Dict) -> Dict:
     }
 
 
-@lru_cache(maxsize=10)
-def convert_path_to_image(pdf_path: str) -> List:
-    pages = pdf2image.convert_from_path(pdf_path=pdf_path)
-    return pages
-
-
 def get_pdf_text_info(inputs: Dict) -> Tuple[Dict, Tuple[int, int]]:
     xml_path = PurePath("/tmp", str(uuid.uuid4()) + ".xml").as_posix()
     
@@ -210,11 +204,11 @@ def get_pdf_text_info(inputs: Dict) -> Tuple[Dict, Tuple[int, int]]:
     parsed_text_info = {}
     image_size = (0, 0)
     if len(textbox) > 0:
-        pages = convert_path_to_image(pdf_path=pdf_path)
-        text_info = pdf2txt(
-            pages=pages, page_num=page_num, pdf_path=pdf_path, xml_path=xml_path
+        # page를 그리지 않고 media box로 render 했을 때의 크기 계산
+        image_size = get_pdf_document(pdf_path).get_page_size(page_num + 1)
+        text_info = pdf2txt.read_xml(
+            xml_path=xml_path, page_num=page_num, page_size=image_size
         )
-        image_size = pages[page_num].size
         
         parsed_text_info.update(parse_pdf_text(text_info))
         parsed_text_info.update(dict({
@@ -259,7 +253,8 @@ if __name__ == "__main__":
     profiler.start()
 
     pdf2txt.save_xml(fname=args.pdf_path, xml_path=args.xml_path)
-    pages = pdf2image.convert_from_path(pdf_path=args.pdf_path)
+    pdf_document = get_pdf_document(args.pdf_path)
+    pages = [pdf_document.render_page(page) for page in range(1, pdf_document.page_count + 1)]
     text_info = pdf2txt(
         pages=pages,
         page_num=args.page_num,
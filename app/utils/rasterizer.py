@@ -0,0 +1,126 @@
+import os
+import time
+import threading
+import subprocess
+
+from io import BytesIO
+from PIL import Image
+from typing import Dict, List, Optional
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.common.const import get_settings
+from app.utils.tracing import span
+
+
+settings = get_settings()
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+pdf_rasterize_seconds = Histogram(
+    "textscope_pdf_rasterize_seconds",
+    "Time spent rendering one pdf page with pdftoppm",
+    ["result"],
+    buckets=LATENCY_BUCKETS,
+)
+pdf_rasterize_wait_seconds = Histogram(
+    "textscope_pdf_rasterize_wait_seconds",
+    "Time spent waiting for a free rasterizer worker",
+    buckets=LATENCY_BUCKETS,
+)
+pdf_rasterizer_processes_total = Counter(
+    "textscope_pdf_rasterizer_processes_total",
+    "pdftoppm processes started by the rasterizer",
+    ["result"],
+)
+pdf_rasterizer_in_flight = Gauge(
+    "textscope_pdf_rasterizer_in_flight",
+    "pdftoppm processes currently running",
+)
+
+# pdftoppm 출력 format option
+FORMAT_OPTIONS: Dict[str, List[str]] = {
+    "ppm": [],
+    "jpeg": ["-jpeg"],
+    "jpg": ["-jpeg"],
+    "png": ["-png"],
+}
+
+
+class PdfRasterizeError(Exception):
+    pass
+
+
+class PdfRasterizer:
+    """
+    pdf page rendering(pdftoppm)을 worker 수만큼만 동시에 실행
+
+    pdf2image와 달리 page 수 확인용 pdfinfo를 따로 실행하지 않고,
+    output file 없이 실행한 pdftoppm의 stdout pipe에서 page 이미지를 바로 읽는다.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.PDF_RASTERIZER_WORKERS,
+        timeout: float = settings.PDF_RASTERIZER_TIMEOUT_SECOND,
+        poppler_path: Optional[str] = settings.POPPLER_PATH,
+    ) -> None:
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.command = os.path.join(poppler_path, "pdftoppm") if poppler_path else "pdftoppm"
+        self._workers = threading.BoundedSemaphore(max_workers)
+
+    def build_command(self, pdf_path: str, page: int, dpi: int, fmt: str) -> List[str]:
+        if fmt not in FORMAT_OPTIONS:
+            raise ValueError(f"{fmt} is not supported format")
+        return [
+            self.command,
+            "-f", str(page),
+            "-l", str(page),
+            "-r", str(dpi),
+            *FORMAT_OPTIONS[fmt],
+            pdf_path,
+        ]
+
+    def render(self, pdf_path: str, page: int, dpi: int, fmt: str = "ppm") -> Image.Image:
+        command = self.build_command(pdf_path, page, dpi, fmt)
+        wait_start_time = time.perf_counter()
+        with self._workers, span("pdf_rasterize", page=page, dpi=dpi):
+            pdf_rasterize_wait_seconds.observe(time.perf_counter() - wait_start_time)
+            page_bytes = self._run(command)
+        image = Image.open(BytesIO(page_bytes))
+        image.load()
+        return image
+
+    def _run(self, command: List[str]) -> bytes:
+        start_time = time.perf_counter()
+        result = "success"
+        pdf_rasterizer_in_flight.inc()
+        try:
+            process = subprocess.run(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=self.timeout,
+            )
+            if process.returncode != 0 or not process.stdout:
+                result = "error"
+                raise PdfRasterizeError(
+                    process.stderr.decode("utf-8", errors="ignore").strip()
+                    or f"pdftoppm exited with {process.returncode}"
+                )
+            return process.stdout
+        except subprocess.TimeoutExpired as exc:
+            result = "timeout"
+            raise PdfRasterizeError(f"pdftoppm timed out after {self.timeout}s") from exc
+        except OSError as exc:
+            result = "error"
+            raise PdfRasterizeError(f"Cannot run {self.command}") from exc
+        finally:
+            pdf_rasterizer_in_flight.dec()
+            pdf_rasterizer_processes_total.labels(result=result).inc()
+            pdf_rasterize_seconds.labels(result=result).observe(
+                time.perf_counter() - start_time
+            )
+
+
+rasterizer = PdfRasterizer()
@@ -0,0 +1,150 @@
+import copy
+import gzip
+import json
+import time
+import uuid
+import random
+import threading
+
+from pathlib import Path
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Union
+from urllib.parse import urlsplit
+
+from app.common.const import get_settings
+from app.utils.logging import logger
+
+
+settings = get_settings()
+
+RECORDING_VERSION = 1
+RECORDING_SUFFIX = ".json.gz"
+
+
+class Recording:
+    """
+    ocr 요청 하나의 pipeline 입력과 upstream(serving, pp) 요청/응답 기록
+
+    upstream은 host를 제외한 path로 저장해서 다른 환경에서도 replay 할 수 있다.
+    """
+
+    def __init__(self, inputs: Dict, pipeline: Optional[str] = None) -> None:
+        self.inputs = copy.deepcopy(inputs)
+        self.pipeline = pipeline or settings.USE_OCR_PIPELINE
+        self.calls: List[Dict[str, Any]] = list()
+        self._lock = threading.Lock()
+
+    def add_call(
+        self, url: str, request: Any, status_code: int, response: Any, latency: float
+    ) -> None:
+        call = dict(
+            path=urlsplit(url).path,
+            request=copy.deepcopy(request),
+            status_code=status_code,
+            response=copy.deepcopy(response),
+            latency=latency,
+        )
+        with self._lock:
+            self.calls.append(call)
+
+    def to_dict(self, result: Any = None) -> Dict[str, Any]:
+        return dict(
+            version=RECORDING_VERSION,
+            recorded_at=time.time(),
+            pipeline=self.pipeline,
+            inputs=self.inputs,
+            calls=self.calls,
+            result=result,
+        )
+
+
+# contextvar는 asyncio task, run_in_threadpool로 실행한 sync pipeline에도 복사된다
+_recording: ContextVar[Optional[Recording]] = ContextVar("pipeline_recording", default=None)
+
+
+@contextmanager
+def recording_scope(inputs: Dict) -> Iterator[Optional[Recording]]:
+    """USE_PIPELINE_RECORDING이고 sampling 되면 안에서 보낸 upstream 요청을 기록"""
+    if not settings.USE_PIPELINE_RECORDING or (
+        random.random() >= settings.PIPELINE_RECORDING_SAMPLE_RATE
+    ):
+        yield None
+        return
+    recording = Recording(inputs)
+    token = _recording.set(recording)
+    try:
+        yield recording
+    finally:
+        _recording.reset(token)
+
+
+def is_recording() -> bool:
+    """
+    현재 요청을 기록 중인지 여부
+
+    stage cache, 로컬 charset 변환처럼 upstream 요청 없이 처리하면 기록이 빠져서
+    replay 할 수 없으므로 기록 중에는 upstream으로 요청한다.
+    """
+    return _recording.get() is not None
+
+
+def record_call(url: str, kwargs: Dict, response: Any, latency: float) -> None:
+    """upstream 응답을 현재 recording에 추가, json 인자가 없는 요청은 기록하지 않는다"""
+    recording = _recording.get()
+    if recording is None or "json" not in kwargs:
+        return
+    from app.utils.payload import read_json
+
+    try:
+        recording.add_call(
+            url, kwargs["json"], response.status_code, read_json(response), latency
+        )
+    except Exception:
+        logger.warning(f"Cannot record upstream call to {url}")
+
+
+def get_result_content(result: Any) -> Any:
+    """run_ocr 결과(dict 또는 JSONResponse)를 json으로 저장할 수 있는 형태로 변환"""
+    if isinstance(result, dict):
+        return result
+    body = getattr(result, "body", None)
+    if body is None:
+        return None
+    return dict(status_code=result.status_code, body=json.loads(body))
+
+
+def save_recording(
+    recording: Recording,
+    result: Any = None,
+    path: Union[str, Path] = settings.PIPELINE_RECORDING_PATH,
+) -> Optional[Path]:
+    """gzip 압축한 json으로 저장"""
+    record_path = Path(path)
+    name = recording.inputs.get("task_id") or uuid.uuid4().hex
+    recording_file = record_path.joinpath(f"{name}{RECORDING_SUFFIX}")
+    try:
+        record_path.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(
+            recording.to_dict(get_result_content(result)),
+            ensure_ascii=False,
+            default=str,
+        )
+        with gzip.open(recording_file, "wt", encoding="utf-8") as f:
+            f.write(data)
+    except Exception:
+        logger.warning(f"Cannot save pipeline recording '{recording_file}'")
+        return None
+    return recording_file
+
+
+def load_recording(recording_file: Union[str, Path]) -> Dict[str, Any]:
+    with gzip.open(recording_file, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_recordings(path: Union[str, Path]) -> List[Path]:
+    path = Path(path)
+    if path.is_file():
+        return [path]
+    return sorted(path.glob(f"*{RECORDING_SUFFIX}"))
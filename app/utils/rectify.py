@@ -0,0 +1,94 @@
+import hashlib
+
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.common.const import get_settings
+from app.utils.logging import logger
+from app.utils.tracing import traced
+
+
+settings = get_settings()
+
+RECTIFIED_IMAGE_KEY = "rectified_image"
+
+
+def get_rectified_filename(image_digest: str, page: int, angle: float) -> str:
+    return f"rectified_{image_digest}_{page}_{angle:g}.{settings.RECTIFIED_IMAGE_FORMAT}"
+
+
+@traced("rectify")
+def materialize_rectified_image(image_id: str, image_path: str, page: int, angle: float) -> str:
+    """
+    page를 angle만큼 회전한 이미지를 원본 옆(같은 image_id)에 저장하고 경로 반환
+
+    파일 이름이 이미지 digest, page, angle로 정해지므로 이미 있으면 decode, 회전 없이 그대로 사용한다.
+    같은 경로에 다시 올린 이미지도 구분하도록 digest는 매번 현재 bytes로 계산한다.
+    """
+    from app.utils.image import minio_client, get_image_bytes, read_image_from_bytes
+
+    image_bytes = get_image_bytes(image_id, Path(image_path))
+    if image_bytes is None:
+        raise FileNotFoundError(image_path)
+    rectified_path = Path(image_path).with_name(
+        get_rectified_filename(hashlib.sha256(image_bytes).hexdigest(), page, angle)
+    )
+    object_name = "/".join([image_id, rectified_path.name])
+    if settings.USE_MINIO:
+        if minio_client.exists(object_name, settings.MINIO_IMAGE_BUCKET):
+            return str(rectified_path)
+    elif rectified_path.exists():
+        return str(rectified_path)
+
+    image = read_image_from_bytes(image_bytes, Path(image_path).name, angle, page)
+    if image is None:
+        raise ValueError(f"Cannot read page:{page} in {image_path}")
+    buffered = BytesIO()
+    image.save(buffered, settings.RECTIFIED_IMAGE_FORMAT)
+
+    if settings.USE_MINIO:
+        if not minio_client.put(
+            object_name, settings.MINIO_IMAGE_BUCKET, buffered.getvalue()
+        ):
+            raise IOError(f"Cannot upload rectified image '{object_name}'")
+    else:
+        # 다른 요청이 쓰는 중인 파일을 읽지 않도록 임시 파일에 쓴 후 이름 변경
+        temp_path = rectified_path.with_name(f".{rectified_path.name}.tmp")
+        temp_path.write_bytes(buffered.getvalue())
+        temp_path.replace(rectified_path)
+    return str(rectified_path)
+
+
+def rectify_image(inputs: Dict) -> Optional[Dict]:
+    """
+    rotate 결과 angle로 회전한 page를 만들고 downstream이 읽을 이미지로 inputs에 기록
+
+    만들지 못하면 None, downstream은 이전처럼 원본 이미지와 angle을 받는다.
+    """
+    angle = inputs.get("angle")
+    if not settings.USE_RECTIFIED_IMAGE or not angle:
+        return None
+    try:
+        rectified_path = materialize_rectified_image(
+            inputs.get("image_id", ""),
+            str(inputs.get("image_path", "")),
+            int(inputs.get("page") or 1),
+            float(angle),
+        )
+    except Exception:
+        logger.warning(f"Cannot make rectified image for {inputs.get('image_path')}")
+        return None
+    rectified = dict(image_path=rectified_path, page=1, angle=0.0)
+    inputs[RECTIFIED_IMAGE_KEY] = rectified
+    return rectified
+
+
+def with_rectified_image(inputs: Dict) -> Dict:
+    """downstream 요청에 사용할 inputs, 회전한 이미지가 있으면 image_path, page, angle을 바꾼다"""
+    rectified = inputs.get(RECTIFIED_IMAGE_KEY)
+    if rectified is None:
+        return inputs
+    source = {key: value for key, value in inputs.items() if key != RECTIFIED_IMAGE_KEY}
+    source.update(rectified)
+    return source
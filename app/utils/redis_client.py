@@ -0,0 +1,32 @@
+import importlib.util
+
+from typing import Any, Optional
+
+from app.common.const import get_settings
+
+
+settings = get_settings()
+is_redis_available = importlib.util.find_spec("redis") is not None
+
+_redis: Optional[Any] = None
+
+
+def get_redis() -> Any:
+    """REDIS_IP_ADDR, REDIS_IP_PORT로 연결하는 redis.asyncio client"""
+    global _redis
+    if not is_redis_available:
+        raise RuntimeError("redis package is required to use redis backend")
+    if _redis is None:
+        import redis.asyncio  # type: ignore
+
+        _redis = redis.asyncio.Redis(
+            host=settings.REDIS_IP_ADDR, port=settings.REDIS_IP_PORT
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
@@ -0,0 +1,147 @@
+import copy
+import json
+import uuid
+import asyncio
+import hashlib
+
+from typing import Any, Awaitable, Callable, Dict
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Counter
+
+from app.common.const import get_settings
+from app.utils.deadline import remaining_timeout
+from app.utils.redis_client import get_redis
+
+
+settings = get_settings()
+
+single_flight_requests_total = Counter(
+    "textscope_single_flight_requests_total",
+    "OCR requests by single-flight result (leader, coalesced, remote)",
+    ["result"],
+)
+
+
+def get_request_fingerprint(inputs: Dict) -> str:
+    """
+    같은 ocr 결과를 만드는 요청을 같은 값으로 만드는 fingerprint
+
+    task_id처럼 요청마다 달라지는 key와 값이 None인 key는 제외하고, 사용하는 pipeline을 포함한다.
+    """
+    fingerprint_inputs = {
+        key: value
+        for key, value in inputs.items()
+        if key not in settings.SINGLE_FLIGHT_IGNORE_KEYS and value is not None
+    }
+    fingerprint_inputs["pipeline"] = settings.USE_OCR_PIPELINE
+    payload = json.dumps(
+        jsonable_encoder(fingerprint_inputs), sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LocalSingleFlight:
+    """
+    process 안에서 같은 key로 동시에 들어온 요청을 한 번만 실행
+
+    먼저 들어온 요청(leader)만 call을 실행하고 나머지는 leader의 결과를 복사해서 받는다.
+    leader가 취소되면 기다리던 요청 중 하나가 다시 실행한다.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Future] = dict()
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.run(key, call)
+            single_flight_requests_total.labels(result="coalesced").inc()
+            return copy.deepcopy(result) if isinstance(result, dict) else result
+
+        future = asyncio.get_event_loop().create_future()
+        # 기다리는 요청이 없을 때 exception이 조회되지 않았다는 경고 방지
+        future.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self._calls[key] = future
+        try:
+            result = await self._execute(key, call)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    async def _execute(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        single_flight_requests_total.labels(result="leader").inc()
+        return await call()
+
+
+class RedisSingleFlight(LocalSingleFlight):
+    """
+    redis lock으로 여러 worker process 사이에서도 같은 key의 요청을 한 번만 실행
+
+    lock을 얻은 worker가 실행한 성공 결과(dict)를 SINGLE_FLIGHT_RESULT_TTL_SECOND 동안 저장하고,
+    나머지 worker는 결과가 저장되거나 lock이 풀릴 때까지 polling 한다.
+    """
+
+    def __init__(
+        self,
+        name: str = settings.SINGLE_FLIGHT_NAME,
+        result_ttl: float = settings.SINGLE_FLIGHT_RESULT_TTL_SECOND,
+        poll_interval_ms: float = settings.SINGLE_FLIGHT_POLL_INTERVAL_MS,
+    ) -> None:
+        super().__init__()
+        self.name = name
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval_ms / 1000
+        self.owner = uuid.uuid4().hex
+
+    async def _execute(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        redis = get_redis()
+        lock_key = f"{self.name}:{key}:lock"
+        result_key = f"{self.name}:{key}:result"
+        while True:
+            result = await redis.get(result_key)
+            if result is not None:
+                single_flight_requests_total.labels(result="remote").inc()
+                return json.loads(result)
+            if await redis.set(
+                lock_key, self.owner, nx=True, px=int(settings.TIMEOUT_SECOND * 1000)
+            ):
+                break
+            # 기다리는 시간도 요청의 deadline 안에서만
+            await asyncio.sleep(min(self.poll_interval, remaining_timeout()))
+
+        try:
+            result = await super()._execute(key, call)
+            if isinstance(result, dict):
+                await redis.set(
+                    result_key,
+                    json.dumps(jsonable_encoder(result), ensure_ascii=False),
+                    px=int(self.result_ttl * 1000),
+                )
+            return result
+        finally:
+            await redis.delete(lock_key)
+
+
+def get_single_flight(backend: str = settings.SINGLE_FLIGHT_BACKEND) -> Any:
+    if backend == "redis":
+        return RedisSingleFlight()
+    if backend == "local":
+        return LocalSingleFlight()
+    raise ValueError(f"Unsupported single flight backend '{backend}'")
+
+
+single_flight = get_single_flight()
@@ -0,0 +1,223 @@
+import os
+import copy
+import pickle
+import asyncio
+import hashlib
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+from prometheus_client import Counter
+
+from app.common.const import get_settings
+from app.utils.logging import logger
+from app.utils.recording import is_recording
+from app.utils.tracing import span
+
+
+settings = get_settings()
+
+stage_cache_requests_total = Counter(
+    "textscope_stage_cache_requests_total",
+    "Stage result cache lookups",
+    ["stage", "result"],
+)
+
+
+class StageCache:
+    """
+    이미지 내용 기준으로 pipeline stage 결과를 저장하는 cache
+
+    key는 이미지 digest, page, angle, stage, route(model) 이름으로 구성하며
+    memory(LRU) tier를 먼저 조회하고 disk_path가 있으면 disk tier를 조회한다.
+    disk tier는 시작할 때 한 번만 directory를 읽고 이후에는 사용 순서를 memory에서 관리해서
+    저장할 때마다 directory 전체를 조회하지 않는다.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.STAGE_CACHE_MAX_SIZE,
+        disk_path: Optional[str] = settings.STAGE_CACHE_DISK_PATH,
+        disk_max_entries: int = settings.STAGE_CACHE_DISK_MAX_ENTRIES,
+        version: str = settings.STAGE_CACHE_VERSION,
+    ) -> None:
+        self.max_size = max_size
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.disk_max_entries = disk_max_entries
+        self.version = version
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        # disk tier key, 오래 사용하지 않은 순서
+        self._disk_keys: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_path is not None:
+            self.disk_path.mkdir(parents=True, exist_ok=True)
+            cache_files = sorted(
+                self.disk_path.glob("*.pkl"),
+                key=lambda cache_file: cache_file.stat().st_mtime_ns,
+            )
+            self._disk_keys.update((cache_file.stem, None) for cache_file in cache_files)
+
+    def make_key(
+        self,
+        image_digest: str,
+        page: Any,
+        angle: Any,
+        stage: str,
+        route_name: Optional[str],
+        extra: Optional[str] = None,
+    ) -> str:
+        key = "|".join(
+            str(part)
+            for part in (self.version, image_digest, page, angle, stage, route_name, extra)
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, stage: str) -> Optional[Any]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+        result = "memory_hit"
+        if value is None:
+            value = self._read_disk(key)
+            if value is not None:
+                self._set_memory(key, value)
+            result = "miss" if value is None else "disk_hit"
+        stage_cache_requests_total.labels(stage=stage, result=result).inc()
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        value = copy.deepcopy(value)
+        self._set_memory(key, value)
+        self._write_disk(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def _set_memory(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        if self.disk_path is None:
+            return None
+        cache_file = self.disk_path.joinpath(f"{key}.pkl")
+        try:
+            with cache_file.open("rb") as f:
+                value = pickle.load(f)
+            os.utime(cache_file)
+            self._touch_disk(key)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning(f"Cannot read stage cache '{cache_file}'")
+            return None
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        if self.disk_path is None:
+            return
+        cache_file = self.disk_path.joinpath(f"{key}.pkl")
+        temp_file = self.disk_path.joinpath(f"{key}.{threading.get_ident()}.tmp")
+        try:
+            with temp_file.open("wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, cache_file)
+            self._touch_disk(key)
+            self._evict_disk()
+        except Exception:
+            logger.warning(f"Cannot write stage cache '{cache_file}'")
+
+    def _touch_disk(self, key: str) -> None:
+        with self._lock:
+            self._disk_keys[key] = None
+            self._disk_keys.move_to_end(key)
+
+    def _evict_disk(self) -> None:
+        if self.disk_path is None:
+            return
+        with self._lock:
+            evicted_keys = list()
+            while len(self._disk_keys) > self.disk_max_entries:
+                evicted_keys.append(self._disk_keys.popitem(last=False)[0])
+        for key in evicted_keys:
+            self.disk_path.joinpath(f"{key}.pkl").unlink(missing_ok=True)
+
+
+stage_cache = StageCache()
+
+
+def get_stage_key(
+    inputs: Dict, stage: str, route_name: Optional[str], extra: Optional[str] = None
+) -> Optional[str]:
+    """입력 이미지의 stage cache key, 이미지를 읽을 수 없으면 None"""
+    from app.utils.image import get_image_digest
+
+    try:
+        image_digest = get_image_digest(
+            inputs.get("image_id", ""), str(inputs.get("image_path", ""))
+        )
+    except Exception:
+        logger.warning(f"Cannot make stage cache key for {inputs.get('image_path')}")
+        return None
+    if image_digest is None:
+        return None
+    return stage_cache.make_key(
+        image_digest, inputs.get("page"), inputs.get("angle"), stage, route_name, extra
+    )
+
+
+def is_cacheable(result: Dict) -> bool:
+    status_code = result.get("status_code", 200)
+    return 200 <= status_code < 400 and result.get("response") is not None
+
+
+def cached_call(
+    stage: str,
+    inputs: Dict,
+    route_name: Optional[str],
+    call: Callable[[], Dict],
+    extra: Optional[str] = None,
+) -> Dict:
+    """wrapper 호출 결과를 stage cache에서 찾고, 없으면 호출 후 저장"""
+    with span("stage", stage=stage, route=route_name or ""):
+        if not settings.USE_STAGE_CACHE or is_recording():
+            return call()
+        key = get_stage_key(inputs, stage, route_name, extra)
+        if key is None:
+            return call()
+        result = stage_cache.get(key, stage)
+        if result is None:
+            result = call()
+            if is_cacheable(result):
+                stage_cache.set(key, result)
+        return result
+
+
+async def async_cached_call(
+    stage: str,
+    inputs: Dict,
+    route_name: Optional[str],
+    call: Callable[[], Awaitable[Dict]],
+    extra: Optional[str] = None,
+) -> Dict:
+    with span("stage", stage=stage, route=route_name or ""):
+        if not settings.USE_STAGE_CACHE or is_recording():
+            return await call()
+        loop = asyncio.get_event_loop()
+        key = await loop.run_in_executor(
+            None, get_stage_key, inputs, stage, route_name, extra
+        )
+        if key is None:
+            return await call()
+        result = await loop.run_in_executor(None, stage_cache.get, key, stage)
+        if result is None:
+            result = await call()
+            if is_cacheable(result):
+                await loop.run_in_executor(None, stage_cache.set, key, result)
+        return result
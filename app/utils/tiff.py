@@ -0,0 +1,125 @@
+import threading
+import tifffile
+import numpy as np
+
+from io import BytesIO
+from pathlib import Path
+from PIL import Image
+from collections import OrderedDict
+from typing import Hashable, Optional, Union
+
+from app.common.const import get_settings
+from app.utils.image_cache import get_source_key
+
+
+settings = get_settings()
+
+
+def array_to_pillow(array: np.ndarray) -> Image.Image:
+    """
+    tifffile로 읽은 page를 PIL image로 변환
+
+    bilevel page는 bit 단위로 묶어 mode "1" image로 만들어서 page 크기의 정수 배열을 새로 만들지 않는다.
+    """
+    if array.dtype == np.bool_ and array.ndim == 2:
+        height, width = array.shape
+        return Image.frombytes("1", (width, height), np.packbits(array, axis=1).tobytes())
+    if array.dtype == np.bool_:
+        return Image.fromarray(array.view(np.uint8) * np.uint8(255))
+    return Image.fromarray(array.astype(np.uint8, copy=False))
+
+
+class TiffPageIndex:
+    """
+    multi-page tiff 하나의 page accessor
+
+    파일을 한 번만 열고 tifffile이 IFD chain을 따라가며 찾은 page offset을 그대로 유지하므로
+    page 수 확인과 이후 page 접근에서 파일을 다시 parse 하지 않고 요청한 page만 decode 한다.
+    """
+
+    def __init__(self, source: Union[bytes, str, Path]) -> None:
+        self._source = BytesIO(source) if isinstance(source, bytes) else str(source)
+        self._tiff = tifffile.TiffFile(self._source)
+        # TiffFile의 file handle은 thread safe 하지 않다
+        self._lock = threading.Lock()
+        self._page_count: Optional[int] = None
+
+    @property
+    def page_count(self) -> int:
+        with self._lock:
+            if self._page_count is None:
+                self._page_count = len(self._tiff.pages)
+            return self._page_count
+
+    def read_page(self, index: int) -> Image.Image:
+        """0부터 시작하는 index의 page, 범위를 벗어나면 IndexError"""
+        if not 0 <= index < self.page_count:
+            raise IndexError(f"page index {index} out of range ({self.page_count} pages)")
+        with self._lock:
+            try:
+                return array_to_pillow(self._tiff.pages[index].asarray())
+            except Exception:
+                # tifffile로 decode 할 수 없는 압축(CCITT 등)은 Pillow로 읽는다
+                return self._read_page_with_pillow(index)
+
+    def _read_page_with_pillow(self, index: int) -> Image.Image:
+        if isinstance(self._source, BytesIO):
+            self._source.seek(0)
+        with Image.open(self._source) as tiff_images:
+            tiff_images.seek(index)
+            tiff_images.load()
+            return tiff_images.copy()
+
+    def close(self) -> None:
+        with self._lock:
+            self._tiff.close()
+
+
+class TiffIndexCache:
+    """최근 사용한 TiffPageIndex를 파일 단위로 유지, 밀려난 index는 닫는다"""
+
+    def __init__(self, max_size: int = settings.TIFF_INDEX_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._indexes: "OrderedDict[Hashable, TiffPageIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source: Union[bytes, str, Path]) -> TiffPageIndex:
+        key = get_source_key(source)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        index = TiffPageIndex(source)
+        with self._lock:
+            if key in self._indexes:
+                # 다른 thread가 먼저 만든 index 사용
+                index.close()
+                index = self._indexes[key]
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_size:
+                _, evicted = self._indexes.popitem(last=False)
+                evicted.close()
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            for index in self._indexes.values():
+                index.close()
+            self._indexes.clear()
+
+
+tiff_index_cache = TiffIndexCache()
+
+
+def get_tiff_index(source: Union[bytes, str, Path]) -> TiffPageIndex:
+    return tiff_index_cache.get(source)
+
+
+def get_tiff_page_count(source: Union[bytes, str, Path]) -> int:
+    return get_tiff_index(source).page_count
+
+
+def read_tiff_page_with_index(source: Union[bytes, str, Path], page: int = 1) -> Image.Image:
+    """1부터 시작하는 page 하나만 decode"""
+    return get_tiff_index(source).read_page(page - 1)
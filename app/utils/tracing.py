@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import asyncio
+import functools
+import threading
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+from prometheus_client import Histogram
+
+from app.common.const import get_settings
+from app.utils.logging import logger
+
+
+settings = get_settings()
+
+span_duration_seconds = Histogram(
+    "textscope_span_duration_seconds",
+    "Duration of pipeline stages, upstream calls, image decodes and db writes",
+    ["name", "stage", "upstream", "doc_type", "customer"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+span_payload_bytes = Histogram(
+    "textscope_span_payload_bytes",
+    "Request/response body size of upstream calls",
+    ["name", "stage", "upstream", "direction"],
+    buckets=tuple(256 * 4 ** exponent for exponent in range(10)),
+)
+
+# OTLP span kind
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+# OTLP status code
+STATUS_CODE_ERROR = 2
+
+
+class Span:
+    """perf_counter로 측정한 구간 하나, customer, doc_type, stage, upstream tag를 가진다"""
+
+    def __init__(
+        self,
+        name: str,
+        stage: str,
+        upstream: str,
+        tags: Dict[str, Any],
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.stage = stage
+        self.upstream = upstream
+        self.tags = tags
+        self.trace_id: str = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.payload_bytes: Dict[str, int] = dict()
+        self.error: Optional[str] = None
+        self.start_time_ns = time.time_ns()
+        self.started_at = time.perf_counter()
+        self.duration = 0.0
+
+    def add_payload(self, direction: str, size: int) -> None:
+        self.payload_bytes[direction] = self.payload_bytes.get(direction, 0) + size
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.started_at
+
+    def labels(self) -> Dict[str, str]:
+        return dict(
+            name=self.name,
+            stage=self.stage,
+            upstream=self.upstream,
+            doc_type=str(self.tags.get("doc_type") or ""),
+            customer=str(self.tags.get("customer") or ""),
+        )
+
+    def to_otlp(self) -> Dict[str, Any]:
+        attributes: Dict[str, Any] = {
+            **{key: value for key, value in self.tags.items() if value is not None},
+            **self.attributes,
+            "stage": self.stage,
+            "upstream": self.upstream,
+            **{
+                f"payload.{direction}_bytes": size
+                for direction, size in self.payload_bytes.items()
+            },
+        }
+        span: Dict[str, Any] = dict(
+            traceId=self.trace_id,
+            spanId=self.span_id,
+            name=self.name,
+            kind=SPAN_KIND_CLIENT if self.upstream else SPAN_KIND_INTERNAL,
+            startTimeUnixNano=str(self.start_time_ns),
+            endTimeUnixNano=str(self.start_time_ns + int(self.duration * 1e9)),
+            attributes=[to_otlp_attribute(key, value) for key, value in attributes.items()],
+        )
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        if self.error is not None:
+            span["status"] = dict(code=STATUS_CODE_ERROR, message=self.error)
+        return span
+
+
+def to_otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return dict(key=key, value=dict(boolValue=value))
+    if isinstance(value, int):
+        return dict(key=key, value=dict(intValue=str(value)))
+    if isinstance(value, float):
+        return dict(key=key, value=dict(doubleValue=value))
+    return dict(key=key, value=dict(stringValue=str(value)))
+
+
+class OtlpFileExporter:
+    """span을 OTLP/JSON ExportTraceServiceRequest 형식으로 한 줄씩 파일에 기록"""
+
+    def __init__(self, path: str, service_name: str) -> None:
+        self.path = path
+        self.resource = dict(attributes=[to_otlp_attribute("service.name", service_name)])
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(
+            dict(
+                resourceSpans=[
+                    dict(
+                        resource=self.resource,
+                        scopeSpans=[dict(scope=dict(name="textscope"), spans=[span.to_otlp()])],
+                    )
+                ]
+            ),
+            ensure_ascii=False,
+            default=str,
+        )
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            logger.warning(f"Cannot write trace to '{self.path}'")
+
+
+exporter: Optional[OtlpFileExporter] = (
+    OtlpFileExporter(settings.TRACING_EXPORT_PATH, settings.TRACING_SERVICE_NAME)
+    if settings.TRACING_EXPORT_PATH
+    else None
+)
+
+# 요청 단위 tag(customer, doc_type)와 현재 span, asyncio task와 run_in_threadpool에도 복사된다
+_trace_tags: ContextVar[Optional[Dict[str, Any]]] = ContextVar("trace_tags", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def trace_scope(**tags: Any) -> Iterator[Dict[str, Any]]:
+    """요청 하나의 tag 설정, 안에서 만든 span은 모두 같은 tag를 가진다"""
+    scope_tags = {**(_trace_tags.get() or {}), **tags}
+    token = _trace_tags.set(scope_tags)
+    try:
+        yield scope_tags
+    finally:
+        _trace_tags.reset(token)
+
+
+def set_trace_tags(**tags: Any) -> None:
+    """
+    진행 중인 요청의 tag 변경(예: classification 후 doc_type)
+
+    같은 trace_scope 안에서 이후에 끝나는 span에 모두 반영된다.
+    """
+    current_tags = _trace_tags.get()
+    if current_tags is not None:
+        current_tags.update(tags)
+
+
+@contextmanager
+def span(
+    name: str, stage: Optional[str] = None, upstream: Optional[str] = None, **attributes: Any
+) -> Iterator[Optional[Span]]:
+    """
+    name 구간의 span 기록
+
+    stage, upstream을 주지 않으면 상위 span의 값을 사용한다.
+    끝나면 latency/payload histogram에 기록하고 TRACING_EXPORT_PATH가 있으면 파일로 내보낸다.
+    """
+    if not settings.USE_TRACING:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(
+        name,
+        stage=stage or (parent.stage if parent is not None else name),
+        upstream=upstream or (parent.upstream if parent is not None else ""),
+        tags=_trace_tags.get() or {},
+        parent=parent,
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = repr(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+        record_span(current)
+
+
+def record_span(current: Span) -> None:
+    labels = current.labels()
+    span_duration_seconds.labels(**labels).observe(current.duration)
+    for direction, size in current.payload_bytes.items():
+        span_payload_bytes.labels(
+            name=labels["name"],
+            stage=labels["stage"],
+            upstream=labels["upstream"],
+            direction=direction,
+        ).observe(size)
+    if exporter is not None:
+        exporter.export(current)
+
+
+def body_size(get_body: Callable[[], Any]) -> int:
+    """request/response body 크기, 아직 읽지 않은 stream 등 body를 얻을 수 없으면 0"""
+    try:
+        return len(get_body() or b"")
+    except Exception:
+        return 0
+
+
+def traced(name: str, **attributes: Any) -> Callable:
+    """함수 실행 구간을 span으로 기록하는 decorator"""
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name, function=func.__name__, **attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name, function=func.__name__, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
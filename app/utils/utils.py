@@ -1,4 +1,3 @@
-import pdf2image
 import sys
 import json
 import base64
@@ -11,7 +10,6 @@ from typing import Dict, List, Optional, Any, Union, Tuple
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from pathlib import Path
-from pdf2image import convert_from_path
 from io import BytesIO
 from PIL import Image
 from rich.progress import track
@@ -20,6 +18,10 @@ from datetime import datetime
 from app.common.const import get_settings
 from app.errors.exceptions import ResourceDataError
 from app.utils.logging import logger
+from app.utils.columnar import KV_COLUMNS, ColumnarResult
+from app.utils.tracing import traced
+from app.utils.tiff import read_tiff_page_with_index
+from app.utils.pdf import render_pdf_page
 
 
 settings = get_settings()
@@ -186,8 +188,7 @@ def read_pdf_image(image_path: Union[Path, str], page: int = 1) -> Image.Image:
     if isinstance(image_path, str):
         image_path = Path(image_path)
     try:
-        pages = convert_from_path(image_path)
-        pil_image = pages[page - 1]
+        pil_image = render_pdf_page(image_path, page)
     except FileNotFoundError as exc:
         raise ResourceDataError(f"{image_path} is not exist", exc=exc)
     except Exception as exc:
@@ -195,6 +196,7 @@ def read_pdf_image(image_path: Union[Path, str], page: int = 1) -> Image.Image:
     return pil_image
 
 
+@traced("image_decode")
 def read_image(
     image_path: Union[Path, str],
     page: int = 1,
@@ -213,8 +215,7 @@ def read_image(
         try:
             if isinstance(image_path, Path):
                 image_path = image_path.as_posix()
-            all_pages = read_all_tiff_pages_with_tifffile(image_path, page)
-            pil_image = all_pages[page - 1]
+            pil_image = read_tiff_page_with_index(image_path, page)
         except:
             pil_image = read_tiff_page(image_path, page - 1)
     pil_image = pil_image.convert("RGB")
@@ -301,16 +302,11 @@ def set_predictions(
         if "texts" in detection_result
         else recognition_result.get("texts", [])
     )
-    predictions: List[Dict[str, Any]] = list()
-    for class_, score_, box_, text_ in zip(classes, scores, boxes, texts):
-        prediction = {
-            "class": class_,
-            "score": score_,
-            "box": box_,
-            "text": text_,
-        }
-        predictions.append(prediction)
-    return predictions
+    result = ColumnarResult.from_zipped_dict(
+        dict(boxes=boxes, scores=scores, classes=classes, texts=texts),
+        columns=KV_COLUMNS,
+    )
+    return list(result.iter_predictions())
 
 
 def set_ocr_response(
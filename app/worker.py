@@ -0,0 +1,192 @@
+import json
+import asyncio
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.common.const import get_settings
+from app.database import query
+from app.database.connection import db
+from app.schemas import error_models as ErrorResponse
+from app.utils.deadline import deadline_scope
+from app.utils.job_queue import job_queue, make_job_status
+from app.utils.logging import logger
+
+
+settings = get_settings()
+
+
+class JobWorkerPool:
+    """
+    job queue에 등록된 ocr job을 처리하는 worker 모음
+
+    local backend는 api process의 startup에서, redis backend는
+    python -m app.worker 로 실행한 별도 process에서 worker를 실행한다.
+    """
+
+    def __init__(self, app: FastAPI = None, workers: int = settings.JOB_WORKERS) -> None:
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = list()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: FastAPI) -> None:
+        @app.on_event("startup")
+        async def startup() -> None:
+            # job을 받을 수 없는 local queue(ALLOW_LOCAL_JOB_QUEUE=False)는 worker를 실행하지 않는다
+            if settings.JOB_QUEUE_BACKEND == "local" and job_queue.accepts_jobs:
+                self.start()
+
+        @app.on_event("shutdown")
+        async def shutdown() -> None:
+            await self.stop()
+
+    def start(self) -> None:
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.ensure_future(self.run()))
+        if job_queue.is_shared:
+            self._tasks.append(asyncio.ensure_future(self.recover()))
+        logger.info(f"{self.workers} ocr job workers started")
+
+    async def serve(self) -> None:
+        self.start()
+        await asyncio.gather(*self._tasks)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                job = await job_queue.get()
+            except Exception:
+                # redis 연결이 끊긴 경우 등, worker는 유지하고 잠시 후 다시 조회
+                logger.exception("ocr job queue get")
+                await asyncio.sleep(settings.JOB_QUEUE_RETRY_SECOND)
+                continue
+            try:
+                await self.run_job(job)
+            except asyncio.CancelledError:
+                # 처리 중에 종료된 job은 ack 하지 않아 lease 만료 후 다시 처리
+                raise
+            except Exception:
+                logger.exception(f"{job.get('task_id')}-ocr job")
+            try:
+                await job_queue.ack(job)
+            except Exception:
+                # ack 하지 못한 job은 lease 만료 후 다시 처리
+                logger.exception(f"{job.get('task_id')}-ocr job ack")
+
+    async def recover(self) -> None:
+        """worker process가 죽어 끝나지 못한 job을 주기적으로 다시 등록"""
+        while True:
+            try:
+                for job in await job_queue.requeue_expired():
+                    task_id = job.get("task_id", "")
+                    logger.warning(f"{task_id}-ocr job abandoned after {job.get('attempts')} attempts")
+                    _, error = ErrorResponse.ErrorCode[9500]
+                    await job_queue.set_status(
+                        task_id, make_job_status("failed", task_id=task_id, error=error)
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("ocr job recovery")
+            await asyncio.sleep(settings.JOB_RECOVERY_INTERVAL_SECOND)
+
+    async def run_job(self, job: Dict) -> None:
+        from app.routes.inference import run_ocr
+
+        task_id = job.get("task_id", "")
+        started_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        await job_queue.set_status(
+            task_id,
+            make_job_status(
+                "running", task_id=task_id, started_datetime=started_datetime
+            ),
+        )
+        result: Optional[Dict] = None
+        error: Any = None
+        try:
+            with deadline_scope(settings.TIMEOUT_SECOND):
+                response = await run_ocr(job.get("inputs", {}))
+            if isinstance(response, JSONResponse):
+                content = json.loads(response.body)
+                if response.status_code < 400:
+                    result = content
+                else:
+                    error = content.get("error")
+            else:
+                result = response
+                if settings.USE_TEXTSCOPE_DATABASE:
+                    await run_in_threadpool(self.save_result, job, response)
+        except Exception:
+            logger.exception(f"{task_id}-ocr job")
+            _, error = ErrorResponse.ErrorCode[9500]
+
+        finished_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        await job_queue.set_status(
+            task_id,
+            make_job_status(
+                "done" if error is None else "failed",
+                task_id=task_id,
+                started_datetime=started_datetime,
+                finished_datetime=finished_datetime,
+                result=result,
+                error=error,
+            ),
+        )
+        logger.info(f"{task_id}-ocr job finished")
+
+    def save_result(self, job: Dict, response: Dict) -> None:
+        inputs = job.get("inputs", {})
+        session_generator = db.session()
+        try:
+            session = next(session_generator)
+        except Exception:
+            logger.exception("ocr job db session")
+            return
+        try:
+            query.insert_inference_result(
+                session=session,
+                task_pkey=job.get("task_pkey"),
+                image_pkey=inputs.get("image_pkey"),
+                inference_type=inputs.get("inference_type"),
+                response_log=response["response_log"],
+                inference_results=jsonable_encoder(response["inference_results"]),
+            )
+        finally:
+            # get_db generator의 finally에서 session을 닫는다
+            session_generator.close()
+
+
+worker_pool = JobWorkerPool()
+
+
+async def main() -> None:
+    from app.wrapper.client import clients
+    from app.utils.redis_client import close_redis
+
+    if settings.JOB_QUEUE_BACKEND != "redis":
+        logger.warning("local job queue is only shared in api process, use redis backend")
+    try:
+        await worker_pool.serve()
+    finally:
+        await clients.aclose()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    from dataclasses import asdict
+    from app.common.config import config
+
+    if settings.USE_TEXTSCOPE_DATABASE:
+        db.init_app(FastAPI(), **asdict(config()))
+    asyncio.run(main())
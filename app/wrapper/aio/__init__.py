@@ -0,0 +1,9 @@
+from app.wrapper.aio import classification
+from app.wrapper.aio import detection
+from app.wrapper.aio import pp
+from app.wrapper.aio import recognition
+from app.wrapper.aio import rotate
+from app.wrapper.aio import pipeline
+
+
+__all__ = ["classification", "detection", "pp", "recognition", "rotate", "pipeline"]
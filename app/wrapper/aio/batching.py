@@ -0,0 +1,131 @@
+import asyncio
+
+from httpx import AsyncClient
+
+from typing import Dict, List, Optional, Tuple
+
+from app.common import settings
+from app.utils.deadline import deadline_scope, wait_with_deadline
+from app.utils.logging import logger
+from app.utils.payload import read_json
+from app.wrapper.aio.upstream import post
+
+
+# batch route를 구현하지 않은 upstream의 응답
+BATCH_UNSUPPORTED_STATUS = (404, 405, 501)
+
+class MicroBatcher:
+    """
+    동시에 들어온 요청을 모아 serving server에 한번에 전달하는 dispatcher
+
+    최대 max_batch_size개 혹은 max_wait_ms 동안 모인 요청을
+    POST {url}/batch {"inputs": [...]} -> {"outputs": [...]} 형태로 보낸 뒤
+    결과를 순서대로 각 요청에 돌려준다. 요청이 하나뿐이면 기존 route로 보낸다.
+    batch route가 실패 응답을 주면 요청별로 기존 route에 다시 보내 upstream status를 그대로 돌려주고,
+    batch route가 없는 upstream(404, 405, 501)에는 이후 batch를 보내지 않는다.
+    요청별 전송만 hedge 하고, batch 요청은 hedge 하지 않는다.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_batch_size: int = settings.MICRO_BATCH_MAX_SIZE,
+        max_wait_ms: float = settings.MICRO_BATCH_MAX_WAIT_MS,
+        batch_route: str = settings.MICRO_BATCH_ROUTE,
+    ) -> None:
+        self.url = url
+        self.batch_url = f"{url}/{batch_route}"
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_supported = True
+        self._pending: List[Tuple[Dict, asyncio.Future]] = list()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, client: AsyncClient, inputs: Dict) -> Tuple[int, Dict]:
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._pending.append((dict(inputs), future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(client)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush, client)
+        # 요청마다 자신의 deadline까지만 batch 결과를 기다린다
+        return await wait_with_deadline(future)
+
+    def _flush(self, client: AsyncClient) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, list()
+        if batch:
+            # batch에는 여러 요청의 입력이 섞여 있으므로 특정 요청의 deadline 없이 전송
+            with deadline_scope(None):
+                asyncio.ensure_future(self._send(client, batch))
+
+    async def _send(self, client: AsyncClient, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        try:
+            results: Optional[List] = None
+            if len(batch) > 1 and self.batch_supported:
+                results = await self._send_batch(client, batch)
+            if results is None:
+                results = await asyncio.gather(
+                    *(self._send_one(client, inputs) for inputs, _ in batch),
+                    return_exceptions=True,
+                )
+            logger.debug(f"{self.url} micro batch size: {len(batch)}")
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+
+    async def _send_one(self, client: AsyncClient, inputs: Dict) -> Tuple[int, Dict]:
+        response = await post(
+            client,
+            self.url,
+            json=inputs,
+            timeout=settings.TIMEOUT_SECOND,
+            headers={"User-Agent": "textscope core"},
+            hedge=True,
+        )
+        return (response.status_code, read_json(response))
+
+    async def _send_batch(
+        self, client: AsyncClient, batch: List[Tuple[Dict, asyncio.Future]]
+    ) -> Optional[List[Tuple[int, Dict]]]:
+        """batch route로 전송, 실패 응답이면 요청별로 다시 보내도록 None 반환"""
+        response = await post(
+            client,
+            self.batch_url,
+            json=dict(inputs=[inputs for inputs, _ in batch]),
+            timeout=settings.TIMEOUT_SECOND,
+            headers={"User-Agent": "textscope core"},
+        )
+        if response.status_code < 200 or response.status_code >= 300:
+            if response.status_code in BATCH_UNSUPPORTED_STATUS:
+                self.batch_supported = False
+            logger.warning(
+                f"{self.batch_url} returned {response.status_code}, send {len(batch)} requests one by one"
+            )
+            return None
+        outputs = read_json(response).get("outputs", [])
+        if len(outputs) != len(batch):
+            raise ValueError(
+                f"{self.batch_url} returned {len(outputs)} outputs for {len(batch)} inputs"
+            )
+        return [(response.status_code, output) for output in outputs]
+
+
+batchers: Dict[str, MicroBatcher] = dict()
+
+
+def get_batcher(url: str) -> MicroBatcher:
+    if url not in batchers:
+        batchers[url] = MicroBatcher(url)
+    return batchers[url]
@@ -0,0 +1,83 @@
+from httpx import AsyncClient
+
+from typing import Dict, Optional
+
+from app.common import settings
+from app.wrapper.classification import supported_class, classification_server_url
+from app.utils.payload import read_json
+from app.utils.rectify import with_rectified_image
+from app.wrapper.aio.upstream import post
+
+
+async def longinus(
+    client: AsyncClient,
+    inputs: Dict,
+    inference_result: Optional[Dict] = None,
+    hint: Optional[Dict] = None,
+    route_name: Optional[str] = None,
+) -> Dict:
+    inference_inputs = with_rectified_image(inputs)
+    route_name = "duriel" if route_name is None else route_name
+    classification_response = await post(
+        client,
+        f"{classification_server_url}/{route_name}",
+        json=inference_inputs,
+        timeout=settings.TIMEOUT_SECOND,
+        headers={"User-Agent": "textscope core"},
+        hedge=True,
+    )
+    classification_result = read_json(classification_response)
+    response = dict(
+        status_code=classification_response.status_code,
+        response=classification_result,
+        is_supported_type=True,
+    )
+    if classification_result.get("doc_type") not in supported_class:
+        response["is_supported_type"] = False
+    return response
+
+
+async def duriel(
+    client: AsyncClient,
+    inputs: Dict,
+    inference_result: Dict,
+    doc_type: str = "du_cls_model",
+    hint: Optional[Dict] = None,
+    route_name: Optional[str] = None,
+) -> Dict:
+    # TODO: hint 사용 가능하도록 구성
+    source = with_rectified_image(inputs)
+    duriel_inputs = {
+        "scores": inference_result.get("scores", []),
+        "boxes": inference_result.get("boxes", []),
+        "classes": inference_result.get("classes", []),
+        "texts": inference_result.get("texts", []),
+        "image_size": (
+            inference_result.get("image_height"),
+            inference_result.get("image_width"),
+        ),
+        "request_id": inputs.get("request_id"),
+        "image_path": source.get("image_path"),
+        "image_id": inputs.get("image_id"),
+        "angle": source.get("angle"),
+        "page": source.get("page"),
+        "doc_type": doc_type,
+    }
+    route_name = "duriel" if route_name is None else route_name
+    classification_response = await post(
+        client,
+        f"{classification_server_url}/{route_name}",
+        json=duriel_inputs,
+        timeout=settings.TIMEOUT_SECOND,
+        headers={"User-Agent": "textscope core"},
+        hedge=True,
+    )
+    classification_result = read_json(classification_response)
+    response = dict(
+        status_code=classification_response.status_code,
+        response=classification_result,
+        is_supported_type=True,
+    )
+    if classification_result.get("doc_type") not in supported_class:
+        response["is_supported_type"] = False
+    return response
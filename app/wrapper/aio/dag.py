@@ -0,0 +1,270 @@
+import asyncio
+
+from httpx import AsyncClient
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from operator import attrgetter
+from datetime import datetime
+from dataclasses import dataclass, field
+from omegaconf import OmegaConf
+
+from app import hydra_cfg
+from app.common import settings
+from app.utils.logging import logger
+from app.utils.stage_cache import async_cached_call
+from app.utils.tracing import span
+
+
+StepFunction = Callable[["PipelineContext", Dict], Awaitable[Dict]]
+ConditionFunction = Callable[["PipelineContext"], bool]
+
+steps: Dict[str, StepFunction] = dict()
+conditions: Dict[str, ConditionFunction] = dict()
+
+
+def register_step(name: str) -> Callable[[StepFunction], StepFunction]:
+    def decorator(func: StepFunction) -> StepFunction:
+        steps[name] = func
+        return func
+
+    return decorator
+
+
+def register_condition(name: str) -> Callable[[ConditionFunction], ConditionFunction]:
+    def decorator(func: ConditionFunction) -> ConditionFunction:
+        conditions[name] = func
+        return func
+
+    return decorator
+
+
+@dataclass
+class PipelineContext:
+    client: AsyncClient
+    inputs: Dict
+    response_log: Dict
+    hint: Optional[Dict] = None
+    results: Dict[str, Dict] = field(default_factory=dict)
+    wrapper_responses: Dict[str, Dict] = field(default_factory=dict)
+    skipped: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class Stage:
+    name: str
+    step: Optional[str] = None
+    module: Optional[str] = None
+    func: Optional[str] = None
+    route: Optional[str] = None
+    depends_on: List[str] = field(default_factory=list)
+    after: List[str] = field(default_factory=list)
+    when: Optional[str] = None
+    decide_after: Optional[List[str]] = None
+
+    @property
+    def dependencies(self) -> List[str]:
+        return [dependency.split(".")[0] for dependency in self.depends_on]
+
+    @property
+    def upstream_stages(self) -> List[str]:
+        return self.dependencies + self.after + (self.decide_after or [])
+
+    def is_enabled(self, ctx: PipelineContext) -> bool:
+        if self.when is None:
+            return True
+        condition_name = self.when
+        negate = condition_name.startswith("not ")
+        if negate:
+            condition_name = condition_name[len("not "):].strip()
+        return conditions[condition_name](ctx) != negate
+
+    def collect_inputs(self, ctx: PipelineContext) -> Dict:
+        """depends_on 순서대로 결과를 합쳐 stage 입력을 생성"""
+        inference_result: Dict[str, Any] = dict()
+        for dependency in self.depends_on:
+            stage_name, _, key = dependency.partition(".")
+            result = ctx.results.get(stage_name, {})
+            if key:
+                inference_result[key] = result.get(key)
+            else:
+                inference_result.update(result)
+        return inference_result
+
+
+class PipelineGraph:
+    """
+    stage 간 의존성을 가진 async pipeline
+
+    outputs에서 도달 가능한 stage만 실행하며, 의존하는 stage가 모두 끝난 stage는
+    즉시 실행되므로 전체 소요 시간은 stage 합이 아닌 critical path가 된다.
+    """
+
+    def __init__(self, name: str, stages: Dict[str, Stage], outputs: List[str]):
+        self.name = name
+        self.stages = stages
+        self.outputs = outputs
+        self.validate()
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict) -> "PipelineGraph":
+        stages = {
+            stage_name: Stage(name=stage_name, **(stage_config or {}))
+            for stage_name, stage_config in config.get("stages", {}).items()
+        }
+        outputs = list(config.get("outputs", stages.keys()))
+        return cls(name=name, stages=stages, outputs=outputs)
+
+    def validate(self) -> None:
+        for stage_name in self.outputs:
+            if stage_name not in self.stages:
+                raise ValueError(f"{self.name}: unknown output stage '{stage_name}'")
+        for stage in self.stages.values():
+            if (stage.step is None) == (stage.func is None):
+                raise ValueError(
+                    f"{self.name}: stage '{stage.name}' needs either step or module/func"
+                )
+            if stage.step is not None and stage.step not in steps:
+                raise ValueError(f"{self.name}: step '{stage.step}' is not registered")
+            condition_name = (stage.when or "").replace("not ", "", 1).strip()
+            if condition_name and condition_name not in conditions:
+                raise ValueError(
+                    f"{self.name}: condition '{condition_name}' is not registered"
+                )
+            for dependency in stage.upstream_stages:
+                if dependency not in self.stages:
+                    raise ValueError(
+                        f"{self.name}: stage '{stage.name}' depends on unknown stage '{dependency}'"
+                    )
+        self.execution_order()
+
+    def execution_order(self) -> List[str]:
+        """outputs 실행에 필요한 stage를 위상 정렬 순서로 반환"""
+        order: List[str] = list()
+        visiting: Set[str] = set()
+
+        def visit(stage_name: str) -> None:
+            if stage_name in order:
+                return
+            if stage_name in visiting:
+                raise ValueError(f"{self.name}: cycle detected at stage '{stage_name}'")
+            visiting.add(stage_name)
+            for dependency in self.stages[stage_name].upstream_stages:
+                visit(dependency)
+            visiting.discard(stage_name)
+            order.append(stage_name)
+
+        for stage_name in self.outputs:
+            visit(stage_name)
+        return order
+
+    async def run(self, ctx: PipelineContext) -> Dict[str, Dict]:
+        tasks: Dict[str, asyncio.Future] = dict()
+
+        def schedule(stage_name: str) -> asyncio.Future:
+            if stage_name not in tasks:
+                tasks[stage_name] = asyncio.ensure_future(
+                    self._run_stage(self.stages[stage_name], ctx, schedule)
+                )
+            return tasks[stage_name]
+
+        try:
+            await asyncio.gather(*(schedule(stage_name) for stage_name in self.outputs))
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return ctx.results
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        ctx: PipelineContext,
+        schedule: Callable[[str], asyncio.Future],
+    ) -> None:
+        if stage.decide_after is not None:
+            # when 조건이 decide_after stage만으로 결정되면 나머지 upstream을 기다리지 않고 skip
+            await asyncio.gather(*(schedule(name) for name in stage.decide_after))
+            if not stage.is_enabled(ctx):
+                ctx.skipped.add(stage.name)
+                logger.debug(f"{self.name}: skip stage '{stage.name}'")
+                return
+
+        upstream_stages = stage.upstream_stages
+        if upstream_stages:
+            await asyncio.gather(*(schedule(name) for name in upstream_stages))
+
+        if any(name in ctx.skipped for name in stage.dependencies) or not (
+            stage.is_enabled(ctx)
+        ):
+            ctx.skipped.add(stage.name)
+            logger.debug(f"{self.name}: skip stage '{stage.name}'")
+            return
+
+        inference_start_time = datetime.now()
+        ctx.response_log[f"{stage.name}_start_time"] = inference_start_time.strftime(
+            "%Y-%m-%d %H:%M:%S.%f"
+        )[:-3]
+        inference_result = stage.collect_inputs(ctx)
+        result: Optional[Dict]
+        if stage.step is not None:
+            with span("stage", stage=stage.name):
+                result = await steps[stage.step](ctx, inference_result)
+        else:
+            result = await self._call_wrapper(stage, ctx, inference_result)
+        ctx.results[stage.name] = result if result is not None else dict()
+
+        inference_end_time = datetime.now()
+        ctx.response_log[f"{stage.name}_end_time"] = inference_end_time.strftime(
+            "%Y-%m-%d %H:%M:%S.%f"
+        )[:-3]
+        ctx.response_log[f"{stage.name}_inference_time"] = (
+            inference_end_time - inference_start_time
+        ).total_seconds()
+
+    async def _call_wrapper(
+        self, stage: Stage, ctx: PipelineContext, inference_result: Dict
+    ) -> Optional[Dict]:
+        from app.wrapper import aio
+        from app.wrapper.pipeline import route_mapping_table
+
+        route_name = stage.route
+        if route_name is None:
+            doc_class = ctx.results.get("classification", {}).get("doc_class", "")
+            route_name = route_mapping_table.get(doc_class)
+        # 동시에 실행되는 stage끼리 model_name, route_name을 덮어쓰지 않도록 stage마다 입력 복사
+        stage_inputs = dict(ctx.inputs, model_name=stage.func, route_name=route_name)
+        call_func = attrgetter(f"{stage.module}.{stage.func}")(aio)
+        result = await async_cached_call(
+            stage.name,
+            stage_inputs,
+            route_name,
+            lambda: call_func(ctx.client, stage_inputs, inference_result, ctx.hint),
+        )
+        ctx.wrapper_responses[stage.name] = result
+        return result.get("response")
+
+
+@register_condition("is_supported_type")
+def is_supported_type(ctx: PipelineContext) -> bool:
+    classification_result = ctx.wrapper_responses.get("classification", {})
+    return classification_result.get("is_supported_type") == True
+
+
+def load_pipeline_graphs(customer: str = settings.CUSTOMER) -> Dict[str, PipelineGraph]:
+    pipeline_config = OmegaConf.to_container(hydra_cfg.pipeline, resolve=True)
+    customer_pipelines = pipeline_config.get(customer) or {}
+    return {
+        name: PipelineGraph.from_config(name, config)
+        for name, config in customer_pipelines.items()
+    }
+
+
+pipeline_graphs: Dict[str, PipelineGraph] = dict()
+
+
+def get_pipeline_graph(name: str) -> PipelineGraph:
+    if not pipeline_graphs:
+        pipeline_graphs.update(load_pipeline_graphs())
+    if name not in pipeline_graphs:
+        raise KeyError(f"pipeline '{name}' is not defined for {settings.CUSTOMER}")
+    return pipeline_graphs[name]
@@ -0,0 +1,81 @@
+from httpx import AsyncClient
+
+from typing import Dict, Optional
+
+from app.common import settings
+from app.wrapper.aio.batching import get_batcher
+from app.wrapper.detection import (
+    kv_detection_server_url,
+    general_detection_server_url,
+)
+from app.utils.payload import read_json
+from app.utils.rectify import with_rectified_image
+from app.wrapper.aio.upstream import post
+
+
+async def agamotto(
+    client: AsyncClient,
+    inputs: Dict,
+    inference_result: Optional[Dict] = None,
+    hint: Optional[Dict] = None,
+    route_name: Optional[str] = None,
+) -> Dict:
+    # TODO: hint 사용 가능하도록 구성
+    # with_rectified_image는 회전한 이미지가 없으면 inputs를 그대로 돌려주므로 복사 후 수정
+    inference_inputs = dict(with_rectified_image(inputs))
+    inference_inputs.pop("model_name", None)
+    route_name = "agamotto" if route_name is None else route_name
+    url = f"{general_detection_server_url}/{route_name}"
+    if settings.USE_MICRO_BATCHING:
+        status_code, detection_result = await get_batcher(url).submit(
+            client, inference_inputs
+        )
+        return dict(status_code=status_code, response=detection_result)
+    detection_response = await post(
+        client,
+        url=url,
+        json=inference_inputs,
+        timeout=settings.TIMEOUT_SECOND,
+        headers={"User-Agent": "textscope core"},
+        hedge=True,
+    )
+    detection_result = read_json(detection_response)
+    return dict(status_code=detection_response.status_code, response=detection_result)
+
+
+async def duriel(
+    client: AsyncClient,
+    inputs: Dict,
+    inference_result: Dict,
+    doc_type: Optional[str],
+    hint: Optional[Dict] = None,
+    route_name: Optional[str] = None,
+) -> Dict:
+    # TODO: hint 사용 가능하도록 구성
+    source = with_rectified_image(inputs)
+    duriel_inputs = {
+        "scores": inference_result.get("scores", []),
+        "boxes": inference_result.get("boxes", []),
+        "classes": inference_result.get("classes", []),
+        "texts": inference_result.get("texts", []),
+        "image_size": (
+            inference_result.get("image_height"),
+            inference_result.get("image_width"),
+        ),
+        "request_id": inputs.get("request_id"),
+        "image_path": source.get("image_path"),
+        "angle": source.get("angle"),
+        "page": source.get("page"),
+        "doc_type": doc_type,
+    }
+    route_name = "duriel" if route_name is None else route_name
+    detection_response = await post(
+        client,
+        f"{kv_detection_server_url}/{route_name}",
+        json=duriel_inputs,
+        timeout=settings.TIMEOUT_SECOND,
+        headers={"User-Agent": "textscope core"},
+        hedge=True,
+    )
+    detection_result = read_json(detection_response)
+    return dict(status_code=detection_response.status_code, response=detection_result)
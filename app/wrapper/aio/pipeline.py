@@ -0,0 +1,491 @@
+import json
+
+from httpx import AsyncClient
+from starlette.concurrency import run_in_threadpool
+
+from typing import Dict, Tuple, Optional
+from datetime import datetime
+
+from app.models import DocTypeHint
+from app.wrapper import aio
+from app.wrapper.aio import pp
+from app.common import settings
+from app.utils.hint import (
+    apply_cls_hint,
+    get_planned_doc_type,
+    get_planned_classification_result,
+)
+from app.utils.logging import logger
+from app.utils.tracing import set_trace_tags
+from app.utils.stage_cache import async_cached_call
+from app.wrapper.pipeline import model_server_url
+from app.utils.payload import read_json
+from app.utils.rectify import RECTIFIED_IMAGE_KEY, rectify_image
+from app.utils.columnar import KV_COLUMNS, ColumnarResult
+from app.wrapper.aio.upstream import post
+from app.wrapper.aio.dag import (
+    PipelineContext,
+    get_pipeline_graph,
+    register_condition,
+    register_step,
+)
+
+from app.utils.utils import (
+    pretty_dict,
+    substitute_spchar_to_alpha,
+    set_ocr_response,
+)
+
+
+# TODO: hint 사용
+async def multiple(
+    client: AsyncClient,
+    inputs: Dict,
+    sequence_type: str,
+    response_log: Dict,
+    hint: Optional[Dict] = None,
+) -> Tuple[Optional[int], Dict, Dict]:
+    inference_start_time = datetime.now()
+    response_log["inference_start_time"] = inference_start_time.strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+    pipeline_graph = get_pipeline_graph(sequence_type)
+    ctx = PipelineContext(
+        client=client, inputs=inputs, response_log=response_log, hint=hint
+    )
+    result_set = await pipeline_graph.run(ctx)
+
+    inference_end_time = datetime.now()
+    response_log.update(
+        {
+            "inference_end_time": inference_end_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "inference_total_time": (
+                inference_end_time - inference_start_time
+            ).total_seconds(),
+        }
+    )
+    logger.info("inference log: {}", json.dumps(response_log, indent=4, sort_keys=True))
+
+    result = set_ocr_response(
+        inputs=inputs,
+        sequence_list=[
+            stage_name
+            for stage_name in pipeline_graph.execution_order()
+            if stage_name not in ctx.skipped
+        ],
+        result_set=result_set,
+    )
+    return (result.get("status_code"), result, response_log)
+
+
+async def single(
+    client: AsyncClient,
+    inputs: Dict,
+    response_log: Dict,
+    route_name: str = "ocr",
+) -> Tuple[int, Dict, Dict]:
+    """doc type hint를 적용하고 inference 요청"""
+    # Apply doc type hint
+    hint = inputs.get("hint")
+    if hint is not None and hint.get("doc_type") is not None:
+        doc_type_hint = hint.get("doc_type", {})
+        doc_type_hint = DocTypeHint(**doc_type_hint)
+        cls_hint_result = apply_cls_hint(doc_type_hint=doc_type_hint)
+        response_log.update(apply_cls_hint_result=cls_hint_result)
+        inputs["doc_type"] = cls_hint_result.get("doc_type")
+        set_trace_tags(doc_type=inputs["doc_type"])
+
+    inference_start_time = datetime.now()
+    response_log["inference_start_time"] = inference_start_time.strftime(
+        "%Y-%m-%d %H:%M:%S.%f"
+    )[:-3]
+    if inputs["doc_type"] == "FN-CB":
+        route_name = "bill_enterprise"
+    ocr_response = await post(
+        client,
+        f"{model_server_url}/{route_name}",
+        json=inputs,
+        timeout=settings.TIMEOUT_SECOND,
+        headers={"User-Agent": "textscope core"},
+    )
+    inference_end_time = datetime.now()
+    response_log.update(
+        {
+            "inference_end_time": inference_end_time.strftime("%Y-%m-%d %H:%M:%S.%f")[
+                :-3
+            ],
+            "inference_total_time": (
+                inference_end_time - inference_start_time
+            ).total_seconds(),
+        }
+    )
+    logger.info(
+        f"Inference time: {str((inference_end_time - inference_start_time).total_seconds())}"
+    )
+    return (ocr_response.status_code, read_json(ocr_response), response_log)
+
+
+async def heungkuk_life(
+    client: AsyncClient,
+    inputs: Dict,
+    response_log: Dict,
+    route_name: str = "ocr",
+) -> Tuple[int, Dict, Dict]:
+    """
+    rotate > general detection > recognition > classification > kv detection 순서의
+    흥국생명 pipeline을 config(pipeline/default.yaml)의 dag로 실행
+    """
+    inference_start_time = datetime.now()
+    task_id = inputs.get("task_id")
+    logger.debug(f"{task_id}-inference pipeline start:\n{pretty_dict(inputs)}")
+
+    ctx = PipelineContext(client=client, inputs=inputs, response_log=response_log)
+    results = await get_pipeline_graph("heungkuk_life").run(ctx)
+    ocr_response = results.get("response", {})
+
+    inference_end_time = datetime.now()
+    logger.info(
+        f"Inference time: {str((inference_end_time - inference_start_time).total_seconds())}"
+    )
+    response_log.update(
+        dict(
+            inference_request_start_time=inference_start_time.strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            inference_request_end_time=inference_end_time.strftime("%Y-%m-%d %H:%M:%S"),
+            inference_request_time=inference_end_time - inference_start_time,
+        )
+    )
+    logger.debug(f"{task_id}-output:\n{pretty_dict(ocr_response)}")
+    kv_result_status_code: int = ocr_response.get("kv_result", {}).get(
+        "status_code", 400
+    )
+    return (kv_result_status_code, ocr_response, response_log)
+
+
+@register_condition("use_rotation")
+def use_rotation(ctx: PipelineContext) -> bool:
+    rectify = ctx.inputs.get("rectify", {})
+    return rectify.get("rotation_90n", False) or rectify.get("rotation_fine", False)
+
+
+@register_condition("substitute_spchar_to_alpha")
+def use_substitute_spchar_to_alpha(ctx: PipelineContext) -> bool:
+    return settings.SUBSTITUTE_SPCHAR_TO_ALPHA
+
+
+@register_condition("is_doc_type_unknown")
+def is_doc_type_unknown(ctx: PipelineContext) -> bool:
+    return ctx.results.get("plan", {}).get("doc_type") is None
+
+
+@register_condition("is_duriel_support_document")
+def is_duriel_support_document(ctx: PipelineContext) -> bool:
+    return ctx.inputs.get("doc_type") in settings.DURIEL_SUPPORT_DOCUMENT
+
+
+@register_condition("is_dcc_merge_target")
+def is_dcc_merge_target(ctx: PipelineContext) -> bool:
+    return ctx.inputs.get("doc_type") == "HKL01-DT-PRS" and settings.FORCE_MERGE_DCC_BOX
+
+
+@register_condition("is_insurance_support_document")
+def is_insurance_support_document(ctx: PipelineContext) -> bool:
+    doc_type = ctx.inputs.get("doc_type")
+    return (
+        doc_type not in settings.DURIEL_SUPPORT_DOCUMENT
+        and doc_type in settings.INSURANCE_SUPPORT_DOCUMENT
+    )
+
+
+@register_step("plan")
+async def plan(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    """static doc type, trust hint로 doc type을 미리 결정"""
+    doc_type, cls_hint_result = get_planned_doc_type(ctx.inputs)
+    if doc_type is not None:
+        ctx.inputs["doc_type"] = doc_type
+        set_trace_tags(doc_type=ctx.inputs["doc_type"])
+        logger.info(f"{ctx.inputs.get('task_id')}-skip classification, doc type: {doc_type}")
+    return dict(doc_type=doc_type, apply_cls_hint_result=cls_hint_result)
+
+
+@register_step("rotate")
+async def rotate(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    rotate_result = (
+        await async_cached_call(
+            "rotate",
+            ctx.inputs,
+            "longinus",
+            lambda: aio.rotate.longinus(ctx.client, ctx.inputs),
+        )
+    ).get("response", {})
+    ctx.inputs["angle"] = rotate_result.get("angle")
+    await run_in_threadpool(rectify_image, ctx.inputs)
+    logger.debug(f"{ctx.inputs.get('task_id')}-rotate result:\n{pretty_dict(rotate_result)}")
+    return rotate_result
+
+
+@register_step("general_detection")
+async def general_detection(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    agamotto_result = (
+        await async_cached_call(
+            "general_detection",
+            ctx.inputs,
+            "agamotto",
+            lambda: aio.detection.agamotto(ctx.client, ctx.inputs),
+        )
+    ).get("response", {})
+    logger.debug(
+        f"{ctx.inputs.get('task_id')}-general detection result:\n{pretty_dict(agamotto_result)}"
+    )
+    ctx.response_log.update(agamotto_result.get("response_log", {}))
+    ctx.response_log.update(
+        original_image_size=(
+            agamotto_result.get("image_width"),
+            agamotto_result.get("image_height"),
+        )
+    )
+    return agamotto_result
+
+
+@register_step("recognition")
+async def recognition(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    tiamo_result = (
+        await async_cached_call(
+            "recognition",
+            ctx.inputs,
+            "tiamo",
+            lambda: aio.recognition.tiamo(ctx.client, ctx.inputs, inference_result),
+        )
+    ).get("response", {})
+    ctx.response_log.update(tiamo_result.get("response_log", {}))
+    if settings.SUBSTITUTE_SPCHAR_TO_ALPHA:
+        tiamo_result["texts"] = substitute_spchar_to_alpha(tiamo_result["texts"])
+    return tiamo_result
+
+
+@register_step("recognition_encode")
+async def recognition_encode(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    """특수문자가 치환된 texts를 rec_preds로 다시 변환"""
+    pred_encode_status, encoded_texts = await pp.convert_texts_to_preds(
+        client=ctx.client, texts=inference_result.get("texts", [])
+    )
+    return dict(rec_preds=encoded_texts)
+
+
+@register_step("classification")
+async def classification(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    duriel_classification_result = (
+        await async_cached_call(
+            "classification",
+            ctx.inputs,
+            "duriel",
+            lambda: aio.classification.duriel(ctx.client, ctx.inputs, inference_result),
+        )
+    ).get("response", {})
+    logger.debug(
+        f"{ctx.inputs.get('task_id')}-classification result:\n{pretty_dict(duriel_classification_result)}"
+    )
+    ctx.response_log.update(duriel_classification_result.get("response_log", {}))
+    return duriel_classification_result
+
+
+@register_step("doc_type")
+async def doc_type(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    """classification 결과에 doc type hint 적용, 생략된 경우 plan 결과 사용"""
+    if "classification" not in ctx.results:
+        planned_doc_type = inference_result.get("doc_type")
+        cls_hint_result = inference_result.get("apply_cls_hint_result", {})
+        if cls_hint_result:
+            ctx.response_log.update(apply_cls_hint_result=cls_hint_result)
+        return dict(
+            doc_type=planned_doc_type,
+            classification_result=get_planned_classification_result(planned_doc_type),
+            apply_cls_hint_result=cls_hint_result,
+        )
+
+    duriel_classification_result = ctx.results["classification"]
+    doc_type = duriel_classification_result.get("doc_type")
+    score_result = duriel_classification_result.get("scores", {})
+    duriel_classification_result["score"] = score_result.get(doc_type)
+
+    # Apply doc type hint
+    hint = ctx.inputs.get("hint", {})
+    cls_hint_result = dict()
+    if "doc_type" in hint:
+        doc_type_hint = DocTypeHint(**hint.get("doc_type", {}))
+        cls_hint_result = apply_cls_hint(
+            cls_result=duriel_classification_result, doc_type_hint=doc_type_hint
+        )
+        ctx.response_log.update(apply_cls_hint_result=cls_hint_result)
+        doc_type = cls_hint_result.get("doc_type")
+        logger.info(f"{ctx.inputs.get('task_id')}-apply doc type hint: {cls_hint_result}")
+    duriel_classification_result["score"] = score_result.get(doc_type)
+    ctx.inputs["doc_type"] = doc_type
+    set_trace_tags(doc_type=ctx.inputs["doc_type"])
+    return dict(
+        doc_type=doc_type,
+        classification_result=duriel_classification_result,
+        apply_cls_hint_result=cls_hint_result,
+    )
+
+
+@register_step("kv_detection")
+async def kv_detection(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    doc_type = inference_result.get("doc_type")
+    kv_result = (
+        await async_cached_call(
+            "kv_detection",
+            ctx.inputs,
+            "duriel",
+            lambda: aio.detection.duriel(
+                ctx.client, ctx.inputs, inference_result, doc_type
+            ),
+            extra=doc_type,
+        )
+    ).get("response", {})
+    ctx.response_log.update(kv_result.get("response_log", {}))
+    return kv_result
+
+
+@register_step("diseases_box")
+async def diseases_box(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    kv_result = inference_result
+    agamotto_result = ctx.results["general_detection"]
+    try:
+        await merge_diseases_box(
+            client=ctx.client,
+            inputs=ctx.inputs,
+            kv_result=kv_result,
+            image_size=(
+                agamotto_result.get("image_width"),
+                agamotto_result.get("image_height"),
+            ),
+            response_log=ctx.response_log,
+        )
+    except Exception:
+        logger.exception("DCC pp")
+    return kv_result
+
+
+@register_step("insurance_detection")
+async def insurance_detection(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    kv_result = (
+        await async_cached_call(
+            "insurance_detection",
+            ctx.inputs,
+            "agamotto",
+            lambda: aio.detection.agamotto(ctx.client, ctx.inputs),
+            extra=ctx.inputs.get("doc_type"),
+        )
+    ).get("response", {})
+    ctx.response_log.update(kv_result.get("response_log", {}))
+    return kv_result
+
+
+@register_step("insurance_recognition")
+async def insurance_recognition(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    texts = (
+        (
+            await async_cached_call(
+                "insurance_recognition",
+                ctx.inputs,
+                "tiamo",
+                lambda: aio.recognition.tiamo(ctx.client, ctx.inputs, inference_result),
+                extra=ctx.inputs.get("doc_type"),
+            )
+        )
+        .get("response", {})
+        .get("texts")
+    )
+    return {**inference_result, "texts": texts}
+
+
+@register_step("response")
+async def response(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    agamotto_result = ctx.results["general_detection"]
+    tiamo_result = ctx.results["recognition"]
+    doc_type_result = ctx.results["doc_type"]
+    duriel_classification_result = doc_type_result.get("classification_result", {})
+    if "recognition_encode" in ctx.results:
+        tiamo_result["rec_preds"] = ctx.results["recognition_encode"].get("rec_preds")
+
+    kv_result: Dict = dict()
+    for stage_name in ["insurance_recognition", "kv_detection", "diseases_box"]:
+        if stage_name in ctx.results:
+            kv_result = ctx.results[stage_name]
+    if kv_result:
+        kv_result["rec_preds"] = tiamo_result["rec_preds"]
+        if "status_code" not in kv_result:
+            kv_result["status_code"] = 200
+    logger.info(f"{ctx.inputs.get('task_id')}-kv result:\n{pretty_dict(kv_result)}")
+    return dict(
+        boxes=agamotto_result.get("boxes"),
+        scores=agamotto_result.get("scores"),
+        classes=agamotto_result.get("classes"),
+        angle=ctx.inputs.get("angle", 0.0),
+        texts=tiamo_result.get("texts"),
+        rec_preds=tiamo_result.get("rec_preds"),
+        kv_result=kv_result,
+        recognition_result=tiamo_result,
+        classification_result=duriel_classification_result,
+        class_score=duriel_classification_result.get("score", 0.0),
+        image_height=agamotto_result.get("image_height"),
+        image_width=agamotto_result.get("image_width"),
+        id_type=kv_result.get("id_type", None),
+        doc_type=doc_type_result.get("doc_type"),
+        apply_cls_hint_result=doc_type_result.get("apply_cls_hint_result", {}),
+    )
+
+
+async def merge_diseases_box(
+    client: AsyncClient,
+    inputs: Dict,
+    kv_result: Dict,
+    image_size: Tuple,
+    response_log: Dict,
+) -> None:
+    """질병분류코드(DCC) box를 pp 결과로 교체"""
+    image_width, image_height = image_size
+    status_code, post_processing_results, response_log = await pp.post_processing(
+        client=client,
+        task_id=inputs.get("request_id", ""),
+        response_log=response_log,
+        inputs={
+            **kv_result,
+            "image_width": image_width or 2000,
+            "image_height": image_height or 2000,
+        },
+        post_processing_type="diseases_box",
+    )
+    tiamo_inputs = {
+        "image_path": inputs.get("image_path"),
+        "image_id": inputs.get("image_id"),
+        "page": inputs.get("page"),
+        "request_id": inputs.get("request_id"),
+        RECTIFIED_IMAGE_KEY: inputs.get(RECTIFIED_IMAGE_KEY),
+    }
+    is_diseases_box = post_processing_results.get("result", {}).get("preds", {})
+    if not is_diseases_box:
+        return
+    dcc_texts = (
+        (await aio.recognition.tiamo(client, tiamo_inputs, is_diseases_box))
+        .get("response", {})
+        .get("texts")
+    )
+    logger.debug(f"dcc texts: {dcc_texts}")
+    if status_code < 200 or status_code >= 400 or post_processing_results is None:
+        logger.info("Diseases box pp 과정에서 문제 발생, {}", post_processing_results)
+        return
+    post_processed_results = post_processing_results.get("result", {}).get("preds")
+    merged_result = ColumnarResult.from_dict(kv_result, columns=KV_COLUMNS).splice(
+        ["HKL01-KV-DCC"],
+        ColumnarResult(
+            boxes=post_processed_results.get("boxes"),
+            scores=post_processed_results.get("scores"),
+            classes=post_processed_results.get("classes"),
+            texts=dcc_texts,
+        ),
+    )
+    kv_result.update(merged_result.to_dict())
+    logger.info("Diseases pp result, {}", post_processing_results)
@@ -0,0 +1,90 @@
+from httpx import AsyncClient
+
+from typing import Dict, Tuple, List, Optional
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+
+from app.common import settings
+from app.utils.charset import charset_codec
+from app.utils.logging import logger
+from app.utils.recording import is_recording
+from app.wrapper import pp_server_url
+from app.utils.payload import read_json
+from app.wrapper.aio.upstream import post
+
+
+async def post_processing(
+    client: AsyncClient,
+    inputs: Dict,
+    post_processing_type: str,
+    response_log: Dict,
+    task_id: str,
+) -> Tuple[int, Dict, Dict]:
+    post_processing_start_time = datetime.now()
+    response_log.update(
+        post_processing_start_time=post_processing_start_time.strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+    )
+    inputs["img_size"] = (
+        inputs["image_height"],
+        inputs["image_width"],
+    )
+    pp_response = await post(
+        client,
+        f"{pp_server_url}/post_processing/{post_processing_type}",
+        json=inputs,
+        timeout=settings.TIMEOUT_SECOND,
+    )
+    post_processing_end_time = datetime.now()
+    response_log.update(
+        dict(
+            post_processing_end_time=post_processing_end_time.strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            post_processing_time=post_processing_end_time - post_processing_start_time,
+        )
+    )
+    return (pp_response.status_code, read_json(pp_response), response_log)
+
+
+async def convert_preds_to_texts(
+    client: AsyncClient, rec_preds: Optional[List], id_type: str = ""
+) -> Tuple[int, List]:
+    if charset_codec.is_available and not is_recording() and rec_preds is not None:
+        try:
+            return (200, charset_codec.decode(rec_preds))
+        except Exception:
+            logger.exception("charset decode")
+    request_data = dict(
+        rec_preds=rec_preds,
+        id_type="",
+    )
+    convert_response = await post(
+        client,
+        f"{pp_server_url}/convert/recognition_to_text",
+        json=jsonable_encoder(request_data),
+        timeout=settings.TIMEOUT_SECOND,
+    )
+    return (convert_response.status_code, read_json(convert_response))
+
+
+async def convert_texts_to_preds(
+    client: AsyncClient, texts: List, id_type: str = ""
+) -> Tuple[int, List]:
+    if charset_codec.is_available and not is_recording() and texts is not None:
+        try:
+            return (200, charset_codec.encode(texts))
+        except Exception:
+            logger.exception("charset encode")
+    request_data = dict(
+        texts=texts,
+        id_type="",
+    )
+    convert_response = await post(
+        client,
+        f"{pp_server_url}/convert/text_to_recognition",
+        json=jsonable_encoder(request_data),
+        timeout=settings.TIMEOUT_SECOND,
+    )
+    return (convert_response.status_code, read_json(convert_response))
@@ -0,0 +1,54 @@
+from httpx import AsyncClient
+
+from typing import Dict, Optional
+
+from app.common import settings
+from app.wrapper.aio import pp
+from app.wrapper.aio.batching import get_batcher
+from app.wrapper.recognition import recognition_server_url
+from app.utils.payload import read_json
+from app.utils.rectify import with_rectified_image
+from app.wrapper.aio.upstream import post
+
+
+async def tiamo(
+    client: AsyncClient,
+    inputs: Dict,
+    inference_result: Dict,
+    hint: Optional[Dict] = None,
+    route_name: Optional[str] = None,
+) -> Dict:
+    source = with_rectified_image(inputs)
+    inference_inputs = dict(
+        valid_boxes=inference_result.get("boxes", []),
+        classes=inference_result.get("classes", []),
+        valid_scores=inference_result.get("scores", []),
+        image_path=source.get("image_path"),
+        image_id=inputs.get("image_id"),
+        page=source.get("page"),
+        request_id=inputs.get("request_id"),
+        angle=source.get("angle"),
+    )
+    route_name = "tiamo" if route_name is None else route_name
+    url = f"{recognition_server_url}/{route_name}"
+    if settings.USE_MICRO_BATCHING:
+        status_code, recognition_result = await get_batcher(url).submit(
+            client, inference_inputs
+        )
+    else:
+        recognition_response = await post(
+            client,
+            url,
+            json=inference_inputs,
+            timeout=settings.TIMEOUT_SECOND,
+            headers={"User-Agent": "textscope core"},
+            hedge=True,
+        )
+        status_code = recognition_response.status_code
+        recognition_result = read_json(recognition_response)
+    rec_preds = recognition_result.get("rec_preds")
+    _, recognition_result["texts"] = await pp.convert_preds_to_texts(client, rec_preds)
+    return dict(
+        status_code=status_code,
+        response=recognition_result,
+    )
@@ -0,0 +1,28 @@
+from httpx import AsyncClient
+
+from typing import Dict
+
+from app.common import settings
+from app.wrapper.rotate import rotate_server_url
+from app.utils.payload import read_json
+from app.wrapper.aio.upstream import post
+
+
+async def longinus(
+    client: AsyncClient,
+    inputs: Dict,
+    route_name: str = "rotate",
+) -> Dict:
+    rotate_response = await post(
+        client,
+        f"{rotate_server_url}/{route_name}",
+        json=inputs,
+        timeout=settings.TIMEOUT_SECOND,
+        headers={"User-Agent": "textscope core"},
+    )
+    rotate_result = read_json(rotate_response)
+    response = dict(
+        status_code=rotate_response.status_code,
+        response=rotate_result,
+    )
+    return response
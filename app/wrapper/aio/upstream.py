@@ -0,0 +1,112 @@
+import time
+import asyncio
+
+from httpx import AsyncClient, Response
+
+from typing import Any, Dict
+
+from app.common import settings
+from app.utils.admission import admission
+from app.utils.deadline import with_deadline
+from app.utils.payload import encode_request
+from app.utils.recording import record_call
+from app.utils.tracing import span
+from app.wrapper.breaker import (
+    CircuitBreaker,
+    first_candidate,
+    hedge_delay,
+    hedged_requests_total,
+    next_candidate,
+)
+from app.wrapper.client import clients
+from app.wrapper.upstream import record_payload
+
+
+def send(
+    client: AsyncClient, url: str, breaker: CircuitBreaker, kwargs: Dict[str, Any]
+) -> "asyncio.Future[Response]":
+    """
+    upstream 요청 task, 끝나면 결과를 breaker에 기록
+
+    실행 전에 취소된 task도 done callback에서 기록하므로 half open 시도가 남지 않는다.
+    """
+    try:
+        request_kwargs = with_deadline(kwargs)
+    except BaseException:
+        breaker.release()
+        raise
+    start_time = time.monotonic()
+    task = asyncio.ensure_future(client.post(url, **request_kwargs))
+
+    def record(task: "asyncio.Future[Response]") -> None:
+        latency = time.monotonic() - start_time
+        if task.cancelled():
+            breaker.cancel(latency)
+        elif task.exception() is not None:
+            breaker.record(latency, failed=True)
+        else:
+            breaker.record(latency, failed=task.result().status_code >= 500)
+
+    task.add_done_callback(record)
+    return task
+
+
+def is_success(task: asyncio.Future) -> bool:
+    return task.exception() is None and task.result().status_code < 500
+
+
+async def post(
+    client: AsyncClient, url: str, hedge: bool = False, **kwargs: Any
+) -> Response:
+    """
+    upstream 별 동시 요청 한도 안에서 남은 deadline 만큼만 upstream에 POST 요청
+
+    원래 replica의 circuit이 open 이면 다른 replica로 보내고, 모두 open 이면 CircuitOpen.
+    hedge=True(같은 요청을 여러 번 보내도 되는 요청)이고 USE_HEDGING 이면 최근 latency의
+    HEDGE_PERCENTILE 분위 만큼 기다린 뒤 다른 replica에 같은 요청을 보내 먼저 성공한 응답을 사용한다.
+    """
+    upstream = clients.upstream_of(url)
+    with span("upstream", upstream=upstream) as current:
+        start_time = time.monotonic()
+        response = await hedged_post(
+            client, url, upstream, hedge, encode_request(kwargs, upstream)
+        )
+        record_payload(current, response)
+        record_call(url, kwargs, response, time.monotonic() - start_time)
+        return response
+
+
+async def hedged_post(
+    client: AsyncClient, url: str, upstream: str, hedge: bool, kwargs: Dict[str, Any]
+) -> Response:
+    async with admission.upstream(upstream):
+        (url, breaker), candidates = first_candidate(url)
+        if not (hedge and settings.USE_HEDGING and candidates):
+            return await send(client, url, breaker, kwargs)
+
+        primary = send(client, url, breaker, kwargs)
+        tasks = {primary: "primary"}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay(breaker))
+            hedge_candidate = None if done else next_candidate(candidates)
+            if hedge_candidate is None:
+                return await primary
+            hedge_url, hedge_breaker = hedge_candidate
+            tasks[send(client, hedge_url, hedge_breaker, kwargs)] = "hedge"
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=lambda task: tasks[task] != "primary"):
+                    if is_success(task):
+                        hedged_requests_total.labels(
+                            upstream=upstream, winner=tasks[task]
+                        ).inc()
+                        return task.result()
+            # 둘 다 실패하면 원래 요청의 결과를 그대로 전달
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,219 @@
+import math
+import time
+import threading
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from prometheus_client import Counter, Gauge
+
+from app.common.const import get_settings
+from app.utils.admission import AdmissionRejected
+from app.wrapper.client import clients
+
+
+settings = get_settings()
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+circuit_breaker_state = Gauge(
+    "textscope_circuit_breaker_state",
+    "Circuit breaker state per upstream replica (0: closed, 1: half open, 2: open)",
+    ["upstream", "replica"],
+)
+hedged_requests_total = Counter(
+    "textscope_hedged_requests_total",
+    "Hedged upstream requests by the request that answered first",
+    ["upstream", "winner"],
+)
+
+
+class CircuitOpen(AdmissionRejected):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(3504, retry_after, "circuit_open")
+
+
+class CircuitBreaker:
+    """
+    upstream replica 하나의 circuit breaker
+
+    최근 window_second 동안의 요청이 min_requests 이상이고 error rate 또는 p95 latency가
+    기준을 넘으면 open 되어 open_second 동안 요청을 보내지 않는다. 이후 half open 상태에서
+    요청 하나를 보내보고 성공하면 close, 실패하면 다시 open 한다.
+    sync pipeline은 thread에서 호출하므로 lock으로 상태를 보호한다.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        replica: str,
+        window_second: float = settings.CIRCUIT_BREAKER_WINDOW_SECOND,
+        min_requests: int = settings.CIRCUIT_BREAKER_MIN_REQUESTS,
+        error_rate: float = settings.CIRCUIT_BREAKER_ERROR_RATE,
+        p95_latency_ms: float = settings.CIRCUIT_BREAKER_P95_LATENCY_MS,
+        open_second: float = settings.CIRCUIT_BREAKER_OPEN_SECOND,
+    ) -> None:
+        self.upstream = upstream
+        self.replica = replica
+        self.window_second = window_second
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.p95_latency_ms = p95_latency_ms
+        self.open_second = open_second
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._probing = False
+        # (요청 종료 시각, latency(초), 실패 여부)
+        self._calls: Deque[Tuple[float, float, bool]] = deque()
+        self._lock = threading.Lock()
+        self._set_state("closed")
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        circuit_breaker_state.labels(upstream=self.upstream, replica=self.replica).set(
+            BREAKER_STATES[state]
+        )
+
+    def _trim(self, now: float) -> None:
+        while self._calls and self._calls[0][0] < now - self.window_second:
+            self._calls.popleft()
+
+    def _percentile(self, q: float) -> Optional[float]:
+        if not self._calls:
+            return None
+        latencies = sorted(latency for _, latency, _ in self._calls)
+        return latencies[min(int(len(latencies) * q), len(latencies) - 1)]
+
+    def percentile(self, q: float) -> Optional[float]:
+        """최근 window 동안 요청 latency(초)의 q 분위 값"""
+        with self._lock:
+            self._trim(time.monotonic())
+            return self._percentile(q)
+
+    def sample_count(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def allow(self) -> bool:
+        if not settings.USE_CIRCUIT_BREAKER:
+            return True
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.open_second:
+                    return False
+                self._set_state("half_open")
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def retry_after(self) -> int:
+        remaining = self.open_second - (time.monotonic() - self._opened_at)
+        return max(int(math.ceil(remaining)), 1)
+
+    def record(self, latency: float, failed: bool) -> None:
+        with self._lock:
+            self._record(time.monotonic(), latency, failed)
+
+    def cancel(self, latency: float) -> None:
+        """
+        응답 전에 취소된 요청(hedge에서 진 요청 등)의 결과
+
+        half open 시도였으면 시도만 반환하고, 아니면 latency를 기록해서 느린 replica가
+        hedge delay의 p95 window에 반영되게 한다.
+        """
+        with self._lock:
+            if self.state == "half_open" and self._probing:
+                self._probing = False
+                return
+            self._record(time.monotonic(), latency, failed=False)
+
+    def release(self) -> None:
+        """요청을 보내기 전에 끝난 경우(deadline 초과 등)의 half open 시도 반환"""
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+
+    def _record(self, now: float, latency: float, failed: bool) -> None:
+        if self.state == "half_open" and self._probing:
+            self._probing = False
+            if failed:
+                self._open(now)
+            else:
+                self._calls.clear()
+                self._set_state("closed")
+            return
+        self._calls.append((now, latency, failed))
+        self._trim(now)
+        if (
+            not settings.USE_CIRCUIT_BREAKER
+            or self.state != "closed"
+            or len(self._calls) < self.min_requests
+        ):
+            # breaker를 사용하지 않아도 hedge delay 계산을 위해 latency는 기록
+            return
+        failures = sum(1 for _, _, is_failed in self._calls if is_failed)
+        p95_latency = self._percentile(0.95)
+        if failures / len(self._calls) >= self.error_rate or (
+            self.p95_latency_ms > 0
+            and p95_latency is not None
+            and p95_latency * 1000 >= self.p95_latency_ms
+        ):
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._calls.clear()
+        self._set_state("open")
+
+
+breakers: Dict[str, CircuitBreaker] = dict()
+breakers_lock = threading.Lock()
+
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    with breakers_lock:
+        if base_url not in breakers:
+            breakers[base_url] = CircuitBreaker(clients.upstream_of(base_url), base_url)
+        return breakers[base_url]
+
+
+def get_candidates(url: str) -> List[Tuple[str, CircuitBreaker]]:
+    """url을 처리할 수 있는 replica 별 url과 breaker, 원래 url이 첫 번째"""
+    base_url = clients.base_url_of(url)
+    if base_url is None:
+        return [(url, get_breaker(url))]
+    path = url[len(base_url):]
+    return [
+        (f"{replica_url}{path}", get_breaker(replica_url))
+        for replica_url in [base_url] + clients.replicas_of(base_url)
+    ]
+
+
+def next_candidate(
+    candidates: List[Tuple[str, CircuitBreaker]]
+) -> Optional[Tuple[str, CircuitBreaker]]:
+    """요청을 보낼 수 있는 다음 replica, 남은 replica가 모두 open 이면 None"""
+    while candidates:
+        candidate = candidates.pop(0)
+        if candidate[1].allow():
+            return candidate
+    return None
+
+
+def first_candidate(url: str) -> Tuple[Tuple[str, CircuitBreaker], List]:
+    """요청을 보낼 첫 replica와 hedge에 사용할 나머지 replica, 모두 open 이면 CircuitOpen"""
+    candidates = get_candidates(url)
+    retry_after = min(breaker.retry_after() for _, breaker in candidates)
+    candidate = next_candidate(candidates)
+    if candidate is None:
+        raise CircuitOpen(retry_after)
+    return candidate, candidates
+
+
+def hedge_delay(breaker: CircuitBreaker) -> float:
+    """hedge 요청을 보내기 전 기다리는 시간(초), 최근 latency의 HEDGE_PERCENTILE 분위 값"""
+    delay = settings.HEDGE_DEFAULT_DELAY_MS / 1000
+    if breaker.sample_count() >= settings.CIRCUIT_BREAKER_MIN_REQUESTS:
+        delay = breaker.percentile(settings.HEDGE_PERCENTILE) or delay
+    return max(delay, settings.HEDGE_MIN_DELAY_MS / 1000)
@@ -3,6 +3,9 @@ from httpx import Client
 from typing import Dict, Optional
 
 from app.common import settings
+from app.utils.payload import read_json
+from app.utils.rectify import with_rectified_image
+from app.wrapper.upstream import post
 
 
 supported_class = ["처방전", "보험금청구서"]
@@ -16,15 +19,16 @@ def longinus(
     hint: Optional[Dict] = None,
     route_name: Optional[str] = None,
 ) -> Dict:
-    inference_inputs = inputs
+    inference_inputs = with_rectified_image(inputs)
     route_name = "duriel" if route_name is None else route_name
-    classification_response = client.post(
+    classification_response = post(
+        client,
         f"{classification_server_url}/{route_name}",
         json=inference_inputs,
         timeout=settings.TIMEOUT_SECOND,
         headers={"User-Agent": "textscope core"},
     )
-    classification_result = classification_response.json()
+    classification_result = read_json(classification_response)
     response = dict(
         status_code=classification_response.status_code,
         response=classification_result,
@@ -44,6 +48,7 @@ def duriel(
     route_name: Optional[str] = None,
 ) -> Dict:
     # TODO: hint 사용 가능하도록 구성
+    source = with_rectified_image(inputs)
     duriel_inputs = {
         "scores": inference_result.get("scores", []),
         "boxes": inference_result.get("boxes", []),
@@ -54,20 +59,21 @@ def duriel(
             inference_result.get("image_width"),
         ),
         "request_id": inputs.get("request_id"),
-        "image_path": inputs.get("image_path"),
+        "image_path": source.get("image_path"),
         "image_id": inputs.get("image_id"),
-        "angle": inputs.get("angle"),
-        "page": inputs.get("page"),
+        "angle": source.get("angle"),
+        "page": source.get("page"),
         "doc_type": doc_type,
     }
     route_name = "duriel" if route_name is None else route_name
-    classification_response = client.post(
+    classification_response = post(
+        client,
         f"{classification_server_url}/{route_name}",
         json=duriel_inputs,
         timeout=settings.TIMEOUT_SECOND,
         headers={"User-Agent": "textscope core"},
     )
-    classification_result = classification_response.json()
+    classification_result = read_json(classification_response)
     response = dict(
         status_code=classification_response.status_code,
         response=classification_result,
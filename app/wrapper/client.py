@@ -0,0 +1,199 @@
+import importlib.util
+
+from httpx import AsyncClient, Client, Limits, HTTPTransport, AsyncHTTPTransport
+from httpx import Request, Response
+from typing import Dict, Iterator, List, Optional
+from fastapi import FastAPI
+from prometheus_client import Counter, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+from app.common.const import get_settings
+from app.utils.logging import logger
+
+
+settings = get_settings()
+is_http2_available = importlib.util.find_spec("h2") is not None
+
+upstream_requests_total = Counter(
+    "textscope_upstream_requests_total",
+    "Requests sent to model and post-processing servers",
+    ["upstream", "status_code", "http_version"],
+)
+
+
+def get_upstreams() -> Dict[str, str]:
+    """core가 호출하는 upstream 이름과 base url"""
+    serving_ip_addr = settings.SERVING_IP_ADDR
+    upstreams = dict(
+        serving=f"http://{serving_ip_addr}:{settings.SERVING_IP_PORT}",
+        general_detection=f"http://{serving_ip_addr}:{settings.GENERAL_DETECTION_SERVICE_PORT}",
+        recognition=f"http://{serving_ip_addr}:{settings.RECOGNITION_SERVICE_PORT}",
+        classification=f"http://{serving_ip_addr}:{settings.CLASSIFICATION_SERVICE_PORT}",
+        kv_detection=f"http://{serving_ip_addr}:{settings.KV_DETECTION_SERVICE_PORT}",
+        rotate=f"http://{serving_ip_addr}:{settings.ROTATE_SERVICE_PORT}",
+        pp=f"http://{settings.PP_IP_ADDR}:{settings.PP_IP_PORT}",
+    )
+    return upstreams
+
+
+def get_upstream_limits(upstream: str) -> Limits:
+    limits = dict(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    limits.update(settings.HTTP_UPSTREAM_LIMITS.get(upstream, {}))
+    return Limits(**limits)
+
+
+class ClientRegistry:
+    """
+    application 수명 동안 유지되는 httpx client 모음
+
+    upstream(base url)마다 별도의 transport를 mount해서 keep-alive pool과 limit을
+    upstream 단위로 관리한다. 같은 base url을 가진 upstream은 하나의 pool을 공유한다.
+    """
+
+    def __init__(self, app: Optional[FastAPI] = None) -> None:
+        self._client: Optional[Client] = None
+        self._async_client: Optional[AsyncClient] = None
+        self._transports: Dict[str, Dict] = dict()
+        self.upstream_names: Dict[str, str] = dict()
+        for name, url in get_upstreams().items():
+            self.upstream_names.setdefault(url, name)
+        for name, replica_urls in settings.UPSTREAM_REPLICAS.items():
+            for url in replica_urls:
+                self.upstream_names.setdefault(url.rstrip("/"), name)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: FastAPI) -> None:
+        @app.on_event("startup")
+        def startup() -> None:
+            self.client
+            self.async_client
+            logger.info(
+                f"HTTP client pools created for {list(self.upstream_names.values())}"
+            )
+
+        @app.on_event("shutdown")
+        async def shutdown() -> None:
+            await self.aclose()
+            logger.info("HTTP client pools closed")
+
+    def base_url_of(self, url: str) -> Optional[str]:
+        for base_url in self.upstream_names:
+            if url.startswith(base_url):
+                return base_url
+        return None
+
+    def upstream_of(self, url: str) -> str:
+        base_url = self.base_url_of(url)
+        return "unknown" if base_url is None else self.upstream_names[base_url]
+
+    def replicas_of(self, base_url: str) -> List[str]:
+        """같은 upstream을 처리하는 다른 replica의 base url"""
+        name = self.upstream_names.get(base_url)
+        return [
+            replica_url
+            for replica_url, replica_name in self.upstream_names.items()
+            if replica_name == name and replica_url != base_url
+        ]
+
+    @property
+    def http2(self) -> bool:
+        # h2c(prior knowledge) 미지원: https upstream 에서만 HTTP/2 협상
+        return settings.USE_HTTP2 and is_http2_available
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            mounts = {
+                base_url: HTTPTransport(
+                    http2=self.http2, limits=get_upstream_limits(name)
+                )
+                for base_url, name in self.upstream_names.items()
+            }
+            self._transports["sync"] = mounts
+            self._client = Client(
+                mounts=mounts,
+                timeout=settings.TIMEOUT_SECOND,
+                event_hooks={"response": [self._count_response]},
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncClient:
+        if self._async_client is None:
+            mounts = {
+                base_url: AsyncHTTPTransport(
+                    http2=self.http2, limits=get_upstream_limits(name)
+                )
+                for base_url, name in self.upstream_names.items()
+            }
+            self._transports["async"] = mounts
+            self._async_client = AsyncClient(
+                mounts=mounts,
+                timeout=settings.TIMEOUT_SECOND,
+                event_hooks={"response": [self._async_count_response]},
+            )
+        return self._async_client
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        self._transports.clear()
+
+    def _count_response(self, response: Response) -> None:
+        request: Request = response.request
+        upstream_requests_total.labels(
+            upstream=self.upstream_of(str(request.url)),
+            status_code=response.status_code,
+            http_version=response.http_version,
+        ).inc()
+
+    async def _async_count_response(self, response: Response) -> None:
+        self._count_response(response)
+
+    def pool_connections(self) -> Iterator:
+        """(client 종류, upstream, idle 여부) 단위로 pool의 connection 수를 반환"""
+        for kind, mounts in self._transports.items():
+            for base_url, transport in mounts.items():
+                # httpcore connection pool 내부 상태라 버전에 따라 없을 수 있음
+                connections = getattr(transport._pool, "_connections", {})
+                idle = active = 0
+                for origin_connections in list(connections.values()):
+                    for connection in list(origin_connections):
+                        is_idle = getattr(connection, "is_idle", lambda: False)
+                        if is_idle():
+                            idle += 1
+                        else:
+                            active += 1
+                yield kind, self.upstream_names[base_url], idle, active
+
+
+class ClientPoolCollector:
+    def __init__(self, registry: ClientRegistry) -> None:
+        self.registry = registry
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        gauge = GaugeMetricFamily(
+            "textscope_http_pool_connections",
+            "Open pooled connections to model and post-processing servers",
+            labels=["client", "upstream", "state"],
+        )
+        try:
+            for kind, upstream, idle, active in self.registry.pool_connections():
+                gauge.add_metric([kind, upstream, "idle"], idle)
+                gauge.add_metric([kind, upstream, "active"], active)
+        except Exception:
+            logger.exception("collect http pool metrics")
+        yield gauge
+
+
+clients = ClientRegistry()
+REGISTRY.register(ClientPoolCollector(clients))
@@ -3,6 +3,9 @@ from httpx import Client
 from typing import Dict, Optional
 
 from app.common import settings
+from app.utils.payload import read_json
+from app.utils.rectify import with_rectified_image
+from app.wrapper.upstream import post
 
 
 kv_detection_server_url = f"http://{settings.SERVING_IP_ADDR}:{settings.KV_DETECTION_SERVICE_PORT}"
@@ -17,17 +20,18 @@ def agamotto(
     route_name: Optional[str] = None,
 ) -> Dict:
     # TODO: hint 사용 가능하도록 구성
-    inference_inputs = inputs
+    inference_inputs = with_rectified_image(inputs)
     if "model_name" in inference_inputs:
         del inference_inputs["model_name"]
     route_name = "agamotto" if route_name is None else route_name
-    detection_response = client.post(
+    detection_response = post(
+        client,
         url=f"{general_detection_server_url}/{route_name}",
         json=inference_inputs,
         timeout=settings.TIMEOUT_SECOND,
         headers={"User-Agent": "textscope core"},
     )
-    detection_result = detection_response.json()
+    detection_result = read_json(detection_response)
     return dict(status_code=detection_response.status_code, response=detection_result)
 
 
@@ -35,11 +39,12 @@ def duriel(
     client: Client,
     inputs: Dict,
     inference_result: Dict,
-    doc_type: str,
+    doc_type: Optional[str],
     hint: Optional[Dict] = None,
     route_name: Optional[str] = None,
 ) -> Dict:
     # TODO: hint 사용 가능하도록 구성
+    source = with_rectified_image(inputs)
     duriel_inputs = {
         "scores": inference_result.get("scores", []),
         "boxes": inference_result.get("boxes", []),
@@ -50,17 +55,18 @@ def duriel(
             inference_result.get("image_width"),
         ),
         "request_id": inputs.get("request_id"),
-        "image_path": inputs.get("image_path"),
-        "angle": inputs.get("angle"),
-        "page": inputs.get("page"),
+        "image_path": source.get("image_path"),
+        "angle": source.get("angle"),
+        "page": source.get("page"),
         "doc_type": doc_type,
     }
     route_name = "duriel" if route_name is None else route_name
-    detection_response = client.post(
+    detection_response = post(
+        client,
         f"{kv_detection_server_url}/{route_name}",
         json=duriel_inputs,
         timeout=settings.TIMEOUT_SECOND,
         headers={"User-Agent": "textscope core"},
     )
-    detection_result = detection_response.json()
+    detection_result = read_json(detection_response)
     return dict(status_code=detection_response.status_code, response=detection_result)
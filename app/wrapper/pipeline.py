@@ -10,8 +10,18 @@ from app import wrapper
 from app.models import DocTypeHint
 from app.wrapper import pp
 from app.common import settings
-from app.utils.hint import apply_cls_hint
+from app.utils.hint import (
+    apply_cls_hint,
+    get_planned_doc_type,
+    get_planned_classification_result,
+)
 from app.utils.logging import logger
+from app.utils.tracing import set_trace_tags
+from app.utils.stage_cache import cached_call
+from app.utils.payload import read_json
+from app.utils.rectify import RECTIFIED_IMAGE_KEY, rectify_image
+from app.utils.columnar import KV_COLUMNS, ColumnarResult
+from app.wrapper.upstream import post
 
 from app.utils.utils import (
     pretty_dict,
@@ -120,14 +130,14 @@ def multiple(
     sequence_type: str,
     response_log: Dict,
     hint: Optional[Dict] = None,
-) -> Tuple[int, Dict, Dict]:
+) -> Tuple[Optional[int], Dict, Dict]:
     inference_start_time = datetime.now()
     response_log["inference_start_time"] = inference_start_time.strftime(
         "%Y-%m-%d %H:%M:%S"
     )
     sequence_list = inference_pipeline.get("sequence", {})
     result_set: Dict = dict()
-    latest_result: Dict = dict()
+    latest_result: Optional[Dict] = dict()
     sequence_type_list: List = []
     if isinstance(sequence_list, dict):
         sequence_type_list = sequence_list.get(sequence_type, [])
@@ -147,7 +157,12 @@ def multiple(
         func_name = inputs["model_name"]
 
         call_func = attrgetter(f"{module_name}.{func_name}")(wrapper)
-        result = call_func(client, inputs, latest_result, hint)
+        result = cached_call(
+            method_name,
+            inputs,
+            inputs["route_name"],
+            lambda: call_func(client, inputs, latest_result, hint),
+        )
         latest_result = result_set[method_name] = result.get("response")
 
         inference_end_time = datetime.now()
@@ -195,20 +210,23 @@ def single(
         cls_hint_result = apply_cls_hint(doc_type_hint=doc_type_hint)
         response_log.update(apply_cls_hint_result=cls_hint_result)
         inputs["doc_type"] = cls_hint_result.get("doc_type")
+        set_trace_tags(doc_type=inputs["doc_type"])
 
     inference_start_time = datetime.now()
     response_log["inference_start_time"] = inference_start_time.strftime(
         "%Y-%m-%d %H:%M:%S.%f"
     )[:-3]
     if inputs["doc_type"] == "FN-CB":
-        ocr_response = client.post(
+        ocr_response = post(
+            client,
             f"{model_server_url}/bill_enterprise",
             json=inputs,
             timeout=settings.TIMEOUT_SECOND,
             headers={"User-Agent": "textscope core"},
         )
     else:
-        ocr_response = client.post(
+        ocr_response = post(
+        client,
         f"{model_server_url}/{route_name}",
         json=inputs,
         timeout=settings.TIMEOUT_SECOND,
@@ -228,7 +246,7 @@ def single(
     logger.info(
         f"Inference time: {str((inference_end_time - inference_end_time).total_seconds())}"
     )
-    return (ocr_response.status_code, ocr_response.json(), response_log)
+    return (ocr_response.status_code, read_json(ocr_response), response_log)
 
 
 # TODO: multiple 함수 사용하도록 수정
@@ -245,12 +263,20 @@ def heungkuk_life(
     # Rotate
     rectify = inputs.get("rectify", {})
     if rectify.get("rotation_90n", False) or rectify.get("rotation_fine", False):
-        rotate_result = wrapper.rotate.longinus(client, inputs).get("response", {})
+        rotate_result = cached_call(
+            "rotate", inputs, "longinus", lambda: wrapper.rotate.longinus(client, inputs)
+        ).get("response", {})
         inputs["angle"] = rotate_result.get("angle")
+        rectify_image(inputs)
         logger.debug(f"{task_id}-rotate result:\n{pretty_dict(rotate_result)}")
 
     # General detection
-    agamotto_result = wrapper.detection.agamotto(client, inputs).get("response", {})
+    agamotto_result = cached_call(
+        "general_detection",
+        inputs,
+        "agamotto",
+        lambda: wrapper.detection.agamotto(client, inputs),
+    ).get("response", {})
     logger.debug(f"{task_id}-general detection result:\n{pretty_dict(agamotto_result)}")
     response_log.update(agamotto_result.get("response_log", {}))
     original_image_size = (
@@ -260,9 +286,12 @@ def heungkuk_life(
     response_log.update(original_image_size=original_image_size)
 
     # Recognition
-    tiamo_result = wrapper.recognition.tiamo(client, inputs, agamotto_result).get(
-        "response", {}
-    )
+    tiamo_result = cached_call(
+        "recognition",
+        inputs,
+        "tiamo",
+        lambda: wrapper.recognition.tiamo(client, inputs, agamotto_result),
+    ).get("response", {})
     response_log.update(tiamo_result.get("response_log", {}))
     if settings.SUBSTITUTE_SPCHAR_TO_ALPHA:
         removed_spchar_texts = substitute_spchar_to_alpha(tiamo_result["texts"])
@@ -273,43 +302,54 @@ def heungkuk_life(
         tiamo_result["rec_preds"] = encoded_texts
     duriel_inputs = {**agamotto_result, "texts": tiamo_result["texts"]}
 
-    # Classification
-    duriel_classification_result = wrapper.classification.duriel(
-        client, inputs, duriel_inputs
-    ).get("response", {})
-    logger.debug(
-        f"{task_id}-classification result:\n{pretty_dict(duriel_classification_result)}"
-    )
-    response_log.update(duriel_classification_result.get("response_log", {}))
-
-    doc_type = duriel_classification_result.get("doc_type")
-    score_result = duriel_classification_result.get("scores")
-    duriel_classification_result["score"] = score_result.get(doc_type)
-
-    # Apply doc type hint
-    hint = inputs.get("hint", {})
-    if "doc_type" in hint:
-        doc_type_hint = hint.get("doc_type", {})
-        doc_type_hint = DocTypeHint(**doc_type_hint)
-        cls_hint_result = apply_cls_hint(
-            cls_result=duriel_classification_result, doc_type_hint=doc_type_hint
+    # Plan doc type
+    doc_type, cls_hint_result = get_planned_doc_type(inputs)
+    if doc_type is not None:
+        logger.info(f"{task_id}-skip classification, doc type: {doc_type}")
+        if cls_hint_result:
+            response_log.update(apply_cls_hint_result=cls_hint_result)
+        duriel_classification_result = get_planned_classification_result(doc_type)
+    else:
+        # Classification
+        duriel_classification_result = cached_call(
+            "classification",
+            inputs,
+            "duriel",
+            lambda: wrapper.classification.duriel(client, inputs, duriel_inputs),
+        ).get("response", {})
+        logger.debug(
+            f"{task_id}-classification result:\n{pretty_dict(duriel_classification_result)}"
         )
-        response_log.update(apply_cls_hint_result=cls_hint_result)
-        doc_type = cls_hint_result.get("doc_type")
-        logger.info(f"{task_id}-apply doc type hint: {cls_hint_result}")
+        response_log.update(duriel_classification_result.get("response_log", {}))
+
+        doc_type = duriel_classification_result.get("doc_type")
+        score_result = duriel_classification_result.get("scores", {})
+        duriel_classification_result["score"] = score_result.get(doc_type)
 
-    # Apply static doc type
-    if inputs.get("static_doc_type", None) is not None:
-        doc_type = inputs.get("static_doc_type", None)
-    score_result = duriel_classification_result.get("scores")
-    duriel_classification_result["score"] = score_result.get(doc_type)
+        # Apply doc type hint
+        hint = inputs.get("hint", {})
+        if "doc_type" in hint:
+            doc_type_hint = hint.get("doc_type", {})
+            doc_type_hint = DocTypeHint(**doc_type_hint)
+            cls_hint_result = apply_cls_hint(
+                cls_result=duriel_classification_result, doc_type_hint=doc_type_hint
+            )
+            response_log.update(apply_cls_hint_result=cls_hint_result)
+            doc_type = cls_hint_result.get("doc_type")
+            logger.info(f"{task_id}-apply doc type hint: {cls_hint_result}")
+        duriel_classification_result["score"] = score_result.get(doc_type)
     inputs["doc_type"] = doc_type
+    set_trace_tags(doc_type=inputs["doc_type"])
 
     # Kv detection
     kv_result: Dict = dict()
     if doc_type in settings.DURIEL_SUPPORT_DOCUMENT:
-        kv_result = wrapper.detection.duriel(
-            client, inputs, duriel_inputs, doc_type
+        kv_result = cached_call(
+            "kv_detection",
+            inputs,
+            "duriel",
+            lambda: wrapper.detection.duriel(client, inputs, duriel_inputs, doc_type),
+            extra=doc_type,
         ).get("response", {})
         response_log.update(kv_result.get("response_log", {}))
         try:
@@ -330,6 +370,7 @@ def heungkuk_life(
                     "image_id": inputs.get("image_id"),
                     "page": inputs.get("page"),
                     "request_id": inputs.get("request_id"),
+                    RECTIFIED_IMAGE_KEY: inputs.get(RECTIFIED_IMAGE_KEY),
                 }
                 is_diseases_box = post_processing_results.get("result", {}).get(
                     "preds", {}
@@ -350,35 +391,42 @@ def heungkuk_life(
                             "Diseases box pp 과정에서 문제 발생, {}", post_processing_results
                         )
                     else:
-                        classes = kv_result.get("classes", [])
-                        dcc_indexes = list()
-                        for i in range(len(classes)):
-                            if "HKL01-KV-DCC" == classes[i]:
-                                dcc_indexes.append(i)
-                        for index in sorted(dcc_indexes, reverse=True):
-                            del kv_result["classes"][index]
-                            del kv_result["scores"][index]
-                            del kv_result["texts"][index]
-                            del kv_result["boxes"][index]
-
                         post_processed_results = post_processing_results.get(
                             "result", {}
                         ).get("preds")
-                        kv_result["classes"].extend(
-                            post_processed_results.get("classes")
+                        merged_result = ColumnarResult.from_dict(
+                            kv_result, columns=KV_COLUMNS
+                        ).splice(
+                            ["HKL01-KV-DCC"],
+                            ColumnarResult(
+                                boxes=post_processed_results.get("boxes"),
+                                scores=post_processed_results.get("scores"),
+                                classes=post_processed_results.get("classes"),
+                                texts=dcc_texts,
+                            ),
                         )
-                        kv_result["scores"].extend(post_processed_results.get("scores"))
-                        kv_result["texts"].extend(dcc_texts)
-                        kv_result["boxes"].extend(post_processed_results.get("boxes"))
+                        kv_result.update(merged_result.to_dict())
                         logger.info("Diseases pp result, {}", post_processing_results)
         except Exception:
             logger.exception("DCC pp")
 
     elif doc_type in settings.INSURANCE_SUPPORT_DOCUMENT:
-        kv_result = wrapper.detection.agamotto(client, inputs).get("response", {})
+        kv_result = cached_call(
+            "insurance_detection",
+            inputs,
+            "agamotto",
+            lambda: wrapper.detection.agamotto(client, inputs),
+            extra=doc_type,
+        ).get("response", {})
         response_log.update(kv_result.get("response_log", {}))
         texts = (
-            wrapper.recognition.tiamo(client, inputs, kv_result)
+            cached_call(
+                "insurance_recognition",
+                inputs,
+                "tiamo",
+                lambda: wrapper.recognition.tiamo(client, inputs, kv_result),
+                extra=doc_type,
+            )
             .get("response", {})
             .get("texts")
         )
@@ -1,11 +1,16 @@
 from httpx import Client
 
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
 from datetime import datetime
 from fastapi.encoders import jsonable_encoder
 
 from app.common import settings
+from app.utils.charset import charset_codec
+from app.utils.logging import logger
+from app.utils.recording import is_recording
 from app.wrapper import pp_server_url
+from app.utils.payload import read_json
+from app.wrapper.upstream import post
 
 
 def post_processing(
@@ -25,7 +30,8 @@ def post_processing(
         inputs["image_height"],
         inputs["image_width"],
     )
-    pp_response = client.post(
+    pp_response = post(
+        client,
         f"{pp_server_url}/post_processing/{post_processing_type}",
         json=inputs,
         timeout=settings.TIMEOUT_SECOND,
@@ -34,39 +40,51 @@ def post_processing(
     response_log.update(
         dict(
             post_processing_end_time=post_processing_end_time.strftime(
-                "%Y-%m-do%d %H:%M:%S"
+                "%Y-%m-%d %H:%M:%S"
             ),
             post_processing_time=post_processing_end_time - post_processing_start_time,
         )
     )
-    return (pp_response.status_code, pp_response.json(), response_log)
+    return (pp_response.status_code, read_json(pp_response), response_log)
 
 
 def convert_preds_to_texts(
-    client: Client, rec_preds: List, id_type: str = ""
-) -> Tuple[int, Dict]:
+    client: Client, rec_preds: Optional[List], id_type: str = ""
+) -> Tuple[int, List]:
+    if charset_codec.is_available and not is_recording() and rec_preds is not None:
+        try:
+            return (200, charset_codec.decode(rec_preds))
+        except Exception:
+            logger.exception("charset decode")
     request_data = dict(
         rec_preds=rec_preds,
         id_type="",
     )
-    convert_response = client.post(
+    convert_response = post(
+        client,
         f"{pp_server_url}/convert/recognition_to_text",
         json=jsonable_encoder(request_data),
         timeout=settings.TIMEOUT_SECOND,
     )
-    return (convert_response.status_code, convert_response.json())
+    return (convert_response.status_code, read_json(convert_response))
 
 
 def convert_texts_to_preds(
     client: Client, texts: List, id_type: str = ""
-) -> Tuple[int, Dict]:
+) -> Tuple[int, List]:
+    if charset_codec.is_available and not is_recording() and texts is not None:
+        try:
+            return (200, charset_codec.encode(texts))
+        except Exception:
+            logger.exception("charset encode")
     request_data = dict(
         texts=texts,
         id_type="",
     )
-    convert_response = client.post(
+    convert_response = post(
+        client,
         f"{pp_server_url}/convert/text_to_recognition",
         json=jsonable_encoder(request_data),
         timeout=settings.TIMEOUT_SECOND,
     )
-    return (convert_response.status_code, convert_response.json())
+    return (convert_response.status_code, read_json(convert_response))
@@ -4,6 +4,9 @@ from typing import Dict, Optional
 
 from app.common import settings
 from app.wrapper import pp
+from app.utils.payload import read_json
+from app.utils.rectify import with_rectified_image
+from app.wrapper.upstream import post
 
 
 recognition_server_url = f"http://{settings.SERVING_IP_ADDR}:{settings.RECOGNITION_SERVICE_PORT}"
@@ -16,24 +19,26 @@ def tiamo(
     hint: Optional[Dict] = None,
     route_name: Optional[str] = None,
 ) -> Dict:
+    source = with_rectified_image(inputs)
     inference_inputs = dict(
         valid_boxes=inference_result.get("boxes", []),
         classes=inference_result.get("classes", []),
         valid_scores=inference_result.get("scores", []),
-        image_path=inputs.get("image_path"),
+        image_path=source.get("image_path"),
         image_id=inputs.get("image_id"),
-        page=inputs.get("page"),
+        page=source.get("page"),
         request_id=inputs.get("request_id"),
-        angle=inputs.get("angle"),
+        angle=source.get("angle"),
     )
     route_name = "tiamo" if route_name is None else route_name
-    recognition_response = client.post(
+    recognition_response = post(
+        client,
         f"{recognition_server_url}/{route_name}",
         json=inference_inputs,
         timeout=settings.TIMEOUT_SECOND,
         headers={"User-Agent": "textscope core"},
     )
-    recognition_result = recognition_response.json()
+    recognition_result = read_json(recognition_response)
     rec_preds = recognition_result.get("rec_preds")
     _, recognition_result["texts"] = pp.convert_preds_to_texts(client, rec_preds)
     return dict(
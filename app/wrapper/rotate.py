@@ -3,6 +3,8 @@ from httpx import Client
 from typing import Dict
 
 from app.common import settings
+from app.utils.payload import read_json
+from app.wrapper.upstream import post
 
 
 rotate_server_url = f"http://{settings.SERVING_IP_ADDR}:{settings.ROTATE_SERVICE_PORT}"
@@ -13,13 +15,14 @@ def longinus(
     inputs: Dict,
     route_name: str = "rotate",
 ) -> Dict:
-    rotate_response = client.post(
+    rotate_response = post(
+        client,
         f"{rotate_server_url}/{route_name}",
         json=inputs,
         timeout=settings.TIMEOUT_SECOND,
         headers={"User-Agent": "textscope core"},
     )
-    rotate_result = rotate_response.json()
+    rotate_result = read_json(rotate_response)
     response = dict(
         status_code=rotate_response.status_code,
         response=rotate_result,
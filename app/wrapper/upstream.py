@@ -0,0 +1,47 @@
+import time
+
+from httpx import Client, Response
+
+from typing import Any, Optional
+
+from app.utils.admission import admission
+from app.utils.deadline import with_deadline
+from app.utils.payload import encode_request
+from app.utils.recording import record_call
+from app.utils.tracing import Span, body_size, span
+from app.wrapper.breaker import first_candidate
+from app.wrapper.client import clients
+
+
+def post(client: Client, url: str, **kwargs: Any) -> Response:
+    """
+    upstream 별 동시 요청 한도 안에서 남은 deadline 만큼만 upstream에 POST 요청
+
+    원래 replica의 circuit이 open 이면 다른 replica로 보내고, 모두 open 이면 CircuitOpen
+    """
+    upstream = clients.upstream_of(url)
+    with span("upstream", upstream=upstream) as current:
+        start_time = time.monotonic()
+        with admission.sync_upstream(upstream):
+            request_kwargs = with_deadline(encode_request(kwargs, upstream))
+            # replica를 고른 뒤(half open 시도 포함)에는 결과를 반드시 breaker에 기록
+            (url, breaker), _ = first_candidate(url)
+            send_time = time.monotonic()
+            try:
+                response = client.post(url, **request_kwargs)
+            except Exception:
+                breaker.record(time.monotonic() - send_time, failed=True)
+                raise
+            breaker.record(time.monotonic() - send_time, failed=response.status_code >= 500)
+        latency = time.monotonic() - start_time
+        record_payload(current, response)
+        record_call(url, kwargs, response, latency)
+        return response
+
+
+def record_payload(current: Optional[Span], response: Response) -> None:
+    if current is None:
+        return
+    current.attributes["status_code"] = response.status_code
+    current.add_payload("request", body_size(lambda: response.request.content))
+    current.add_payload("response", body_size(lambda: response.content))
@@ -0,0 +1,71 @@
+import uuid
+import asyncio
+import pytest
+from typing import Callable
+from httpx import AsyncClient
+from unittest.mock import patch, AsyncMock
+from app.wrapper.aio.pipeline import single
+from tests.utils.single_pipeline import FakeInferenceResponse
+from app.common.const import get_settings
+
+settings = get_settings()
+
+
+@pytest.mark.mock
+class TestAsyncSinglePipeline:
+    def setup_method(self, method: Callable) -> None:
+        task_id = str(uuid.uuid4())
+        self.hint = {
+            "doc_type": {"doc_type": "FN-BB", "trust": False, "use": False},
+            "trust": False,
+            "use": False,
+        }
+        # pipeline은 inputs를 dict key로 읽으므로 request body와 같은 key로 구성
+        self.inputs = dict(
+            convert_preds_to_texts=True,
+            customer="textscope",
+            detection_resize_ratio=1.0,
+            detection_score_threshold=0.5,
+            doc_type="None",
+            hint=self.hint,
+            idcard_version="v1",
+            image_id="image_id",
+            image_path="image_path",
+            image_pkey=1,
+            page=1,
+            rectify={"rotation_90n": False, "rotation_fine": False},
+            request_id=task_id,
+            task_id=task_id,
+            use_general_ocr=False,
+        )
+        self.fake_response = FakeInferenceResponse(status_code=200)
+        self.fake_response.response_data = dict(
+            scores=[0.683474],
+            boxes=[[100, 200, 100, 200]],
+            classes=["text"],
+            rec_preds=[[1, 2, 3]],
+            doc_type="FN-BB",
+            image_height=1080,
+            image_width=1920,
+        )
+
+    @patch("app.wrapper.aio.pipeline.AsyncClient.post", new_callable=AsyncMock)
+    def test_async_single_pipeline(self, mock_serving_request: AsyncMock) -> None:
+        """async client로 단일 pipeline에 inference 요청"""
+        mock_serving_request.return_value = self.fake_response
+        inputs = dict(self.inputs)
+        status_code, inference_result, response_log = asyncio.run(
+            single(client=AsyncClient(), inputs=inputs, response_log={})
+        )
+        mock_serving_request.assert_awaited_once_with(
+            f"http://{settings.SERVING_IP_ADDR}:{settings.SERVING_IP_PORT}/ocr",
+            json=inputs,
+            timeout=settings.TIMEOUT_SECOND,
+            headers={"User-Agent": "textscope core"},
+        )
+        assert status_code == 200
+        assert inference_result == self.fake_response.response_data
+        # 사용하지 않는 doc type hint는 적용되지 않음
+        assert inputs["doc_type"] == "None"
+        assert response_log["apply_cls_hint_result"]["is_hint_used"] is False
+        assert "inference_total_time" in response_log
@@ -0,0 +1,84 @@
+import uuid
+import asyncio
+import pytest
+from typing import Dict, Optional
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from app.common.const import get_settings
+
+settings = get_settings()
+
+
+@pytest.mark.mock
+class TestOcrDocument:
+    url = "v1/inference/ocr/document"
+
+    def setup_method(self) -> None:
+        self.running = 0
+        self.max_running = 0
+        self.failing_page: Optional[int] = None
+
+    async def fake_run_ocr(self, inputs: Dict) -> Dict:
+        page = inputs["page"]
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            # 앞 page일수록 늦게 끝나도록 대기
+            await asyncio.sleep(0.01 * (10 - page))
+            if page == self.failing_page:
+                raise RuntimeError("page failed")
+            return dict(response_log={}, inference_results=dict(page=page))
+        finally:
+            self.running -= 1
+
+    def post_document(
+        self, client: TestClient, headers: Dict[str, str], page_count: int, **inputs
+    ) -> Dict:
+        inputs.update(task_id=str(uuid.uuid4()), image_id="image_id", image_path="a.tif")
+        with patch(
+            "app.routes.inference.create_inference_task", return_value=MagicMock(task_pkey=1)
+        ), patch("app.routes.inference.get_image_bytes", return_value=b"image"), patch(
+            "app.routes.inference.get_page_count", return_value=page_count
+        ), patch(
+            "app.routes.inference.run_ocr", new=self.fake_run_ocr
+        ), patch.multiple(
+            settings, DEVELOP=False, USE_ADMISSION_CONTROL=False, DOCUMENT_PAGE_CONCURRENCY=2
+        ):
+            response = client.post(self.url, json=inputs, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_pages_are_returned_in_order(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        result = self.post_document(client, normal_user_token_headers, page_count=5)
+
+        assert result["page_count"] == 5
+        assert [page["page"] for page in result["pages"]] == [1, 2, 3, 4, 5]
+        assert [page["inference_results"]["page"] for page in result["pages"]] == [1, 2, 3, 4, 5]
+
+    def test_page_range_is_clamped_to_document(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        result = self.post_document(
+            client, normal_user_token_headers, page_count=5, first_page=2, last_page=9
+        )
+
+        assert [page["page"] for page in result["pages"]] == [2, 3, 4, 5]
+
+    def test_page_concurrency_is_bounded(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        self.post_document(client, normal_user_token_headers, page_count=6)
+
+        assert self.max_running == 2
+
+    def test_failed_page_returns_error_entry(
+        self, client: TestClient, normal_user_token_headers: Dict[str, str]
+    ) -> None:
+        self.failing_page = 2
+        result = self.post_document(client, normal_user_token_headers, page_count=3)
+
+        pages = result["pages"]
+        assert [page["status_code"] for page in pages] == [200, 500, 200]
+        assert pages[1]["error"]["error_code"] == 9500
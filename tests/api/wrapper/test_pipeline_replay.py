@@ -0,0 +1,111 @@
+import copy
+import uuid
+import asyncio
+import pytest
+from typing import Any, Callable
+from httpx import Client
+from unittest.mock import patch
+from app.routes.inference import execute_ocr
+from app.utils.recording import load_recording, recording_scope, save_recording
+from tests.utils.pipeline_replay import (
+    RecordedUpstream,
+    ReplayMismatch,
+    benchmark,
+    find_regressions,
+    is_same_result,
+    replay_once,
+)
+from tests.utils.single_pipeline import FakeInferenceResponse
+from app.common.const import get_settings
+
+settings = get_settings()
+
+
+@pytest.mark.mock
+class TestPipelineReplay:
+    def setup_method(self, method: Callable) -> None:
+        task_id = str(uuid.uuid4())
+        # pipeline은 inputs를 dict key로 읽으므로 request body와 같은 key로 구성
+        self.inputs = dict(
+            convert_preds_to_texts=True,
+            customer="textscope",
+            detection_resize_ratio=1.0,
+            detection_score_threshold=0.5,
+            doc_type="None",
+            hint={"trust": False, "use": False},
+            idcard_version="v1",
+            image_id="image_id",
+            image_path="image_path",
+            image_pkey=1,
+            page=1,
+            rectify={"rotation_90n": False, "rotation_fine": False},
+            request_id=task_id,
+            task_id=task_id,
+            use_general_ocr=False,
+        )
+        self.inference_result = dict(
+            scores=[0.683474],
+            boxes=[[100, 200, 100, 200]],
+            classes=["text"],
+            rec_preds=[[1, 2, 3]],
+            doc_type="FN-BB",
+            image_height=1080,
+            image_width=1920,
+        )
+
+    def fake_post(self, url: str, **kwargs: Any) -> FakeInferenceResponse:
+        # Client.post를 test instance의 bound method로 바꾸므로 client 인자는 받지 않는다
+        if "/convert/" in url:
+            return FakeInferenceResponse(status_code=200, response_data=["abc"])
+        if "/post_processing/" in url:
+            return FakeInferenceResponse(status_code=200, response_data={"result": {}, "texts": ["abc"]})
+        return FakeInferenceResponse(status_code=200, response_data=copy.deepcopy(self.inference_result))
+
+    def test_record_and_replay(self, tmp_path) -> None:
+        with patch.object(Client, "post", new=self.fake_post), patch.multiple(
+            settings,
+            USE_OCR_PIPELINE="single",
+            USE_PIPELINE_RECORDING=True,
+            PIPELINE_RECORDING_SAMPLE_RATE=1.0,
+        ):
+            with recording_scope(self.inputs) as recording:
+                result = asyncio.run(execute_ocr(dict(self.inputs)))
+        recording_file = save_recording(recording, result, tmp_path)
+
+        recorded = load_recording(recording_file)
+        assert recorded["pipeline"] == "single"
+        assert [call["path"] for call in recorded["calls"]] == [
+            "/ocr",
+            "/convert/recognition_to_text",
+        ]
+        assert recorded["calls"][0]["response"] == self.inference_result
+
+        # replay는 기록된 upstream 응답을 모두 사용하고(아니면 ReplayMismatch) 같은 결과를 만든다
+        replayed = replay_once(recorded)
+        assert is_same_result(recorded, replayed)
+        assert replayed["inference_results"]["doc_type"] == "FN-BB"
+
+        report = benchmark(recording_file, iterations=2)
+        assert report["matched"]
+        assert report["calls"] == len(recorded["calls"])
+
+    def test_recorded_upstream_matches_request(self) -> None:
+        upstream = RecordedUpstream(
+            [
+                dict(path="/tiamo", request={"page": 1}, status_code=200, response={"a": 1}),
+                dict(path="/tiamo", request={"page": 2}, status_code=200, response={"a": 2}),
+            ]
+        )
+
+        assert upstream.respond("http://serving:5000/tiamo", json={"page": 2}).json() == {"a": 2}
+        assert upstream.respond("http://other:5000/tiamo", json={"page": 3}).json() == {"a": 1}
+        with pytest.raises(ReplayMismatch):
+            upstream.respond("http://serving:5000/tiamo", json={"page": 1})
+
+    def test_find_regressions(self) -> None:
+        baseline = {"a.json.gz": {"p50_ms": 10.0}, "b.json.gz": {"p50_ms": 10.0}}
+        report = {"a.json.gz": {"p50_ms": 13.0}, "b.json.gz": {"p50_ms": 11.0}}
+
+        assert [message.split(":")[0] for message in find_regressions(report, baseline, 0.2)] == [
+            "a.json.gz"
+        ]
@@ -1,6 +1,6 @@
 import pytest
 from typing import Dict, Callable
-from app.utils.hint import apply_cls_hint
+from app.utils.hint import apply_cls_hint, get_planned_doc_type
 from app.models import DocTypeHint
 
 
@@ -77,3 +77,23 @@ class TestApplyClsHint:
     def test_doc_type_is_none(self) -> None:
         output = apply_cls_hint(None)
         assert output == self.expected_form
+
+
+@pytest.mark.unit
+class TestGetPlannedDocType:
+    def test_static_doc_type(self) -> None:
+        doc_type, cls_hint_result = get_planned_doc_type({"static_doc_type": "static"})
+        assert doc_type == "static"
+        assert cls_hint_result == {}
+
+    def test_trusted_hint(self) -> None:
+        hint = {"doc_type": {"use": True, "trust": True, "doc_type": "hint doc type"}}
+        doc_type, cls_hint_result = get_planned_doc_type({"hint": hint})
+        assert doc_type == "hint doc type"
+        assert cls_hint_result.get("is_hint_trusted") is True
+
+    def test_untrusted_hint_needs_classification(self) -> None:
+        hint = {"doc_type": {"use": True, "trust": False, "doc_type": "hint doc type"}}
+        doc_type, cls_hint_result = get_planned_doc_type({"hint": hint})
+        assert doc_type is None
+        assert cls_hint_result == {}
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+import pytest
+from typing import List
+from unittest.mock import patch
+from app.utils.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    ConcurrencyLimiter,
+    ThreadConcurrencyLimiter,
+    get_quota_keys,
+)
+
+
+@pytest.mark.unit
+class TestConcurrencyLimiter:
+    def test_rejects_when_queue_is_full(self) -> None:
+        async def run() -> None:
+            limiter = ConcurrencyLimiter("request", "ocr", 1, max_waiting=0)
+            await limiter.acquire()
+            await limiter.acquire()
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            asyncio.run(run())
+        assert exc_info.value.reason == "queue_full"
+        assert exc_info.value.error_code == 3504
+
+    def test_rejects_after_wait_timeout(self) -> None:
+        async def run() -> ConcurrencyLimiter:
+            limiter = ConcurrencyLimiter("request", "ocr", 1, max_waiting=1, wait_timeout=0.01)
+            await limiter.acquire()
+            with pytest.raises(AdmissionRejected) as exc_info:
+                await limiter.acquire()
+            assert exc_info.value.reason == "wait_timeout"
+            return limiter
+
+        limiter = asyncio.run(run())
+        assert limiter.in_flight == 1
+        assert limiter.waiting == 0
+
+    def test_waiters_run_in_arrival_order(self) -> None:
+        async def run() -> List[int]:
+            limiter = ConcurrencyLimiter("request", "ocr", 1, max_waiting=2, wait_timeout=1.0)
+            order = list()
+
+            async def request(index: int) -> None:
+                async with limiter.slot():
+                    order.append(index)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(request(index) for index in range(3)))
+            assert limiter.is_idle
+            return order
+
+        assert asyncio.run(run()) == [0, 1, 2]
+
+
+@pytest.mark.unit
+class TestThreadConcurrencyLimiter:
+    def test_rejects_after_wait_timeout(self) -> None:
+        limiter = ThreadConcurrencyLimiter("upstream", "serving", 1, max_waiting=1, wait_timeout=0.01)
+        limiter.acquire()
+        with pytest.raises(AdmissionRejected) as exc_info:
+            limiter.acquire()
+        assert exc_info.value.reason == "wait_timeout"
+        assert limiter.in_flight == 1
+        assert limiter.waiting == 0
+
+    def test_limits_concurrent_threads(self) -> None:
+        limiter = ThreadConcurrencyLimiter("upstream", "serving", 2, max_waiting=4, wait_timeout=1.0)
+        lock = threading.Lock()
+        running = list()
+        max_running = list()
+
+        def request() -> None:
+            with limiter.slot():
+                with lock:
+                    running.append(1)
+                    max_running.append(len(running))
+                time.sleep(0.01)
+                with lock:
+                    running.pop()
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(max_running) == 2
+        assert limiter.is_idle
+
+
+@pytest.mark.unit
+class TestAdmissionController:
+    def test_quota_rejects_with_retry_after(self) -> None:
+        async def run() -> None:
+            admission = AdmissionController()
+            async with admission.request({"customer": "textscope"}):
+                async with admission.request({"customer": "textscope"}):
+                    pass
+
+        with patch("app.utils.admission.settings.USE_ADMISSION_CONTROL", True), patch(
+            "app.utils.admission.settings.ADMISSION_CUSTOMER_QUOTA", 1
+        ), pytest.raises(AdmissionRejected) as exc_info:
+            asyncio.run(run())
+        response = exc_info.value.to_response()
+        assert response.status_code == 429
+        assert "retry-after" in response.headers
+
+    def test_quota_limiters_are_removed_when_idle(self) -> None:
+        admission = AdmissionController()
+
+        async def run() -> None:
+            async with admission.request({"user": "garam@lomin.ai"}):
+                assert "user:garam@lomin.ai" in admission._quotas
+
+        with patch("app.utils.admission.settings.USE_ADMISSION_CONTROL", True):
+            asyncio.run(run())
+        assert admission._quotas == {}
+
+    def test_sync_upstream_rejects_when_queue_is_full(self) -> None:
+        admission = AdmissionController()
+        with patch("app.utils.admission.settings.USE_ADMISSION_CONTROL", True), patch(
+            "app.utils.admission.settings.ADMISSION_UPSTREAM_LIMITS", {"serving": 1}
+        ), patch("app.utils.admission.settings.ADMISSION_UPSTREAM_MAX_WAITING", 0):
+            with admission.sync_upstream("serving"):
+                with pytest.raises(AdmissionRejected) as exc_info:
+                    with admission.sync_upstream("serving"):
+                        pass
+        assert exc_info.value.reason == "queue_full"
+        assert admission.get_thread_upstream_limiter("serving").is_idle
+
+    def test_get_quota_keys(self) -> None:
+        class User:
+            email = "garam@lomin.ai"
+
+        assert get_quota_keys(User(), {"customer": "textscope"}) == {
+            "customer": "textscope",
+            "user": "garam@lomin.ai",
+        }
+        assert get_quota_keys(None, {}) == {}
@@ -0,0 +1,39 @@
+import json
+import pytest
+from pathlib import Path
+from app.utils.charset import CharsetCodec
+
+
+@pytest.fixture
+def codec(tmp_path: Path) -> CharsetCodec:
+    charset = {
+        "version": "1.0.0",
+        "characters": ["<pad>", "?", "<eos>", "가", "나", "A", "1", " "],
+        "ignore_indexes": [0, 2],
+        "unknown_index": 1,
+        "eos_index": 2,
+    }
+    charset_path = tmp_path.joinpath("charset.json")
+    charset_path.write_text(json.dumps(charset), encoding="utf-8")
+    return CharsetCodec(str(charset_path))
+
+
+@pytest.mark.unit
+class TestCharsetCodec:
+    def test_decode(self, codec: CharsetCodec) -> None:
+        rec_preds = [[3, 4], [5, 0, 6, 2, 3], [], [7, 3, 99]]
+        assert codec.decode(rec_preds) == ["가나", "A1", "", " 가"]
+
+    def test_encode(self, codec: CharsetCodec) -> None:
+        assert codec.encode(["가나", "", "A?b"]) == [[3, 4], [], [5, 1, 1]]
+
+    def test_round_trip(self, codec: CharsetCodec) -> None:
+        texts = ["가 나", "1A", "나"]
+        assert codec.decode(codec.encode(texts)) == texts
+
+    def test_available_only_with_same_version(self, codec: CharsetCodec) -> None:
+        assert codec.is_available is False
+        assert codec.verify("0.9.0") is False
+        assert codec.is_available is False
+        assert codec.verify("1.0.0") is True
+        assert codec.is_available is True
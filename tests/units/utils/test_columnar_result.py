@@ -0,0 +1,92 @@
+import pytest
+import numpy as np
+from app.utils.columnar import ColumnarResult
+
+
+@pytest.mark.unit
+class TestColumnarResult:
+    def setup_method(self) -> None:
+        self.result_dict = dict(
+            boxes=[[0, 0, 10, 10], [10, 10, 20, 20], [20, 20, 30, 30]],
+            scores=[0.9, 0.8, 0.7],
+            classes=["text", "date", "text"],
+            rec_preds=[[1, 2, 3], [4], [5, 6]],
+        )
+
+    def test_round_trip(self) -> None:
+        result = ColumnarResult.from_dict(self.result_dict)
+
+        assert len(result) == 3
+        assert result.rec_preds.shape == (3, 3)
+        assert result.to_dict()["rec_preds"] == self.result_dict["rec_preds"]
+        assert result.to_dict()["classes"] == self.result_dict["classes"]
+
+    def test_filter_keeps_columns_aligned(self) -> None:
+        result = ColumnarResult.from_dict(self.result_dict).with_texts(["a", "b", "c"])
+
+        text_result = result.filter(result.classes == "text")
+
+        assert text_result.to_dict()["texts"] == ["a", "c"]
+        np.testing.assert_allclose(text_result.scores, [0.9, 0.7])
+
+    def test_mismatched_column_raises(self) -> None:
+        with pytest.raises(ValueError):
+            ColumnarResult(boxes=[[0, 0, 1, 1]], scores=[0.1, 0.2])
+
+    def test_zipped_dict_truncates_to_shortest_column(self) -> None:
+        result = ColumnarResult.from_zipped_dict(
+            dict(self.result_dict, texts=["a", "b"]),
+            columns=("boxes", "scores", "classes", "texts"),
+        )
+
+        assert len(result) == 2
+        assert result.to_dict()["texts"] == ["a", "b"]
+        assert result.to_dict()["classes"] == ["text", "date"]
+
+    def test_json_values_are_preserved(self) -> None:
+        result = ColumnarResult.from_dict(self.result_dict)
+
+        assert result.to_dict()["boxes"] == self.result_dict["boxes"]
+        assert result.to_dict()["scores"] == self.result_dict["scores"]
+
+    def test_non_string_classes_are_preserved(self) -> None:
+        result = ColumnarResult.from_dict(dict(self.result_dict, classes=[1, None, 3]))
+
+        assert result.to_dict()["classes"] == [1, None, 3]
+        assert result.select_classes([3]).to_dict()["classes"] == [3]
+
+    def test_splice_replaces_class(self) -> None:
+        result = ColumnarResult.from_dict(self.result_dict).with_texts(["a", "b", "c"])
+        dcc_result = ColumnarResult(
+            boxes=[[5, 5, 6, 6]], scores=[0.5], classes=["dcc"], texts=["d"]
+        )
+
+        spliced = result.splice(["text"], dcc_result).to_dict()
+
+        assert spliced["classes"] == ["date", "dcc"]
+        assert spliced["texts"] == ["b", "d"]
+        assert spliced["boxes"] == [[10, 10, 20, 20], [5, 5, 6, 6]]
+        assert "rec_preds" not in spliced
+
+    def test_concat_pads_rec_preds(self) -> None:
+        result = ColumnarResult.from_dict(self.result_dict)
+
+        concatenated = ColumnarResult.concat([result, result.take([1])])
+
+        assert len(concatenated) == 4
+        assert concatenated.rec_pred_list()[-1] == [4]
+
+    def test_xywh_round_trip(self) -> None:
+        result = ColumnarResult.from_dict(self.result_dict)
+
+        xywh = result.to_xywh()
+
+        assert xywh.tolist()[1] == [10, 10, 10, 10]
+        np.testing.assert_array_equal(ColumnarResult.from_xywh(xywh).boxes, result.boxes)
+
+    def test_iter_predictions(self) -> None:
+        result = ColumnarResult.from_dict(self.result_dict).with_texts(["a", "b", "c"])
+
+        predictions = list(result.iter_predictions())
+
+        assert predictions[0] == {"class": "text", "score": 0.9, "box": [0, 0, 10, 10], "text": "a"}
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.utils.deadline import (
+    DEADLINE_HEADER,
+    DeadlineExceeded,
+    cancel_on_disconnect,
+    deadline_scope,
+    get_deadline,
+    remaining_timeout,
+    with_deadline,
+)
+from app.common.const import get_settings
+
+settings = get_settings()
+
+
+class FakeRequest:
+    def __init__(self, disconnected: bool) -> None:
+        self.disconnected = disconnected
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+@pytest.mark.unit
+class TestDeadline:
+    def test_without_deadline_keeps_default_timeout(self) -> None:
+        kwargs = dict(timeout=settings.TIMEOUT_SECOND, headers={"User-Agent": "textscope core"})
+
+        assert remaining_timeout() == settings.TIMEOUT_SECOND
+        assert with_deadline(kwargs) == kwargs
+
+    def test_upstream_timeout_is_remaining_budget(self) -> None:
+        with deadline_scope(2.0):
+            kwargs = with_deadline(dict(timeout=10.0, headers={"User-Agent": "textscope core"}))
+
+        assert 0 < kwargs["timeout"] <= 2.0
+        assert 0 < int(kwargs["headers"][DEADLINE_HEADER]) <= 2000
+        assert kwargs["headers"]["User-Agent"] == "textscope core"
+
+    def test_nested_scope_keeps_earlier_deadline(self) -> None:
+        with deadline_scope(1.0) as deadline:
+            with deadline_scope(10.0) as nested_deadline:
+                assert nested_deadline is deadline
+            with deadline_scope(None):
+                assert get_deadline() is None
+        assert get_deadline() is None
+
+    def test_expired_deadline_raises(self) -> None:
+        with deadline_scope(-1.0), pytest.raises(DeadlineExceeded):
+            remaining_timeout()
+
+    def test_disconnect_cancels_request(self) -> None:
+        async def run() -> None:
+            upstream = asyncio.ensure_future(asyncio.sleep(10))
+            with deadline_scope(10.0) as deadline, patch(
+                "app.utils.deadline.settings.DISCONNECT_POLL_INTERVAL_SECOND", 0.01
+            ):
+                with pytest.raises(DeadlineExceeded):
+                    await cancel_on_disconnect(FakeRequest(disconnected=True), upstream)
+                assert deadline.cancelled
+            await asyncio.sleep(0)
+            assert upstream.cancelled()
+
+        asyncio.run(run())
@@ -0,0 +1,71 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+from tests.utils.fake_model_server import (
+    FakeServerConfig,
+    RouteProfile,
+    create_fake_app,
+)
+
+
+def get_client(config: FakeServerConfig) -> TestClient:
+    return TestClient(create_fake_app(config))
+
+
+@pytest.mark.unit
+class TestFakeModelServer:
+    def setup_method(self) -> None:
+        self.config = FakeServerConfig.from_dict(
+            dict(
+                default=dict(latency_ms=0, boxes=3, text_length=4),
+                routes=dict(tiamo=dict(error_rate=1.0, error_status=500)),
+                seed=0,
+            )
+        )
+
+    def test_route_profile_inherits_default(self) -> None:
+        assert self.config.profile("tiamo").boxes == 3
+        assert self.config.profile("tiamo").error_rate == 1.0
+        assert self.config.profile("agamotto").error_rate == 0.0
+
+    def test_pipeline_routes(self) -> None:
+        client = get_client(self.config)
+
+        detection_result = client.post("/agamotto", json={"image_path": "a.jpg"}).json()
+        classification_result = client.post("/duriel", json={"texts": []}).json()
+        kv_result = client.post(
+            "/duriel", json={**detection_result, "doc_type": "HKL01-DT-PRS"}
+        ).json()
+        texts = client.post(
+            "/convert/recognition_to_text", json={"rec_preds": [[1, 2], [3]]}
+        ).json()
+
+        assert len(detection_result["boxes"]) == 3
+        assert classification_result["doc_type"] == self.config.doc_type
+        assert len(kv_result["classes"]) == 3
+        assert [len(text) for text in texts] == [2, 1]
+        assert client.get("/livez").status_code == 200
+
+    def test_error_rate(self) -> None:
+        client = get_client(self.config)
+
+        response = client.post("/tiamo", json={"valid_boxes": [[0, 0, 1, 1]]})
+
+        assert response.status_code == 500
+        assert client.get("/status").json()["request_count"] == {"tiamo": 1}
+
+    def test_batch_route(self) -> None:
+        client = get_client(self.config)
+
+        response = client.post("/agamotto/batch", json={"inputs": [{}, {}]})
+
+        assert len(response.json()["outputs"]) == 2
+
+    def test_latency_distribution(self) -> None:
+        profile = RouteProfile(latency_ms=100, latency_jitter_ms=20, distribution="lognormal")
+        rng = random.Random(0)
+
+        latencies = [profile.sample_latency(rng) for _ in range(1000)]
+
+        assert 0.09 < sum(latencies) / len(latencies) < 0.11
+        assert RouteProfile(latency_ms=10, distribution="constant").sample_latency(rng) == 0.01
@@ -0,0 +1,24 @@
+import pytest
+import numpy as np
+import tifffile
+from io import BytesIO
+from pathlib import Path
+from app.utils.image import get_page_count
+
+RESOURCE_PATH = Path(__file__, "../../../resources").resolve()
+
+
+@pytest.mark.unit
+class TestGetPageCount:
+    def test_multi_page_tiff(self) -> None:
+        buffer = BytesIO()
+        tifffile.imwrite(buffer, np.zeros((4, 8, 8), dtype=np.uint8), photometric="minisblack")
+        assert get_page_count(buffer.getvalue(), "document.tif") == 4
+
+    def test_pdf(self) -> None:
+        image_path = Path(RESOURCE_PATH, "supported_image/normal_image/cat-g736138cac_1920.pdf")
+        assert get_page_count(image_path.read_bytes(), image_path.name) == 1
+
+    def test_image(self) -> None:
+        image_path = Path(RESOURCE_PATH, "supported_image/normal_image/cat-g736138cac_1920.jpg")
+        assert get_page_count(image_path.read_bytes(), image_path.name) == 1
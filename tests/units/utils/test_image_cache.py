@@ -0,0 +1,69 @@
+import pytest
+from io import BytesIO
+from PIL import Image
+from unittest.mock import patch
+from app.utils.image import (
+    decode_pillow_from_bytes,
+    get_image_info_from_bytes,
+    read_image_from_bytes,
+    read_pillow_from_bytes,
+)
+from app.utils.image_cache import DecodedImageCache, get_image_nbytes
+
+
+@pytest.mark.unit
+class TestDecodedImageCache:
+    def test_evicts_least_recently_used_over_budget(self) -> None:
+        cache = DecodedImageCache(max_bytes=10)
+        cache.set("a", "a", 4)
+        cache.set("b", "b", 4)
+        cache.get("a", "page")
+        cache.set("c", "c", 4)
+
+        assert cache.get("a", "page") == "a"
+        assert cache.get("b", "page") is None
+        assert cache.get("c", "page") == "c"
+        assert cache.nbytes == 8
+
+    def test_entry_over_budget_is_not_stored(self) -> None:
+        cache = DecodedImageCache(max_bytes=10)
+        cache.set("a", "a", 4)
+        cache.set("b", "b", 11)
+
+        assert cache.get("a", "page") == "a"
+        assert cache.get("b", "page") is None
+        assert len(cache) == 1
+
+    def test_replace_entry_updates_size(self) -> None:
+        cache = DecodedImageCache(max_bytes=10)
+        cache.set("a", "a", 4)
+        cache.set("a", "aa", 6)
+
+        assert cache.get("a", "page") == "aa"
+        assert cache.nbytes == 6
+
+    def test_image_nbytes(self) -> None:
+        assert get_image_nbytes(Image.new("RGB", (40, 20))) == 40 * 20 * 3
+
+
+@pytest.mark.unit
+class TestSharedImageCache:
+    def setup_method(self) -> None:
+        buffered = BytesIO()
+        Image.new("RGB", (40, 20), (255, 255, 255)).save(buffered, "png")
+        self.image_bytes = buffered.getvalue()
+
+    @patch("app.utils.image.image_cache", DecodedImageCache(max_bytes=2 ** 20))
+    def test_page_is_decoded_once(self) -> None:
+        with patch(
+            "app.utils.image.decode_pillow_from_bytes", wraps=decode_pillow_from_bytes
+        ) as mock_decode:
+            image = read_pillow_from_bytes(self.image_bytes, "a.png", 1)
+            rotated = read_image_from_bytes(bytes(self.image_bytes), "b.png", 90.0, 1)
+            image_info = get_image_info_from_bytes(self.image_bytes, "a.png", 1)
+
+        assert mock_decode.call_count == 1
+        assert image.size == (40, 20)
+        assert rotated.size == (20, 40)
+        assert read_image_from_bytes(self.image_bytes, "a.png", 90.0, 1) is rotated
+        assert image_info[1:] == (40, 20, "jpeg")
@@ -0,0 +1,108 @@
+import json
+import asyncio
+import pytest
+from typing import Dict
+from unittest.mock import patch, AsyncMock
+from app.utils.job_queue import JobQueueFull, LocalJobQueue, make_job_status
+from app.routes.prediction import get_job_prediction
+from app.worker import JobWorkerPool
+
+
+@pytest.mark.unit
+class TestLocalJobQueue:
+    def test_put_and_get(self) -> None:
+        async def run() -> Dict:
+            job_queue = LocalJobQueue(max_size=2)
+            await job_queue.put({"task_id": "a"})
+            return await job_queue.get()
+
+        assert asyncio.run(run()) == {"task_id": "a"}
+
+    def test_put_raises_when_full(self) -> None:
+        async def run() -> None:
+            job_queue = LocalJobQueue(max_size=1)
+            await job_queue.put({"task_id": "a"})
+            await job_queue.put({"task_id": "b"})
+
+        with pytest.raises(JobQueueFull):
+            asyncio.run(run())
+
+    def test_status_expires(self) -> None:
+        async def run(status_ttl: int) -> Dict:
+            job_queue = LocalJobQueue(status_ttl=status_ttl)
+            await job_queue.set_status("a", make_job_status("queued", task_id="a"))
+            return await job_queue.get_status("a")
+
+        assert asyncio.run(run(60))["status"] == "queued"
+        assert asyncio.run(run(-1)) is None
+
+
+@pytest.mark.unit
+class TestJobWorkerPool:
+    def run_job(self, run_ocr: AsyncMock) -> Dict:
+        job_queue = LocalJobQueue()
+
+        async def run() -> Dict:
+            with patch("app.worker.job_queue", job_queue), patch(
+                "app.routes.inference.run_ocr", run_ocr
+            ), patch("app.worker.settings.USE_TEXTSCOPE_DATABASE", False):
+                await JobWorkerPool(workers=1).run_job(
+                    {"task_id": "a", "task_pkey": 1, "inputs": {}}
+                )
+            return await job_queue.get_status("a")
+
+        return asyncio.run(run())
+
+    def test_done_job_keeps_result(self) -> None:
+        response = {"response_log": {}, "inference_results": {"texts": ["a"]}}
+        job_status = self.run_job(AsyncMock(return_value=response))
+
+        assert job_status["status"] == "done"
+        assert job_status["progress"] == 1.0
+        assert job_status["result"] == response
+
+    def test_failed_job_keeps_error(self) -> None:
+        job_status = self.run_job(AsyncMock(side_effect=RuntimeError()))
+
+        assert job_status["status"] == "failed"
+        assert job_status["error"]["error_code"] == 9500
+
+    def test_worker_survives_queue_error(self) -> None:
+        job = {"task_id": "a", "task_pkey": 1, "inputs": {}}
+        job_queue = AsyncMock()
+        job_queue.get.side_effect = [ConnectionError(), job, asyncio.CancelledError()]
+        run_job = AsyncMock()
+
+        with patch("app.worker.job_queue", job_queue), patch.object(
+            JobWorkerPool, "run_job", run_job
+        ), patch("app.worker.settings.JOB_QUEUE_RETRY_SECOND", 0), pytest.raises(
+            asyncio.CancelledError
+        ):
+            asyncio.run(JobWorkerPool(workers=1).run())
+
+        run_job.assert_awaited_once_with(job)
+        job_queue.ack.assert_awaited_once_with(job)
+
+
+@pytest.mark.unit
+class TestJobPrediction:
+    def test_running_job(self) -> None:
+        job_status = make_job_status(
+            "running", task_id="a", started_datetime="2026-10-18 08:00:00.000"
+        )
+
+        response = json.loads(get_job_prediction("a", job_status).body)
+
+        assert response["status"] == "running"
+        assert response["task"]["started_datetime"] == "2026-10-18T08:00:00"
+        assert response["task"]["progress"] == 0.5
+        assert response["prediction"] is None
+
+    def test_done_job_returns_result(self) -> None:
+        result = {"response_log": {}, "inference_results": {"texts": ["a"]}}
+        job_status = make_job_status("done", task_id="a", result=result)
+
+        response = json.loads(get_job_prediction("a", job_status).body)
+
+        assert response["task"]["status_code"] == "ST-INF-0003"
+        assert response["prediction"] == result
@@ -0,0 +1,46 @@
+import pytest
+from app.utils.async_multiple_request_testing import (
+    Sample,
+    get_error,
+    get_stage_times,
+    render_html,
+    summarize,
+)
+
+
+@pytest.mark.unit
+class TestLoadTestReport:
+    def test_error_from_error_code(self) -> None:
+        content = {"error": {"error_code": 3504, "error_message": "overloaded"}}
+
+        assert get_error(503, content) == "3504"
+        assert get_error(502, None) == "HTTP 502"
+        assert get_error(200, {"inference_results": {}}) is None
+
+    def test_stage_times_from_response_log(self) -> None:
+        content = {
+            "response_log": {
+                "recognition_inference_time": 0.25,
+                "inference_start_time": "2022-01-01 00:00:00",
+                "original_image_size": [100, 100],
+            }
+        }
+
+        assert get_stage_times(content) == {"recognition_inference_time": 0.25}
+
+    def test_summarize(self) -> None:
+        samples = [
+            Sample("ocr", 200, latency, stage_times={"recognition_inference_time": 0.1})
+            for latency in (0.1, 0.2, 0.3, 0.4)
+        ] + [Sample("ocr", 503, 0.01, error="3504"), Sample("image", None, 1.0, error="ReadTimeout")]
+
+        report = summarize(samples, elapsed=2.0)
+
+        ocr_result = report["targets"]["ocr"]
+        assert ocr_result["requests"] == 5
+        assert ocr_result["throughput"] == 2.0
+        assert ocr_result["latency"]["p50_ms"] == pytest.approx(250.0)
+        assert ocr_result["errors"] == {"3504": 1}
+        assert ocr_result["stages"]["recognition_inference_time"]["p99_ms"] == pytest.approx(100.0)
+        assert report["targets"]["image"]["errors"] == {"ReadTimeout": 1}
+        assert "ReadTimeout" in render_html(report)
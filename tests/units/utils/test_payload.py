@@ -0,0 +1,68 @@
+import json
+import pytest
+import numpy as np
+from typing import Dict
+from unittest.mock import patch
+from app.utils.columnar import ColumnarResult
+from app.utils.payload import (
+    MSGPACK_CONTENT_TYPE,
+    encode_request,
+    packb,
+    read_json,
+    unpackb,
+)
+
+pytest.importorskip("msgpack")
+
+
+class FakeResponse:
+    def __init__(self, content: bytes, content_type: str) -> None:
+        self.content = content
+        self.headers = {"content-type": content_type}
+
+    def json(self) -> Dict:
+        return json.loads(self.content)
+
+
+@pytest.mark.unit
+class TestBinaryPayload:
+    def test_ndarray_round_trip(self) -> None:
+        boxes = np.arange(8, dtype=np.float32).reshape(2, 4)
+
+        decoded = unpackb(packb({"boxes": boxes}), as_list=False)
+
+        assert decoded["boxes"].dtype == np.float32
+        np.testing.assert_array_equal(decoded["boxes"], boxes)
+        assert unpackb(packb({"boxes": boxes}))["boxes"] == boxes.tolist()
+
+    def test_columnar_result_is_packed_as_arrays(self) -> None:
+        result = ColumnarResult(
+            boxes=[[0, 0, 10, 10]], scores=[0.9], classes=["text"], rec_preds=[[1, 2]]
+        )
+
+        decoded = unpackb(packb(result))
+
+        assert decoded["boxes"] == [[0.0, 0.0, 10.0, 10.0]]
+        assert decoded["classes"] == ["text"]
+        assert decoded["rec_preds"] == [[1, 2]]
+
+    def test_read_json_by_content_type(self) -> None:
+        body = {"scores": [0.5]}
+
+        assert read_json(FakeResponse(packb(body), MSGPACK_CONTENT_TYPE)) == body
+        assert read_json(FakeResponse(json.dumps(body).encode(), "application/json")) == body
+
+    def test_encode_request_only_when_enabled(self) -> None:
+        kwargs = dict(json={"valid_boxes": [[0, 0, 1, 1]]}, headers={"User-Agent": "textscope core"})
+
+        assert encode_request(kwargs, "serving") == kwargs
+        with patch("app.utils.payload.settings.USE_BINARY_PAYLOAD", True), patch(
+            "app.utils.payload.settings.BINARY_PAYLOAD_UPSTREAMS", ["serving"]
+        ):
+            assert encode_request(kwargs, "pp") == kwargs
+            request_kwargs = encode_request(kwargs, "serving")
+
+        assert "json" not in request_kwargs
+        assert request_kwargs["headers"]["Content-Type"] == MSGPACK_CONTENT_TYPE
+        assert request_kwargs["headers"]["User-Agent"] == "textscope core"
+        assert unpackb(request_kwargs["content"]) == kwargs["json"]
@@ -0,0 +1,69 @@
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from PIL import Image
+from app.utils.pdf import PdfDocument, PdfDocumentCache, get_pdf_page_count
+
+RESOURCE_PATH = Path(__file__, "../../../resources").resolve()
+
+
+def make_pdf(pages: list) -> bytes:
+    """(width, height, rotate) 목록으로 내용 없는 pdf 생성"""
+    page_ids = [3 + index for index in range(len(pages))]
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(pages)} >>",
+    ] + [
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] /Rotate {rotate} >>"
+        for width, height, rotate in pages
+    ]
+    body = b"%PDF-1.4\n"
+    offsets = list()
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode()
+    xref = f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(
+        f"{offset:010d} 00000 n \n" for offset in offsets
+    )
+    trailer = f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{len(body)}\n%%EOF\n"
+    return body + xref.encode() + trailer.encode()
+
+
+@pytest.mark.unit
+class TestPdfDocument:
+    def setup_method(self) -> None:
+        self.document = PdfDocument(make_pdf([(612, 792, 0), (612, 792, 90)]))
+
+    def test_page_info_without_rendering(self) -> None:
+        assert self.document.page_count == 2
+        assert self.document.get_page_size(1, dpi=72) == (612, 792)
+        assert self.document.get_page_size(2, dpi=72) == (792, 612)
+        assert self.document.get_page_size(1, dpi=200) == (1700, 2200)
+        with pytest.raises(IndexError):
+            self.document.get_page_info(3)
+
+    def test_size_cap_lowers_dpi(self) -> None:
+        assert self.document.get_render_dpi(1, dpi=200, max_side=1100) == 100
+        assert self.document.get_render_dpi(1, dpi=200, max_side=0) == 200
+
+    @patch("app.utils.pdf.rasterizer.render")
+    def test_render_only_requested_page(self, mock_render: MagicMock) -> None:
+        mock_render.return_value = Image.new("RGB", (850, 1100))
+
+        self.document.render_page(2, dpi=200, max_side=1100, fmt="jpeg")
+
+        mock_render.assert_called_once_with(self.document.path, 2, 100, "jpeg")
+
+    def test_document_is_reused(self) -> None:
+        cache = PdfDocumentCache(max_size=1)
+        pdf_bytes = make_pdf([(100, 100, 0)])
+
+        document = cache.get(pdf_bytes)
+
+        assert cache.get(bytes(pdf_bytes)) is document
+        cache.get(make_pdf([(200, 100, 0)]))
+        assert cache.get(pdf_bytes) is not document
+
+    def test_resource_page_count(self) -> None:
+        image_path = Path(RESOURCE_PATH, "supported_image/normal_image/Merged_document.pdf")
+        assert get_pdf_page_count(image_path) == 2
@@ -0,0 +1,75 @@
+import time
+import pytest
+import subprocess
+import threading
+from io import BytesIO
+from PIL import Image
+from unittest.mock import patch
+from app.utils.rasterizer import PdfRasterizeError, PdfRasterizer
+
+
+def make_ppm(size: tuple) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, (255, 255, 255)).save(buffer, "ppm")
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+class TestPdfRasterizer:
+    def test_page_is_read_from_stdout(self) -> None:
+        rasterizer = PdfRasterizer(max_workers=2, timeout=10.0)
+        completed = subprocess.CompletedProcess([], 0, stdout=make_ppm((30, 20)), stderr=b"")
+        with patch("app.utils.rasterizer.subprocess.run", return_value=completed) as mock_run:
+            image = rasterizer.render("/tmp/a.pdf", page=3, dpi=150, fmt="jpeg")
+
+        assert image.size == (30, 20)
+        assert mock_run.call_args[0][0] == [
+            "pdftoppm", "-f", "3", "-l", "3", "-r", "150", "-jpeg", "/tmp/a.pdf"
+        ]
+
+    def test_failed_process(self) -> None:
+        rasterizer = PdfRasterizer(max_workers=1, timeout=10.0)
+        completed = subprocess.CompletedProcess([], 1, stdout=b"", stderr=b"Syntax Error")
+        with patch("app.utils.rasterizer.subprocess.run", return_value=completed):
+            with pytest.raises(PdfRasterizeError, match="Syntax Error"):
+                rasterizer.render("/tmp/a.pdf", page=1, dpi=150)
+
+    def test_timeout(self) -> None:
+        rasterizer = PdfRasterizer(max_workers=1, timeout=0.1)
+        with patch(
+            "app.utils.rasterizer.subprocess.run",
+            side_effect=subprocess.TimeoutExpired("pdftoppm", 0.1),
+        ):
+            with pytest.raises(PdfRasterizeError):
+                rasterizer.render("/tmp/a.pdf", page=1, dpi=150)
+
+    def test_concurrency_is_bounded(self) -> None:
+        rasterizer = PdfRasterizer(max_workers=2, timeout=10.0)
+        running = list()
+        max_running = list()
+        lock = threading.Lock()
+
+        def run(*args, **kwargs) -> subprocess.CompletedProcess:
+            with lock:
+                running.append(1)
+                max_running.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+            return subprocess.CompletedProcess([], 0, stdout=make_ppm((2, 2)), stderr=b"")
+
+        with patch("app.utils.rasterizer.subprocess.run", side_effect=run):
+            threads = [
+                threading.Thread(target=rasterizer.render, args=("/tmp/a.pdf", 1, 72))
+                for _ in range(6)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert max(max_running) == 2
+
+    def test_unsupported_format(self) -> None:
+        with pytest.raises(ValueError):
+            PdfRasterizer(max_workers=1).build_command("/tmp/a.pdf", 1, 72, "gif")
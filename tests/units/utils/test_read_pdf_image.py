@@ -11,15 +11,15 @@ RESOURCE_PATH = Path(__file__, "../../../resources").resolve()
 
 @pytest.mark.unit
 class TestReadPDFImage:
-    @patch("app.utils.utils.convert_from_path")
+    @patch("app.utils.utils.render_pdf_page")
     def test_noraml_image_using_mocking(
-        self, mock_convert_from_path: MagicMock
+        self, mock_render_pdf_page: MagicMock
     ) -> None:
         fake_image_path = "/fake/image_path.pdf"
         fake_pdf_image_data = np.full((480, 640, 3), 255, dtype=np.uint8)
-        mock_convert_from_path.return_value = [Image.fromarray(fake_pdf_image_data)]
-        output = read_pdf_image(fake_image_path)
-        mock_convert_from_path.assert_called_once_with(Path(fake_image_path))
+        mock_render_pdf_page.return_value = Image.fromarray(fake_pdf_image_data)
+        output = read_pdf_image(fake_image_path, page=2)
+        mock_render_pdf_page.assert_called_once_with(Path(fake_image_path), 2)
         assert isinstance(output, Image.Image)
 
     def test_not_exist_image_path(self) -> None:
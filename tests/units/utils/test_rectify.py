@@ -0,0 +1,76 @@
+import pytest
+from pathlib import Path
+from PIL import Image
+from unittest.mock import patch
+from app.utils.image import read_image_from_bytes
+from app.utils.rectify import (
+    RECTIFIED_IMAGE_KEY,
+    rectify_image,
+    with_rectified_image,
+)
+
+
+@pytest.mark.unit
+@patch("app.utils.rectify.settings.USE_RECTIFIED_IMAGE", True)
+@patch("app.utils.rectify.settings.USE_MINIO", False)
+@patch("app.utils.image.settings.USE_MINIO", False)
+class TestRectifyImage:
+    def make_inputs(self, tmp_path: Path, angle: float) -> dict:
+        image_path = tmp_path.joinpath("image_id", "a.png")
+        image_path.parent.mkdir()
+        Image.new("RGB", (40, 20), (255, 255, 255)).save(image_path)
+        return dict(
+            image_id="image_id", image_path=str(image_path), page=1, angle=angle, task_id="t"
+        )
+
+    def test_rectified_page_is_passed_downstream(self, tmp_path: Path) -> None:
+        inputs = self.make_inputs(tmp_path, 90)
+
+        rectified = rectify_image(inputs)
+
+        rectified_path = Path(rectified["image_path"])
+        assert rectified_path.parent == Path(inputs["image_path"]).parent
+        assert Image.open(rectified_path).size == (20, 40)
+        assert inputs[RECTIFIED_IMAGE_KEY] == rectified
+        source = with_rectified_image(inputs)
+        assert source["image_path"] == str(rectified_path)
+        assert (source["page"], source["angle"]) == (1, 0.0)
+        assert source["task_id"] == "t" and RECTIFIED_IMAGE_KEY not in source
+        assert inputs["angle"] == 90
+
+    def test_saved_page_is_reused(self, tmp_path: Path) -> None:
+        inputs = self.make_inputs(tmp_path, 90)
+        first = rectify_image(dict(inputs))
+
+        with patch(
+            "app.utils.image.read_image_from_bytes", wraps=read_image_from_bytes
+        ) as mock_read:
+            second = rectify_image(dict(inputs))
+
+        assert second == first
+        mock_read.assert_not_called()
+
+    def test_reuploaded_image_is_rectified_again(self, tmp_path: Path) -> None:
+        inputs = self.make_inputs(tmp_path, 90)
+        first = rectify_image(dict(inputs))
+        Image.new("RGB", (60, 20), (0, 0, 0)).save(inputs["image_path"])
+
+        second = rectify_image(dict(inputs))
+
+        assert second["image_path"] != first["image_path"]
+        assert Image.open(second["image_path"]).size == (20, 60)
+
+    @pytest.mark.parametrize("angle", [0, None])
+    def test_no_rotation(self, tmp_path: Path, angle) -> None:
+        inputs = self.make_inputs(tmp_path, angle)
+
+        assert rectify_image(inputs) is None
+        assert with_rectified_image(inputs) is inputs
+
+    def test_unreadable_image_falls_back_to_original(self, tmp_path: Path) -> None:
+        inputs = dict(
+            image_id="image_id", image_path=str(tmp_path.joinpath("none.png")), page=1, angle=90
+        )
+
+        assert rectify_image(inputs) is None
+        assert RECTIFIED_IMAGE_KEY not in inputs
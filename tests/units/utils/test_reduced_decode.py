@@ -0,0 +1,92 @@
+import cv2
+import base64
+import pytest
+from io import BytesIO
+from PIL import Image
+from unittest.mock import patch
+from app.models import ImageCropBbox
+from app.utils.image import (
+    get_crop_image,
+    get_decode_scale,
+    get_image_info_from_bytes,
+    read_image_from_bytes,
+)
+from app.utils.image_cache import DecodedImageCache
+
+
+def make_image_bytes(size: tuple, file_format: str) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", size, (255, 255, 255)).save(buffered, file_format)
+    return buffered.getvalue()
+
+
+@pytest.mark.unit
+class TestGetDecodeScale:
+    def test_max_side(self) -> None:
+        assert get_decode_scale((400, 200), max_side=100) == 0.25
+
+    def test_smaller_of_max_side_and_scale(self) -> None:
+        assert get_decode_scale((400, 200), max_side=100, scale=0.1) == 0.1
+        assert get_decode_scale((400, 200), max_side=200, scale=0.9) == 0.5
+
+    def test_never_upscale(self) -> None:
+        assert get_decode_scale((400, 200), max_side=1000) == 1.0
+        assert get_decode_scale((400, 200)) == 1.0
+
+
+@pytest.mark.unit
+class TestReducedDecode:
+    def setup_method(self) -> None:
+        self.cache_patch = patch("app.utils.image.image_cache", DecodedImageCache(max_bytes=2 ** 22))
+        self.cache_patch.start()
+
+    def teardown_method(self) -> None:
+        self.cache_patch.stop()
+
+    def test_jpeg_uses_dct_scaling(self) -> None:
+        image_bytes = make_image_bytes((400, 200), "jpeg")
+        with patch("app.utils.image.cv2.imdecode", wraps=cv2.imdecode) as mock_imdecode:
+            image = read_image_from_bytes(image_bytes, "a.jpg", None, 1, max_side=100)
+
+        assert mock_imdecode.call_args[0][1] == cv2.IMREAD_REDUCED_COLOR_4
+        assert image.size == (100, 50)
+
+    def test_jpeg_resizes_between_reduced_sizes(self) -> None:
+        image_bytes = make_image_bytes((400, 200), "jpeg")
+        with patch("app.utils.image.cv2.imdecode", wraps=cv2.imdecode) as mock_imdecode:
+            image = read_image_from_bytes(image_bytes, "a.jpg", None, 1, scale=0.3)
+
+        assert mock_imdecode.call_args[0][1] == cv2.IMREAD_REDUCED_COLOR_2
+        assert image.size == (120, 60)
+
+    def test_other_format_is_resized(self) -> None:
+        image_bytes = make_image_bytes((400, 200), "png")
+
+        image = read_image_from_bytes(image_bytes, "a.png", 90.0, 1, max_side=100)
+
+        assert image.size == (50, 100)
+
+    def test_cached_per_requested_size(self) -> None:
+        image_bytes = make_image_bytes((400, 200), "jpeg")
+
+        small = get_image_info_from_bytes(image_bytes, "a.jpg", 1, max_side=100)
+        large = get_image_info_from_bytes(image_bytes, "a.jpg", 1, max_side=200)
+        full = get_image_info_from_bytes(image_bytes, "a.jpg", 1)
+
+        assert small[1:3] == (100, 50)
+        assert large[1:3] == (200, 100)
+        assert full[1:3] == (400, 200)
+        assert get_image_info_from_bytes(image_bytes, "a.jpg", 1, max_side=100) is small
+
+
+@pytest.mark.unit
+class TestCropScale:
+    def test_crop_box_is_scaled(self) -> None:
+        image = Image.new("RGB", (100, 50))
+        crop = [ImageCropBbox(bbox=dict(x=100, y=20, w=101, h=80))]
+
+        crop_images = get_crop_image(image, "png", crop, scale=0.5)
+
+        assert len(crop_images) == 1
+        cropped = Image.open(BytesIO(base64.b64decode(crop_images[0]["image"])))
+        assert cropped.size == (50, 40)
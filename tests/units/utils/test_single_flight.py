@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from typing import Dict, List
+from app.utils.single_flight import LocalSingleFlight, get_request_fingerprint
+
+
+@pytest.mark.unit
+class TestRequestFingerprint:
+    def test_ignores_request_specific_keys(self) -> None:
+        inputs = dict(image_id="image_id", page=1, hint=None, task_id="a", request_id="a")
+        duplicate = dict(page=1, image_id="image_id", task_id="b", request_id="b")
+
+        assert get_request_fingerprint(inputs) == get_request_fingerprint(duplicate)
+
+    def test_different_page(self) -> None:
+        assert get_request_fingerprint(dict(image_id="image_id", page=1)) != (
+            get_request_fingerprint(dict(image_id="image_id", page=2))
+        )
+
+
+@pytest.mark.unit
+class TestLocalSingleFlight:
+    def test_concurrent_duplicates_run_once(self) -> None:
+        calls: List[int] = list()
+
+        async def call() -> Dict:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"texts": ["a"]}
+
+        async def run() -> List[Dict]:
+            single_flight = LocalSingleFlight()
+            return await asyncio.gather(*(single_flight.run("key", call) for _ in range(3)))
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert results == [{"texts": ["a"]}] * 3
+        assert results[0] is not results[1]
+
+    def test_leader_error_is_shared(self) -> None:
+        async def call() -> Dict:
+            await asyncio.sleep(0.01)
+            raise RuntimeError()
+
+        async def run() -> List:
+            single_flight = LocalSingleFlight()
+            return await asyncio.gather(
+                *(single_flight.run("key", call) for _ in range(2)), return_exceptions=True
+            )
+
+        assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+
+    def test_follower_runs_when_leader_is_cancelled(self) -> None:
+        calls: List[int] = list()
+
+        async def call() -> Dict:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"texts": ["a"]}
+
+        async def run() -> Dict:
+            single_flight = LocalSingleFlight()
+            leader = asyncio.ensure_future(single_flight.run("key", call))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(single_flight.run("key", call))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(run()) == {"texts": ["a"]}
+        assert len(calls) == 2
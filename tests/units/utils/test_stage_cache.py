@@ -0,0 +1,143 @@
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from app.utils.image import get_image_digest
+from app.utils.stage_cache import StageCache, cached_call
+
+
+@pytest.mark.unit
+class TestStageCache:
+    def test_memory_tier_evicts_least_recently_used(self) -> None:
+        cache = StageCache(max_size=2, disk_path=None)
+        cache.set("a", {"value": "a"})
+        cache.set("b", {"value": "b"})
+        cache.get("a", "test")
+        cache.set("c", {"value": "c"})
+
+        assert cache.get("a", "test") == {"value": "a"}
+        assert cache.get("b", "test") is None
+        assert cache.get("c", "test") == {"value": "c"}
+
+    def test_hit_returns_copy(self) -> None:
+        cache = StageCache(max_size=2, disk_path=None)
+        cache.set("a", {"texts": ["a"]})
+        cache.get("a", "test")["texts"].append("b")
+
+        assert cache.get("a", "test") == {"texts": ["a"]}
+
+    def test_disk_tier_survives_memory_eviction(self, tmp_path: Path) -> None:
+        cache = StageCache(max_size=1, disk_path=str(tmp_path), disk_max_entries=2)
+        cache.set("a", {"value": "a"})
+        cache.set("b", {"value": "b"})
+        cache.set("c", {"value": "c"})
+
+        cache.clear()
+
+        assert len(list(tmp_path.glob("*.pkl"))) == 2
+        assert cache.get("c", "test") == {"value": "c"}
+
+    def test_disk_tier_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        cache = StageCache(max_size=1, disk_path=str(tmp_path), disk_max_entries=2)
+        cache.set("a", {"value": "a"})
+        cache.set("b", {"value": "b"})
+        cache.clear()
+        cache.get("a", "test")
+        cache.set("c", {"value": "c"})
+
+        assert sorted(cache_file.stem for cache_file in tmp_path.glob("*.pkl")) == ["a", "c"]
+
+    def test_disk_tier_keeps_existing_entries(self, tmp_path: Path) -> None:
+        StageCache(disk_path=str(tmp_path)).set("a", {"value": "a"})
+        cache = StageCache(disk_path=str(tmp_path), disk_max_entries=1)
+        cache.set("b", {"value": "b"})
+
+        assert [cache_file.stem for cache_file in tmp_path.glob("*.pkl")] == ["b"]
+
+    def test_key_depends_on_stage_inputs(self) -> None:
+        cache = StageCache(disk_path=None)
+        key = cache.make_key("digest", 1, 0, "recognition", "tiamo")
+
+        assert key == cache.make_key("digest", 1, 0, "recognition", "tiamo")
+        assert key != cache.make_key("digest", 2, 0, "recognition", "tiamo")
+        assert key != cache.make_key("digest", 1, 90, "recognition", "tiamo")
+        assert key != cache.make_key("digest", 1, 0, "general_detection", "tiamo")
+        assert key != cache.make_key("other", 1, 0, "recognition", "tiamo")
+
+
+@pytest.mark.unit
+class TestCachedCall:
+    inputs = {"image_id": "id", "image_path": "/images/id/a.jpg", "page": 1}
+
+    @patch("app.utils.image.get_image_digest", return_value="digest")
+    @patch("app.utils.stage_cache.settings.USE_STAGE_CACHE", True)
+    @patch("app.utils.stage_cache.stage_cache", StageCache(disk_path=None))
+    def test_second_call_uses_cache(self, mock_digest) -> None:
+        calls = list()
+
+        def call() -> dict:
+            calls.append(1)
+            return {"status_code": 200, "response": {"texts": ["a"]}}
+
+        first = cached_call("recognition", self.inputs, "tiamo", call)
+        second = cached_call("recognition", self.inputs, "tiamo", call)
+
+        assert first == second
+        assert len(calls) == 1
+
+    @patch("app.utils.image.get_image_digest", return_value="digest")
+    @patch("app.utils.stage_cache.settings.USE_STAGE_CACHE", True)
+    @patch("app.utils.stage_cache.stage_cache", StageCache(disk_path=None))
+    def test_failed_response_is_not_cached(self, mock_digest) -> None:
+        calls = list()
+
+        def call() -> dict:
+            calls.append(1)
+            return {"status_code": 500, "response": {}}
+
+        cached_call("recognition", self.inputs, "tiamo", call)
+        cached_call("recognition", self.inputs, "tiamo", call)
+
+        assert len(calls) == 2
+
+    @patch("app.utils.image.get_image_digest", return_value="digest")
+    @patch("app.utils.stage_cache.settings.USE_STAGE_CACHE", True)
+    @patch("app.utils.stage_cache.stage_cache", StageCache(disk_path=None))
+    def test_recording_bypasses_cache(self, mock_digest) -> None:
+        calls = list()
+
+        def call() -> dict:
+            calls.append(1)
+            return {"status_code": 200, "response": {"texts": ["a"]}}
+
+        cached_call("recognition", self.inputs, "tiamo", call)
+        with patch("app.utils.stage_cache.is_recording", return_value=True):
+            cached_call("recognition", self.inputs, "tiamo", call)
+
+        assert len(calls) == 2
+
+
+@pytest.mark.unit
+class TestImageDigest:
+    @patch("app.utils.image.settings.USE_MINIO", False)
+    def test_rewritten_file_changes_digest(self, tmp_path: Path) -> None:
+        image_path = tmp_path.joinpath("a.jpg")
+        image_path.write_bytes(b"first")
+        digest = get_image_digest("id", str(image_path))
+
+        assert digest == get_image_digest("id", str(image_path))
+        image_path.write_bytes(b"second")
+        os.utime(image_path, ns=(0, 0))
+        assert get_image_digest("id", str(image_path)) != digest
+        assert get_image_digest("id", str(tmp_path.joinpath("b.jpg"))) is None
+
+    @patch("app.utils.image.settings.USE_MINIO", True)
+    def test_minio_digest_uses_etag(self) -> None:
+        with patch("app.utils.image.minio_client") as minio_client:
+            minio_client.get_etag.side_effect = ["etag-1", "etag-2"]
+            first = get_image_digest("id", "/images/id/a.jpg")
+            second = get_image_digest("id", "/images/id/a.jpg")
+
+        assert first != second
+        assert minio_client.get_etag.call_args[0][0] == "id/a.jpg"
+        minio_client.get.assert_not_called()
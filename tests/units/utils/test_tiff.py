@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+import tifffile
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+from app.utils.tiff import (
+    TiffIndexCache,
+    array_to_pillow,
+    get_tiff_page_count,
+    read_tiff_page_with_index,
+)
+
+
+def make_tiff(pages: np.ndarray) -> bytes:
+    buffer = BytesIO()
+    tifffile.imwrite(buffer, pages, photometric="minisblack")
+    return buffer.getvalue()
+
+
+@pytest.mark.unit
+@patch("app.utils.tiff.tiff_index_cache", TiffIndexCache(max_size=2))
+class TestTiffPageIndex:
+    def setup_method(self) -> None:
+        pages = np.stack([np.full((8, 12), value, dtype=np.uint8) for value in (10, 20, 30)])
+        self.image_bytes = make_tiff(pages)
+
+    def test_page_count(self) -> None:
+        assert get_tiff_page_count(self.image_bytes) == 3
+
+    def test_reads_only_requested_page(self) -> None:
+        image = read_tiff_page_with_index(self.image_bytes, 3)
+
+        assert image.size == (12, 8)
+        assert np.array(image).max() == 30
+
+    def test_out_of_range_page(self) -> None:
+        with pytest.raises(IndexError):
+            read_tiff_page_with_index(self.image_bytes, 4)
+
+    def test_index_is_reused(self) -> None:
+        from app.utils import tiff
+
+        index = tiff.get_tiff_index(self.image_bytes)
+
+        assert tiff.get_tiff_index(bytes(self.image_bytes)) is index
+
+    def test_file_index_is_reused(self, tmp_path: Path) -> None:
+        from app.utils import tiff
+
+        image_path = tmp_path.joinpath("document.tif")
+        image_path.write_bytes(self.image_bytes)
+        index = tiff.get_tiff_index(image_path)
+
+        assert tiff.get_tiff_index(str(image_path)) is index
+        assert np.array(read_tiff_page_with_index(image_path, 2)).max() == 20
+
+
+@pytest.mark.unit
+class TestArrayToPillow:
+    def test_bilevel_page(self) -> None:
+        array = np.zeros((3, 10), dtype=bool)
+        array[1, 2:9] = True
+
+        image = array_to_pillow(array)
+
+        assert image.mode == "1"
+        assert image.size == (10, 3)
+        assert (np.array(image.convert("L")) == array * 255).all()
+
+    def test_gray_page(self) -> None:
+        array = np.full((3, 10), 7, dtype=np.uint8)
+
+        assert (np.array(array_to_pillow(array)) == array).all()
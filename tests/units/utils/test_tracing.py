@@ -0,0 +1,90 @@
+import json
+import asyncio
+import pytest
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+from app.utils.tracing import (
+    OtlpFileExporter,
+    get_current_span,
+    set_trace_tags,
+    span,
+    trace_scope,
+    traced,
+)
+
+
+def get_span_count(**labels: str) -> float:
+    return (
+        REGISTRY.get_sample_value("textscope_span_duration_seconds_count", labels) or 0.0
+    )
+
+
+@pytest.mark.unit
+class TestTracing:
+    def test_child_span_inherits_stage_and_tags(self) -> None:
+        with trace_scope(customer="kakaobank", doc_type=None):
+            with span("stage", stage="recognition") as parent:
+                with span("upstream", upstream="serving") as child:
+                    set_trace_tags(doc_type="D01")
+
+        assert child.stage == "recognition"
+        assert child.trace_id == parent.trace_id
+        assert child.parent_id == parent.span_id
+        assert child.labels()["doc_type"] == "D01"
+        assert parent.labels()["customer"] == "kakaobank"
+        assert get_current_span() is None
+
+    def test_span_feeds_histograms(self) -> None:
+        labels = dict(
+            name="upstream", stage="detection", upstream="serving", doc_type="", customer=""
+        )
+        before = get_span_count(**labels)
+
+        with span("upstream", stage="detection", upstream="serving") as current:
+            current.add_payload("request", 1024)
+
+        assert get_span_count(**labels) == before + 1
+        assert current.duration > 0
+        assert (
+            REGISTRY.get_sample_value(
+                "textscope_span_payload_bytes_sum",
+                dict(name="upstream", stage="detection", upstream="serving", direction="request"),
+            )
+            >= 1024
+        )
+
+    def test_error_is_recorded(self) -> None:
+        with pytest.raises(ValueError):
+            with span("db_write") as current:
+                raise ValueError("broken")
+
+        assert current.to_otlp()["status"]["code"] == 2
+
+    def test_traced_async_function(self) -> None:
+        @traced("image_decode")
+        async def decode() -> str:
+            return get_current_span().name
+
+        assert asyncio.run(decode()) == "image_decode"
+
+    def test_disabled_tracing(self) -> None:
+        with patch("app.utils.tracing.settings.USE_TRACING", False):
+            with span("stage") as current:
+                assert current is None
+
+    def test_otlp_file_export(self, tmp_path) -> None:
+        trace_path = tmp_path.joinpath("trace.jsonl")
+        exporter = OtlpFileExporter(str(trace_path), "textscope-core")
+
+        with patch("app.utils.tracing.exporter", exporter):
+            with span("stage", stage="classification"):
+                with span("upstream", upstream="serving"):
+                    pass
+
+        lines = [json.loads(line) for line in trace_path.read_text().splitlines()]
+        spans = [line["resourceSpans"][0]["scopeSpans"][0]["spans"][0] for line in lines]
+        assert [span_["name"] for span_ in spans] == ["upstream", "stage"]
+        assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+        assert {"key": "stage", "value": {"stringValue": "classification"}} in spans[0][
+            "attributes"
+        ]
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from typing import Any, Dict, List
+from unittest.mock import patch
+from app.utils.deadline import DeadlineExceeded, deadline_scope
+from app.wrapper import upstream
+from app.wrapper.breaker import CircuitBreaker, breakers
+from app.wrapper.aio.upstream import post, send
+
+
+class FakeResponse:
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+
+
+class FakeClient:
+    def __init__(self, delays: Dict[str, float]) -> None:
+        self.delays = delays
+        self.calls: List[str] = list()
+
+    async def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append(url)
+        await asyncio.sleep(self.delays[url])
+        return FakeResponse(200)
+
+
+@pytest.mark.unit
+class TestCircuitBreaker:
+    def setup_method(self) -> None:
+        self.breaker = CircuitBreaker(
+            "serving", "http://replica-1", min_requests=4, error_rate=0.5, open_second=0.0
+        )
+
+    def test_opens_on_error_rate(self) -> None:
+        with patch("app.wrapper.breaker.settings.USE_CIRCUIT_BREAKER", True):
+            for failed in [False, True, False, True]:
+                assert self.breaker.allow()
+                self.breaker.record(0.01, failed=failed)
+        assert self.breaker.state == "open"
+
+    def test_half_open_allows_single_probe(self) -> None:
+        with patch("app.wrapper.breaker.settings.USE_CIRCUIT_BREAKER", True):
+            for _ in range(4):
+                self.breaker.record(0.01, failed=True)
+            assert self.breaker.allow()
+            assert self.breaker.state == "half_open"
+            assert not self.breaker.allow()
+            self.breaker.record(0.01, failed=False)
+        assert self.breaker.state == "closed"
+
+    def test_disabled_breaker_keeps_closed(self) -> None:
+        with patch("app.wrapper.breaker.settings.USE_CIRCUIT_BREAKER", False):
+            for _ in range(4):
+                self.breaker.record(0.01, failed=True)
+            assert self.breaker.allow()
+        assert self.breaker.state == "closed"
+        assert self.breaker.sample_count() == 4
+
+
+class FakeSyncClient:
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        return FakeResponse(200)
+
+
+@pytest.mark.unit
+@patch("app.wrapper.breaker.settings.USE_CIRCUIT_BREAKER", True)
+class TestHalfOpenProbe:
+    url = "http://replica-1/tiamo"
+
+    def setup_method(self) -> None:
+        self.breaker = CircuitBreaker(
+            "serving", "http://replica-1", min_requests=1, error_rate=0.5, open_second=0.0
+        )
+        with patch("app.wrapper.breaker.settings.USE_CIRCUIT_BREAKER", True):
+            self.breaker.record(0.01, failed=True)
+        assert self.breaker.state == "open"
+
+    def test_expired_deadline_returns_probe(self) -> None:
+        with patch.dict(breakers, {self.url: self.breaker}), deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                upstream.post(FakeSyncClient(), self.url)
+            with pytest.raises(DeadlineExceeded):
+                asyncio.run(post(FakeClient({self.url: 0.0}), self.url))
+
+        assert self.breaker.allow()
+
+    def test_task_cancelled_before_start_returns_probe(self) -> None:
+        async def run() -> None:
+            assert self.breaker.allow()
+            task = send(FakeClient({self.url: 0.0}), self.url, self.breaker, {})
+            task.cancel()
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        assert self.breaker.state == "half_open"
+        assert self.breaker.allow()
+
+
+@pytest.mark.unit
+class TestHedgedPost:
+    def setup_method(self) -> None:
+        self.primary_breaker = CircuitBreaker("serving", "http://replica-1")
+        self.secondary_breaker = CircuitBreaker("serving", "http://replica-2")
+
+    def post(self, client: FakeClient) -> FakeResponse:
+        primary = ("http://replica-1/tiamo", self.primary_breaker)
+        secondary = ("http://replica-2/tiamo", self.secondary_breaker)
+        with patch("app.wrapper.aio.upstream.settings.USE_HEDGING", True), patch(
+            "app.wrapper.aio.upstream.first_candidate", return_value=(primary, [secondary])
+        ), patch("app.wrapper.aio.upstream.hedge_delay", return_value=0.01):
+            return asyncio.run(post(client, "http://replica-1/tiamo", hedge=True))
+
+    def test_slow_primary_is_hedged(self) -> None:
+        client = FakeClient({"http://replica-1/tiamo": 1.0, "http://replica-2/tiamo": 0.0})
+
+        assert self.post(client).status_code == 200
+        assert client.calls == ["http://replica-1/tiamo", "http://replica-2/tiamo"]
+        # 취소된 primary의 latency도 hedge delay 계산에 반영
+        assert self.primary_breaker.sample_count() == 1
+        assert self.secondary_breaker.sample_count() == 1
+
+    def test_fast_primary_is_not_hedged(self) -> None:
+        client = FakeClient({"http://replica-1/tiamo": 0.0, "http://replica-2/tiamo": 0.0})
+
+        assert self.post(client).status_code == 200
+        assert client.calls == ["http://replica-1/tiamo"]
@@ -0,0 +1,107 @@
+import asyncio
+import httpx
+import pytest
+from typing import Any, List
+from unittest.mock import patch
+from app.wrapper.client import ClientRegistry, get_upstream_limits
+
+
+class RecordingTransport(httpx.MockTransport):
+    """받은 limits를 응답으로 돌려주고 close 여부를 기록하는 transport"""
+
+    def __init__(self, http2: bool, limits: httpx.Limits) -> None:
+        self.http2 = http2
+        self.limits = limits
+        self.closed = False
+        super().__init__(self.respond)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, json=dict(host=request.url.host, max_connections=self.limits.max_connections)
+        )
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.unit
+class TestClientRegistry:
+    upstreams = {"serving": "http://serving:5000", "pp": "http://pp:8080"}
+
+    def setup_method(self) -> None:
+        self.transports: List[RecordingTransport] = list()
+        self.patches = [
+            patch("app.wrapper.client.get_upstreams", return_value=self.upstreams),
+            patch("app.wrapper.client.HTTPTransport", new=self.make_transport),
+            patch("app.wrapper.client.AsyncHTTPTransport", new=self.make_transport),
+            patch(
+                "app.wrapper.client.settings.UPSTREAM_REPLICAS",
+                {"serving": ["http://serving-2:5000/"]},
+            ),
+            patch(
+                "app.wrapper.client.settings.HTTP_UPSTREAM_LIMITS",
+                {"pp": {"max_connections": 5}},
+            ),
+            patch("app.wrapper.client.settings.HTTP_MAX_CONNECTIONS", 100),
+        ]
+        for mock_patch in self.patches:
+            mock_patch.start()
+        self.registry = ClientRegistry()
+
+    def teardown_method(self) -> None:
+        for mock_patch in reversed(self.patches):
+            mock_patch.stop()
+
+    def make_transport(self, **kwargs: Any) -> RecordingTransport:
+        transport = RecordingTransport(**kwargs)
+        self.transports.append(transport)
+        return transport
+
+    def test_upstream_names(self) -> None:
+        assert self.registry.upstream_of("http://pp:8080/post_processing/kv") == "pp"
+        assert self.registry.upstream_of("http://serving-2:5000/ocr") == "serving"
+        assert self.registry.upstream_of("http://unknown:1234/ocr") == "unknown"
+        assert self.registry.replicas_of("http://serving:5000") == ["http://serving-2:5000"]
+
+    def test_requests_use_mounted_upstream_limits(self) -> None:
+        serving = self.registry.client.post("http://serving:5000/ocr").json()
+        pp = self.registry.client.post("http://pp:8080/post_processing/kv").json()
+
+        assert serving == dict(host="serving", max_connections=100)
+        assert pp == dict(host="pp", max_connections=5)
+        assert len(self.transports) == 3
+
+    def test_async_client_uses_mounted_upstream_limits(self) -> None:
+        async def run() -> dict:
+            response = await self.registry.async_client.post("http://pp:8080/convert")
+            await self.registry.aclose()
+            return response.json()
+
+        assert asyncio.run(run()) == dict(host="pp", max_connections=5)
+
+    def test_http2_is_disabled_by_default(self) -> None:
+        self.registry.client
+
+        assert not self.registry.http2
+        assert not any(transport.http2 for transport in self.transports)
+
+    def test_aclose_closes_every_transport(self) -> None:
+        client = self.registry.client
+        self.registry.async_client
+
+        asyncio.run(self.registry.aclose())
+
+        assert all(transport.closed for transport in self.transports)
+        assert self.registry._transports == {}
+        assert self.registry.client is not client
+
+    def test_get_upstream_limits_overrides_defaults(self) -> None:
+        pp_limits = get_upstream_limits("pp")
+        serving_limits = get_upstream_limits("serving")
+
+        assert pp_limits.max_connections == 5
+        assert serving_limits.max_connections == 100
+        assert pp_limits.max_keepalive_connections == serving_limits.max_keepalive_connections
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from typing import Any, Dict, List
+from app.wrapper.aio.batching import MicroBatcher
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: Dict) -> None:
+        self.status_code = status_code
+        self.body = body
+
+    def json(self) -> Dict:
+        return self.body
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.calls: List[Dict] = list()
+
+    async def post(self, url: str, json: Dict, **kwargs: Any) -> FakeResponse:
+        self.calls.append(dict(url=url, json=json))
+        if url.endswith("/batch"):
+            outputs = [{"id": inputs["id"]} for inputs in json["inputs"]]
+            return FakeResponse(200, {"outputs": outputs})
+        return FakeResponse(200, {"id": json["id"]})
+
+
+def submit_all(batcher: MicroBatcher, client: FakeClient, count: int) -> List:
+    async def run() -> List:
+        return await asyncio.gather(
+            *(batcher.submit(client, {"id": i}) for i in range(count))
+        )
+
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+class TestMicroBatcher:
+    def test_concurrent_requests_are_batched(self) -> None:
+        client = FakeClient()
+        batcher = MicroBatcher("http://serving/agamotto", max_batch_size=4, max_wait_ms=50)
+        results = submit_all(batcher, client, 6)
+
+        assert results == [(200, {"id": i}) for i in range(6)]
+        assert [call["url"] for call in client.calls] == [
+            "http://serving/agamotto/batch",
+            "http://serving/agamotto/batch",
+        ]
+        assert len(client.calls[0]["json"]["inputs"]) == 4
+        assert len(client.calls[1]["json"]["inputs"]) == 2
+
+    def test_single_request_uses_original_route(self) -> None:
+        client = FakeClient()
+        batcher = MicroBatcher("http://serving/tiamo", max_batch_size=4, max_wait_ms=1)
+        results = submit_all(batcher, client, 1)
+
+        assert results == [(200, {"id": 0})]
+        assert client.calls == [dict(url="http://serving/tiamo", json={"id": 0})]
+
+    def test_output_count_mismatch_raises(self) -> None:
+        class BrokenClient(FakeClient):
+            async def post(self, url: str, json: Dict, **kwargs: Any) -> FakeResponse:
+                return FakeResponse(200, {"outputs": []})
+
+        batcher = MicroBatcher("http://serving/agamotto", max_batch_size=2, max_wait_ms=1)
+        with pytest.raises(ValueError):
+            submit_all(batcher, BrokenClient(), 2)
+
+    def test_missing_batch_route_falls_back_to_original_route(self) -> None:
+        class NoBatchClient(FakeClient):
+            async def post(self, url: str, json: Dict, **kwargs: Any) -> FakeResponse:
+                if url.endswith("/batch"):
+                    self.calls.append(dict(url=url, json=json))
+                    return FakeResponse(404, {"detail": "Not Found"})
+                return await super().post(url, json, **kwargs)
+
+        client = NoBatchClient()
+        batcher = MicroBatcher("http://serving/agamotto", max_batch_size=2, max_wait_ms=1)
+
+        assert submit_all(batcher, client, 2) == [(200, {"id": 0}), (200, {"id": 1})]
+        assert submit_all(batcher, client, 2) == [(200, {"id": 0}), (200, {"id": 1})]
+        assert [call["url"] for call in client.calls].count("http://serving/agamotto/batch") == 1
+        assert not batcher.batch_supported
+
+    def test_batch_error_keeps_upstream_status(self) -> None:
+        class UnavailableClient(FakeClient):
+            async def post(self, url: str, json: Dict, **kwargs: Any) -> FakeResponse:
+                return FakeResponse(503, {"detail": "busy"})
+
+        batcher = MicroBatcher("http://serving/agamotto", max_batch_size=2, max_wait_ms=1)
+
+        assert submit_all(batcher, UnavailableClient(), 2) == [(503, {"detail": "busy"})] * 2
+        assert batcher.batch_supported
@@ -0,0 +1,177 @@
+import time
+import asyncio
+import pytest
+from typing import Any, Dict, List, Tuple
+from unittest.mock import patch
+from app.wrapper.aio.dag import (
+    PipelineContext,
+    PipelineGraph,
+    conditions,
+    load_pipeline_graphs,
+    register_condition,
+    register_step,
+    steps,
+)
+
+
+@register_step("test_sleep")
+async def sleep_step(ctx: PipelineContext, inference_result: Dict) -> Dict:
+    await asyncio.sleep(0.1)
+    ctx.inputs.setdefault("called", []).append(len(ctx.results))
+    return {"value": 1, **inference_result}
+
+
+@register_condition("test_never")
+def never(ctx: PipelineContext) -> bool:
+    return False
+
+
+def run_graph(config: Dict) -> PipelineContext:
+    graph = PipelineGraph.from_config("test", config)
+    ctx = PipelineContext(client=None, inputs={}, response_log={})
+    asyncio.run(graph.run(ctx))
+    return ctx
+
+
+def stage(depends_on: List[str] = [], **kwargs: Any) -> Dict:
+    return dict(step="test_sleep", depends_on=list(depends_on), **kwargs)
+
+
+@pytest.mark.unit
+class TestPipelineGraph:
+    def test_independent_stages_run_concurrently(self) -> None:
+        config = dict(
+            stages=dict(a=stage(), b=stage(), c=stage(), d=stage(["a", "b", "c"])),
+            outputs=["d"],
+        )
+        start = time.perf_counter()
+        ctx = run_graph(config)
+        elapsed = time.perf_counter() - start
+        assert set(ctx.results) == {"a", "b", "c", "d"}
+        assert elapsed < 0.35
+        assert "d_inference_time" in ctx.response_log
+
+    def test_unused_stage_is_not_executed(self) -> None:
+        config = dict(stages=dict(a=stage(), unused=stage()), outputs=["a"])
+        ctx = run_graph(config)
+        assert set(ctx.results) == {"a"}
+
+    def test_skip_propagates_to_dependents(self) -> None:
+        config = dict(
+            stages=dict(
+                a=stage(when="test_never"),
+                b=stage(["a"]),
+                c=stage(after=["a"]),
+                d=stage(when="not test_never"),
+            ),
+            outputs=["b", "c", "d"],
+        )
+        ctx = run_graph(config)
+        assert ctx.skipped == {"a", "b"}
+        assert set(ctx.results) == {"c", "d"}
+
+    def test_decide_after_skips_without_waiting_for_upstream(self) -> None:
+        config = dict(
+            stages=dict(
+                guard=stage(),
+                slow=stage(),
+                a=stage(["slow"], when="test_never", decide_after=["guard"]),
+                b=stage(after=["a"]),
+            ),
+            outputs=["b"],
+        )
+        ctx = run_graph(config)
+        assert ctx.skipped == {"a"}
+        assert set(ctx.results) == {"guard", "b"}
+
+    def test_key_dependency(self) -> None:
+        config = dict(stages=dict(a=stage(), b=stage(["a.value"])), outputs=["b"])
+        ctx = run_graph(config)
+        assert ctx.results["b"] == {"value": 1}
+
+    def test_concurrent_wrapper_stages_keep_their_own_route(self) -> None:
+        seen: Dict[str, Tuple] = dict()
+
+        async def cached_call(stage: str, inputs: Dict, route_name: str, call: Any) -> Dict:
+            # stage cache 조회처럼 wrapper 호출 전에 다른 stage로 전환
+            await asyncio.sleep(0.01)
+            return await call()
+
+        def wrapper(name: str) -> Any:
+            async def call(client: Any, inputs: Dict, *args: Any) -> Dict:
+                await asyncio.sleep(0.01)
+                seen[name] = (inputs["model_name"], inputs["route_name"])
+                return dict(response=dict())
+
+            return call
+
+        config = dict(
+            stages=dict(
+                a=dict(module="detection", func="agamotto", route="agamotto"),
+                b=dict(module="recognition", func="tiamo", route="tiamo"),
+            ),
+            outputs=["a", "b"],
+        )
+        with patch("app.wrapper.aio.dag.async_cached_call", cached_call), patch(
+            "app.wrapper.aio.detection.agamotto", wrapper("a")
+        ), patch("app.wrapper.aio.recognition.tiamo", wrapper("b")):
+            ctx = run_graph(config)
+
+        assert seen == {"a": ("agamotto", "agamotto"), "b": ("tiamo", "tiamo")}
+        assert "model_name" not in ctx.inputs
+
+    def test_cycle_is_rejected(self) -> None:
+        config = dict(stages=dict(a=stage(["b"]), b=stage(["a"])), outputs=["a"])
+        with pytest.raises(ValueError):
+            PipelineGraph.from_config("test", config)
+
+    def test_unknown_dependency_is_rejected(self) -> None:
+        config = dict(stages=dict(a=stage(["missing"])), outputs=["a"])
+        with pytest.raises(ValueError):
+            PipelineGraph.from_config("test", config)
+
+
+def recording_step(stage_name: str, events: List[Tuple[str, str]]) -> Any:
+    async def step(ctx: PipelineContext, inference_result: Dict) -> Dict:
+        events.append(("start", stage_name))
+        if stage_name == "rotate":
+            await asyncio.sleep(0.05)
+        events.append(("end", stage_name))
+        return dict(doc_type="planned") if stage_name == "plan" else dict()
+
+    return step
+
+
+@pytest.mark.unit
+class TestHeungkukLifePipeline:
+    def run_pipeline(self, events: List[Tuple[str, str]]) -> PipelineContext:
+        stage_names = [
+            "plan", "rotate", "general_detection", "recognition", "recognition_encode",
+            "classification", "doc_type", "kv_detection", "diseases_box",
+            "insurance_detection", "insurance_recognition", "response",
+        ]
+        stage_conditions = dict(
+            use_rotation=lambda ctx: True,
+            substitute_spchar_to_alpha=lambda ctx: False,
+            is_doc_type_unknown=lambda ctx: ctx.results["plan"].get("doc_type") is None,
+            is_duriel_support_document=lambda ctx: False,
+            is_dcc_merge_target=lambda ctx: False,
+            is_insurance_support_document=lambda ctx: True,
+        )
+        with patch.dict(
+            steps, {name: recording_step(name, events) for name in stage_names}
+        ), patch.dict(conditions, stage_conditions):
+            graph = load_pipeline_graphs("heungkuk")["heungkuk_life"]
+            ctx = PipelineContext(client=None, inputs={}, response_log={})
+            asyncio.run(graph.run(ctx))
+        return ctx
+
+    def test_planned_doc_type_waits_for_rotation(self) -> None:
+        events: List[Tuple[str, str]] = list()
+
+        ctx = self.run_pipeline(events)
+
+        assert "classification" in ctx.skipped
+        rotate_end = events.index(("end", "rotate"))
+        for stage_name in ["general_detection", "insurance_detection"]:
+            assert events.index(("start", stage_name)) > rotate_end
@@ -0,0 +1,292 @@
+"""
+GPU 없이 core 부하 테스트를 하기 위한 serving/pp server 대역
+
+serving(agamotto, tiamo, duriel, rotate, ocr, bill_enterprise, {route}/batch)과
+pp(post_processing/{type}, convert/*) route를 같은 형태의 합성 결과로 응답한다.
+route 별 latency 분포, error rate, box 수(payload 크기)를 설정할 수 있다.
+
+    python -m tests.utils.fake_model_server --port 5000 --latency-ms 30 --error-rate 0.01
+    python -m tests.utils.fake_model_server --port 5000 --config fake_server.json
+
+config 파일 예시(default는 모든 route, routes는 route 별 설정)
+    {"default": {"latency_ms": 20}, "routes": {"tiamo": {"latency_ms": 80, "distribution": "lognormal"}}}
+
+core는 SERVING_IP_ADDR, PP_IP_ADDR, 각 *_PORT를 이 server로 지정해서 실행한다.
+"""
+import json
+import random
+import asyncio
+import argparse
+
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+
+MSGPACK_CONTENT_TYPE = "application/x-msgpack"
+CLASSIFICATION_DOC_TYPE = "du_cls_model"
+
+
+@dataclass
+class RouteProfile:
+    latency_ms: float = 20.0
+    latency_jitter_ms: float = 5.0
+    distribution: str = "normal"  # constant, normal, lognormal, exponential
+    error_rate: float = 0.0
+    error_status: int = 503
+    boxes: int = 50  # detection 결과 box 수
+    text_length: int = 8  # box 당 recognition 글자 수
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """응답 지연(초)"""
+        mean = self.latency_ms
+        if self.distribution == "constant" or mean <= 0:
+            latency = mean
+        elif self.distribution == "lognormal":
+            sigma = self.latency_jitter_ms / mean if mean else 0.0
+            latency = mean * rng.lognormvariate(-(sigma ** 2) / 2, sigma)
+        elif self.distribution == "exponential":
+            latency = rng.expovariate(1 / mean)
+        elif self.distribution == "normal":
+            latency = rng.gauss(mean, self.latency_jitter_ms)
+        else:
+            raise ValueError(f"Unknown latency distribution '{self.distribution}'")
+        return max(latency, 0.0) / 1000
+
+
+@dataclass
+class FakeServerConfig:
+    default: RouteProfile = field(default_factory=RouteProfile)
+    routes: Dict[str, RouteProfile] = field(default_factory=dict)
+    doc_type: str = "HKL01-DT-PRS"  # classification 결과 doc type
+    image_size: List[int] = field(default_factory=lambda: [2000, 2000])
+    seed: Optional[int] = None
+
+    def profile(self, route: str) -> RouteProfile:
+        return self.routes.get(route, self.default)
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "FakeServerConfig":
+        default = RouteProfile(**config.get("default", {}))
+        routes = {
+            route: replace(default, **profile)
+            for route, profile in config.get("routes", {}).items()
+        }
+        options = {
+            key: value for key, value in config.items() if key not in ("default", "routes")
+        }
+        return cls(default=default, routes=routes, **options)
+
+
+class FakeModelServer:
+    """route 별 RouteProfile에 따라 지연/실패를 만들고 합성 결과를 응답"""
+
+    def __init__(self, config: FakeServerConfig) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.request_count: Dict[str, int] = dict()
+
+    async def respond(self, route: str, request: Request, handler: Any) -> Response:
+        self.request_count[route] = self.request_count.get(route, 0) + 1
+        profile = self.config.profile(route)
+        await asyncio.sleep(profile.sample_latency(self.rng))
+        if self.rng.random() < profile.error_rate:
+            return JSONResponse(
+                status_code=profile.error_status, content={"detail": "fake server error"}
+            )
+        inputs = await read_body(request)
+        result = handler(inputs, profile)
+        return make_response(request, result)
+
+    def detect(self, inputs: Dict, profile: RouteProfile) -> Dict:
+        image_width, image_height = self.config.image_size
+        boxes = list()
+        for index in range(profile.boxes):
+            x = self.rng.uniform(0, image_width - 200)
+            y = (index + 0.5) * image_height / max(profile.boxes, 1)
+            boxes.append([x, y, x + self.rng.uniform(20, 200), y + 20])
+        return dict(
+            boxes=boxes,
+            scores=[round(self.rng.uniform(0.5, 1.0), 4) for _ in boxes],
+            classes=["text"] * len(boxes),
+            image_width=image_width,
+            image_height=image_height,
+            angle=inputs.get("angle") or 0,
+            response_log=dict(),
+        )
+
+    def recognize(self, inputs: Dict, profile: RouteProfile) -> Dict:
+        boxes = inputs.get("valid_boxes") or inputs.get("boxes") or []
+        rec_preds = [
+            [self.rng.randint(1, 2000) for _ in range(profile.text_length)] for _ in boxes
+        ]
+        return dict(rec_preds=rec_preds, scores=inputs.get("valid_scores", []), response_log=dict())
+
+    def duriel(self, inputs: Dict, profile: RouteProfile) -> Dict:
+        doc_type = inputs.get("doc_type") or CLASSIFICATION_DOC_TYPE
+        if doc_type == CLASSIFICATION_DOC_TYPE:
+            return dict(
+                doc_type=self.config.doc_type,
+                scores={self.config.doc_type: 0.99},
+                response_log=dict(),
+            )
+        boxes = inputs.get("boxes", [])
+        texts = inputs.get("texts") or [""] * len(boxes)
+        return dict(
+            boxes=boxes,
+            scores=inputs.get("scores") or [0.9] * len(boxes),
+            classes=[f"{doc_type}-KV-{index % 10:02d}" for index in range(len(boxes))],
+            texts=texts[: len(boxes)],
+            response_log=dict(),
+        )
+
+    def ocr(self, inputs: Dict, profile: RouteProfile) -> Dict:
+        result = self.detect(inputs, profile)
+        result.update(
+            rec_preds=self.recognize(result, profile)["rec_preds"],
+            doc_type=inputs.get("doc_type") or self.config.doc_type,
+        )
+        return result
+
+    def post_processing(self, post_processing_type: str, inputs: Dict) -> Dict:
+        boxes = inputs.get("boxes") or []
+        classes = inputs.get("classes") or ["text"] * len(boxes)
+        scores = inputs.get("scores") or [0.9] * len(boxes)
+        texts = inputs.get("texts") or [""] * len(boxes)
+        if post_processing_type == "diseases_box":
+            return dict(result=dict(preds=dict(boxes=boxes[:1], scores=scores[:1], classes=classes[:1])))
+        kv = {
+            f"{class_}_pred": dict(box=box, score=score, value=text, **{"class": class_})
+            for box, score, class_, text in zip(boxes, scores, classes, texts)
+        }
+        return dict(result=kv, texts=texts)
+
+
+async def read_body(request: Request) -> Any:
+    body = await request.body()
+    if not body:
+        return dict()
+    if request.headers.get("content-type", "").startswith(MSGPACK_CONTENT_TYPE):
+        from app.utils.payload import unpackb
+
+        return unpackb(body)
+    return json.loads(body)
+
+
+def make_response(request: Request, result: Any) -> Response:
+    if MSGPACK_CONTENT_TYPE in request.headers.get("accept", ""):
+        from app.utils.payload import packb
+
+        return Response(content=packb(result), media_type=MSGPACK_CONTENT_TYPE)
+    return JSONResponse(content=result)
+
+
+def create_fake_app(config: Optional[FakeServerConfig] = None) -> FastAPI:
+    server = FakeModelServer(config or FakeServerConfig())
+    handlers = dict(
+        agamotto=server.detect,
+        tiamo=server.recognize,
+        duriel=server.duriel,
+        rotate=lambda inputs, profile: dict(angle=0, response_log=dict()),
+        ocr=server.ocr,
+        bill_enterprise=server.ocr,
+    )
+    app = FastAPI()
+    app.state.fake_server = server
+
+    @app.get("/livez")
+    async def livez() -> Response:
+        return PlainTextResponse("\n", status_code=200)
+
+    @app.get("/status")
+    async def status() -> Dict:
+        return dict(
+            status="ok",
+            config=asdict(server.config),
+            request_count=server.request_count,
+        )
+
+    @app.post("/post_processing/{post_processing_type}")
+    async def post_processing(post_processing_type: str, request: Request) -> Response:
+        return await server.respond(
+            "post_processing",
+            request,
+            lambda inputs, profile: server.post_processing(post_processing_type, inputs),
+        )
+
+    @app.post("/convert/recognition_to_text")
+    async def recognition_to_text(request: Request) -> Response:
+        return await server.respond(
+            "convert",
+            request,
+            lambda inputs, profile: [
+                "".join(chr(0xAC00 + pred % 11172) for pred in rec_pred)
+                for rec_pred in inputs.get("rec_preds") or []
+            ],
+        )
+
+    @app.post("/convert/text_to_recognition")
+    async def text_to_recognition(request: Request) -> Response:
+        return await server.respond(
+            "convert",
+            request,
+            lambda inputs, profile: [
+                [ord(char) for char in text] for text in inputs.get("texts") or []
+            ],
+        )
+
+    @app.post("/{route_name}/batch")
+    async def batch(route_name: str, request: Request) -> Response:
+        handler = handlers.get(route_name, server.ocr)
+        return await server.respond(
+            route_name,
+            request,
+            lambda inputs, profile: dict(
+                outputs=[handler(item, profile) for item in inputs.get("inputs", [])]
+            ),
+        )
+
+    @app.post("/{route_name}")
+    async def inference(route_name: str, request: Request) -> Response:
+        return await server.respond(route_name, request, handlers.get(route_name, server.ocr))
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="textscope fake serving/pp server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--config", help="RouteProfile 설정 json 파일")
+    parser.add_argument("--seed", type=int)
+    for profile_field in fields(RouteProfile):
+        parser.add_argument(
+            f"--{profile_field.name.replace('_', '-')}", type=type(profile_field.default)
+        )
+    return parser.parse_args()
+
+
+def main() -> None:
+    import uvicorn
+
+    args = parse_args()
+    config_dict: Dict = dict()
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config_dict = json.load(f)
+    config_dict.setdefault("default", {}).update(
+        {
+            profile_field.name: getattr(args, profile_field.name)
+            for profile_field in fields(RouteProfile)
+            if getattr(args, profile_field.name) is not None
+        }
+    )
+    if args.seed is not None:
+        config_dict["seed"] = args.seed
+    uvicorn.run(create_fake_app(FakeServerConfig.from_dict(config_dict)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
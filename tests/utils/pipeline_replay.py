@@ -0,0 +1,200 @@
+"""
+pipeline recording(app.utils.recording) replay, core 처리 시간 benchmark
+
+기록된 입력을 execute_ocr로 다시 실행하고 upstream 요청(httpx Client/AsyncClient.post)은
+tests/api/wrapper의 mock처럼 FakeInferenceResponse로 기록된 응답을 돌려준다.
+upstream 대기가 없으므로 측정 시간은 pipeline, hint 적용, response 생성 등 core 쪽 처리 시간이다.
+
+    python -m tests.utils.pipeline_replay /workspace/recordings --iterations 20 --output replay.json
+    python -m tests.utils.pipeline_replay /workspace/recordings --baseline replay.json --max-regression 0.2
+"""
+import sys
+import copy
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+
+from pathlib import Path
+from unittest.mock import patch
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from httpx import AsyncClient, Client
+
+from app.common.const import get_settings
+from app.utils.charset import charset_codec
+from app.utils.recording import get_result_content, list_recordings, load_recording
+from tests.utils.single_pipeline import FakeInferenceResponse
+
+
+settings = get_settings()
+
+# 실행할 때마다 달라지는 response_log 값은 결과 비교에서 제외
+VOLATILE_KEY_SUFFIXES = ("_time", "_datetime", "elapsed")
+
+
+class ReplayMismatch(Exception):
+    pass
+
+
+class RecordedUpstream:
+    """
+    기록된 upstream 응답을 path, 요청 내용 순으로 찾아서 돌려주는 stub
+
+    같은 path의 요청이 여러 번이면 요청 json이 같은 기록을 먼저 사용하고
+    없으면 기록된 순서대로 사용한다.
+    """
+
+    def __init__(self, calls: List[Dict[str, Any]]) -> None:
+        self.calls = calls
+        self.used = [False] * len(calls)
+
+    def find(self, url: str, request: Any) -> Dict[str, Any]:
+        path = urlsplit(url).path
+        candidates = [
+            index
+            for index, call in enumerate(self.calls)
+            if not self.used[index] and call["path"] == path
+        ]
+        if not candidates:
+            raise ReplayMismatch(f"No recorded response for {path}")
+        index = next(
+            (index for index in candidates if self.calls[index]["request"] == request),
+            candidates[0],
+        )
+        self.used[index] = True
+        return self.calls[index]
+
+    def respond(self, url: str, **kwargs: Any) -> FakeInferenceResponse:
+        call = self.find(url, normalize(kwargs.get("json")))
+        # pipeline이 응답을 수정해도 다음 replay에 영향이 없도록 복사해서 전달
+        return FakeInferenceResponse(
+            status_code=call["status_code"], response_data=copy.deepcopy(call["response"])
+        )
+
+    def unused_calls(self) -> List[str]:
+        return [call["path"] for call, used in zip(self.calls, self.used) if not used]
+
+
+def normalize(value: Any) -> Any:
+    """기록(json)과 비교할 수 있도록 tuple, datetime 등을 json 형태로 변환"""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: strip_volatile(item)
+            for key, item in value.items()
+            if not str(key).endswith(VOLATILE_KEY_SUFFIXES)
+        }
+    if isinstance(value, list):
+        return [strip_volatile(item) for item in value]
+    return value
+
+
+def replay_once(recording: Dict[str, Any]) -> Any:
+    """recording 한 개를 upstream 없이 실행한 결과"""
+    from app.routes.inference import execute_ocr
+
+    upstream = RecordedUpstream(recording["calls"])
+
+    def post(client: Client, url: str, **kwargs: Any) -> FakeInferenceResponse:
+        return upstream.respond(url, **kwargs)
+
+    async def async_post(client: AsyncClient, url: str, **kwargs: Any) -> FakeInferenceResponse:
+        return upstream.respond(url, **kwargs)
+
+    with patch.object(Client, "post", new=post), patch.object(
+        AsyncClient, "post", new=async_post
+    ), patch.multiple(
+        settings,
+        USE_OCR_PIPELINE=recording["pipeline"],
+        USE_STAGE_CACHE=False,
+        USE_SINGLE_FLIGHT=False,
+        USE_PIPELINE_RECORDING=False,
+        USE_MICRO_BATCHING=False,
+        USE_HEDGING=False,
+    ), patch.object(charset_codec, "is_verified", False):
+        result = asyncio.run(execute_ocr(json.loads(json.dumps(recording["inputs"]))))
+    unused_calls = upstream.unused_calls()
+    if unused_calls:
+        raise ReplayMismatch(f"Recorded calls were not replayed: {unused_calls}")
+    return get_result_content(result)
+
+
+def is_same_result(recording: Dict[str, Any], result: Any) -> bool:
+    return strip_volatile(normalize(result)) == strip_volatile(recording.get("result"))
+
+
+def benchmark(recording_file: Path, iterations: int) -> Dict[str, Any]:
+    recording = load_recording(recording_file)
+    result = replay_once(recording)
+    elapsed = list()
+    for _ in range(iterations):
+        start_time = time.perf_counter()
+        replay_once(recording)
+        elapsed.append(time.perf_counter() - start_time)
+    elapsed_ms = np.asarray(elapsed) * 1000
+    return dict(
+        pipeline=recording["pipeline"],
+        calls=len(recording["calls"]),
+        matched=is_same_result(recording, result),
+        p50_ms=float(np.percentile(elapsed_ms, 50)),
+        p95_ms=float(np.percentile(elapsed_ms, 95)),
+        mean_ms=float(elapsed_ms.mean()),
+    )
+
+
+def find_regressions(
+    report: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float
+) -> List[str]:
+    """baseline 보다 p50이 max_regression 비율 이상 느려진 recording"""
+    regressions = list()
+    for name, result in report.items():
+        baseline_result = baseline.get(name)
+        if baseline_result is None or baseline_result["p50_ms"] <= 0:
+            continue
+        ratio = result["p50_ms"] / baseline_result["p50_ms"] - 1
+        if ratio > max_regression:
+            regressions.append(
+                f"{name}: p50 {baseline_result['p50_ms']:.2f}ms -> {result['p50_ms']:.2f}ms (+{ratio:.0%})"
+            )
+    return regressions
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="textscope pipeline replay benchmark")
+    parser.add_argument("recordings", help="recording 파일 또는 directory")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--output", help="결과 json 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 json")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    report = {
+        recording_file.name: benchmark(recording_file, args.iterations)
+        for recording_file in list_recordings(args.recordings)
+    }
+    for name, result in report.items():
+        print(f"{name}: p50 {result['p50_ms']:.2f}ms, p95 {result['p95_ms']:.2f}ms, matched={result['matched']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    failed = [name for name, result in report.items() if not result["matched"]]
+    if args.baseline:
+        failed += find_regressions(
+            report, json.loads(Path(args.baseline).read_text()), args.max_regression
+        )
+    for message in failed:
+        print(f"FAILED {message}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())